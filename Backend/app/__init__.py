@@ -2,7 +2,14 @@ from flask import Flask
 from flask_cors import CORS
 
 from app.core.middleware import attach_supabase_middleware
+from app.core.query_tracking import attach_query_tracking
+from app.core.metrics import attach_metrics
+from app.core.json_provider import install_json_provider
 from app.core.security import refresh_cookie_middleware
+from app.core.audit_writer import audit_writer
+from app.core.warmup import warmup
+from app.core.scheduler import scheduler
+from app.config import settings
 
 # Blueprints
 from app.routes.auth_routes import auth_bp
@@ -10,16 +17,21 @@ from app.routes.account_routes import account_bp
 from app.routes.transaction_routes import transaction_bp
 from app.routes.update_routes import update_bp
 from app.routes.history_routes import history_bp
+from app.routes.instruction_routes import instruction_bp
+from app.routes.audit_routes import audit_bp
 from app.routes.debug_routes import debug_bp
+from app.routes.metrics_routes import metrics_bp
 
 
 def create_app():
     app = Flask(__name__)
+    install_json_provider(app, settings.JSON_PROVIDER)
 
     # -------------------- CORS --------------------
     CORS(
         app,
         supports_credentials=True,
+        expose_headers=["Idempotent-Replayed", "Server-Timing"],
         origins=[
             "http://localhost:3000",
             "https://rupee-wave-flask.vercel.app",
@@ -31,6 +43,20 @@ def create_app():
     # These functions MODIFY the app directly.
     attach_supabase_middleware(app)
     refresh_cookie_middleware(app)
+    attach_query_tracking(app)
+    if settings.METRICS_ENABLED:
+        attach_metrics(app)
+
+    # ------------------- Background workers -------------------
+    # Replays any spooled audit rows from a previous run.
+    if settings.AUDIT_ASYNC:
+        audit_writer.start()
+    # Imports, DB pool, bcrypt pool: off the request path, never blocks /health
+    if settings.WARMUP_ON_BOOT:
+        warmup.start()
+    # Standing instructions: off by default, enable on the worker(s) that should tick
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
 
     # ------------------- Blueprints -------------------
     app.register_blueprint(auth_bp, url_prefix="/auth")
@@ -38,6 +64,10 @@ def create_app():
     app.register_blueprint(transaction_bp, url_prefix="/transaction")
     app.register_blueprint(update_bp, url_prefix="/update")
     app.register_blueprint(history_bp, url_prefix="/history")
+    app.register_blueprint(instruction_bp, url_prefix="/instructions")
+    app.register_blueprint(audit_bp, url_prefix="/audit")
     app.register_blueprint(debug_bp, url_prefix="/debug")
+    if settings.METRICS_ENABLED:
+        app.register_blueprint(metrics_bp)
 
     return app
@@ -8,11 +8,108 @@ class Settings(BaseSettings):
     # -------------------- GENERAL --------------------
     ENV: str = "dev"   # dev | prod
 
+    # -------------------- DATA BACKEND --------------------
+    # supabase: live project | sqlite: local DB for offline/load testing
+    DB_BACKEND: str = "supabase"
+    SQLITE_PATH: str = ":memory:"
+    SQLITE_LATENCY_MS: float = 0.0                # simulated round trip per call
+
     # -------------------- SUPABASE --------------------
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_ROLE_KEY: str = ""
 
+    # -------------------- HTTP POOL --------------------
+    SUPABASE_POOL_MAX_CONNECTIONS: int = 20
+    SUPABASE_POOL_MAX_KEEPALIVE: int = 10
+    SUPABASE_POOL_KEEPALIVE_EXPIRY: float = 30.0   # seconds
+    SUPABASE_HTTP_TIMEOUT: float = 10.0            # seconds
+
+    # -------------------- TRANSACTIONS --------------------
+    # legacy: PIN check, RPC, audit, history and balance as separate calls
+    # atomic: one atm_* RPC per operation (supabase/migrations/0001)
+    TRANSACTION_MODE: str = "legacy"
+
+    # -------------------- AUDIT LOG WRITER --------------------
+    AUDIT_ASYNC: bool = True
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 100
+    AUDIT_FLUSH_INTERVAL: float = 0.5             # seconds
+    AUDIT_SPOOL_PATH: str = "audit_spool.jsonl"
+    AUDIT_RETENTION_DAYS: int = 90                # older whole days move to the archive
+    AUDIT_ARCHIVE_PAGE_SIZE: int = 1000           # rows per archive chunk (app_audit_log_archive)
+    AUDIT_ARCHIVE_SCAN_CHUNKS: int = 4            # archive chunks one /audit/logs page may read
+
+    # -------------------- USER ROLE CACHE --------------------
+    # per process: a role changed in the DB reaches each worker within the TTL
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 5.0                   # seconds
+
+    # -------------------- ACCOUNT SNAPSHOT CACHE --------------------
+    ACCOUNT_CACHE_SIZE: int = 10000
+    ACCOUNT_CACHE_TTL: float = 60.0               # seconds (entries are version-checked anyway)
+
+    # -------------------- BCRYPT --------------------
+    BCRYPT_ROUNDS: int = 12                       # existing hashes are upgraded on login
+    HASH_WORKERS: int = 0                         # 0 → os.cpu_count()
+    HASH_QUEUE_SIZE: int = 64
+    HASH_QUEUE_TIMEOUT: float = 5.0               # seconds
+
+    # -------------------- ACCOUNT NUMBERS --------------------
+    ACCOUNT_NO_BLOCK_SIZE: int = 100              # numbers reserved per DB call
+    BULK_CHUNK_SIZE: int = 500                    # rows per bulk-onboarding transaction
+
+    # -------------------- BATCH TRANSFERS --------------------
+    BATCH_MAX_ITEMS: int = 5000                   # items per batch-transfer request
+    BATCH_CHUNK_SIZE: int = 500                   # best-effort items per DB transaction
+
+    # -------------------- STANDING INSTRUCTIONS --------------------
+    SCHEDULER_ENABLED: bool = False               # run due instructions from a worker thread
+    SCHEDULER_TICK_SECONDS: float = 30.0          # max sleep between ticks
+    SCHEDULER_BATCH_SIZE: int = 200               # instructions per DB transaction
+    SCHEDULER_MAX_PER_TICK: int = 2000            # rate limit; the rest waits for the next tick
+    SCHEDULER_LOOKAHEAD: int = 1000               # upcoming due times kept in memory
+    SI_MAX_RETRIES: int = 3                       # per occurrence, on insufficient funds / lock
+    SI_RETRY_BASE_SECONDS: int = 900              # backoff: base * 2^retries
+
+    # -------------------- BALANCE SNAPSHOTS / STATEMENTS --------------------
+    SNAPSHOT_CHUNK_SIZE: int = 50000              # history rows per snapshot transaction
+    SNAPSHOT_SETTLE_SECONDS: int = 600            # a day is snapshotted this long after it closes
+    STATEMENT_MAX_DAYS: int = 366                 # longest statement period
+
+    # -------------------- RECONCILIATION --------------------
+    RECONCILE_WORKERS: int = 4                    # account ranges checked in parallel
+    RECONCILE_PAGE_SIZE: int = 2000               # accounts per DB call
+
+    # -------------------- ACCOUNT SEARCH --------------------
+    SEARCH_INDEX_ENABLED: bool = False            # in-process prefix index (else DB trigram indexes only)
+    SEARCH_INDEX_MAX_ACCOUNTS: int = 200000       # bigger tables are left to the DB
+    SEARCH_INDEX_TTL: float = 300.0               # rebuild after this many seconds
+
+    # -------------------- PIN LOCKOUT --------------------
+    PIN_MAX_ATTEMPTS: int = 3
+    PIN_LOCK_COOLDOWN_MINUTES: int = 0            # 0 → locked until the bank unlocks
+
+    # -------------------- PIN SESSIONS --------------------
+    PIN_SESSION_TTL: int = 120                    # seconds
+
+    # -------------------- IDEMPOTENCY --------------------
+    IDEMPOTENCY_TTL: float = 86400.0              # seconds a result can be replayed
+    IDEMPOTENCY_WAIT: float = 10.0                # max wait on an in-flight duplicate
+
+    # -------------------- STARTUP --------------------
+    WARMUP_ON_BOOT: bool = True                   # build clients/pools in the background after boot
+
+    # -------------------- JSON --------------------
+    JSON_PROVIDER: str = "orjson"                 # "orjson" | "stdlib" (Flask's json module)
+
+    # -------------------- METRICS --------------------
+    METRICS_ENABLED: bool = True                  # Prometheus /metrics + request timing
+    METRICS_SCRAPE_TOKEN: str = ""                # "Authorization: Bearer <token>" for scrapers; admins always allowed
+
+    # -------------------- QUERY BUDGETS --------------------
+    QUERY_BUDGET_ENFORCE: bool = False            # raise (not just log) when a route goes over
+
     # -------------------- SECURITY --------------------
     SUPABASE_JWT_SECRET: str = ""
     SECRET_KEY: str | None = None  # fallback for Flask sessions
@@ -28,6 +125,27 @@ class Settings(BaseSettings):
             raise ValueError(f"ENV must be one of {allowed}")
         return v
 
+    @field_validator("DB_BACKEND")
+    def validate_db_backend(cls, v):
+        allowed = {"supabase", "sqlite"}
+        if v not in allowed:
+            raise ValueError(f"DB_BACKEND must be one of {allowed}")
+        return v
+
+    @field_validator("JSON_PROVIDER")
+    def validate_json_provider(cls, v):
+        allowed = {"orjson", "stdlib"}
+        if v not in allowed:
+            raise ValueError(f"JSON_PROVIDER must be one of {allowed}")
+        return v
+
+    @field_validator("TRANSACTION_MODE")
+    def validate_transaction_mode(cls, v):
+        allowed = {"legacy", "atomic"}
+        if v not in allowed:
+            raise ValueError(f"TRANSACTION_MODE must be one of {allowed}")
+        return v
+
     @property
     def JWT_SECRET(self) -> str:
         if self.SUPABASE_JWT_SECRET:
@@ -44,7 +162,7 @@ required = {
     "SUPABASE_URL": settings.SUPABASE_URL,
     "SUPABASE_KEY": settings.SUPABASE_KEY,
     "SUPABASE_SERVICE_ROLE_KEY": settings.SUPABASE_SERVICE_ROLE_KEY,
-}
+} if settings.DB_BACKEND == "supabase" else {}
 
 missing = [k for k, v in required.items() if not v]
 
@@ -0,0 +1,114 @@
+"""
+Account snapshot cache (balance, lock state, contact fields) keyed by
+account_no.
+
+accounts.version goes up on every write (supabase/migrations/0006), so the
+cache never has to guess whether an entry is stale. Each request notes the
+version it read from the DB (the PIN check reads it anyway), and an entry
+is only served when its version matches. A write from another worker bumps
+the version and the entry is skipped. Writes made here are stored through
+with the version the DB returned.
+"""
+
+import threading
+from typing import Optional
+
+from flask import g, has_app_context
+
+from app.config import settings
+from app.utils.cache_tools import TTLCache
+
+
+SNAPSHOT_FIELDS = ("account_no", "name", "balance", "mobileno", "gmail", "is_locked", "version")
+SNAPSHOT_COLUMNS = ", ".join(SNAPSHOT_FIELDS)
+
+
+class AccountSnapshotCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._stale = 0
+
+    # ---------------- VERSIONS SEEN THIS REQUEST ----------------
+    @staticmethod
+    def _seen() -> dict:
+        if not has_app_context():
+            return {}
+        if "account_versions" not in g:
+            g.account_versions = {}
+        return g.account_versions
+
+    def observe(self, ac_no: str, version: Optional[int]):
+        """Record the DB version this request just read for `ac_no`."""
+        if version is not None:
+            self._seen()[ac_no] = version
+
+    # ---------------- READ ----------------
+    def get_fresh(self, ac_no: str, *fields: str) -> Optional[dict]:
+        """
+        The snapshot, only if it is at the version this request read and has
+        every requested field. None means: read the DB.
+        """
+        seen = self._seen().get(ac_no)
+        if seen is None:
+            return None
+
+        snapshot = self._cache.get(ac_no)
+        if snapshot is None:
+            return None
+        if snapshot["version"] != seen or any(f not in snapshot for f in fields):
+            with self._lock:
+                self._stale += 1
+            return None
+        return snapshot
+
+    # ---------------- WRITE-THROUGH ----------------
+    def put(self, row: dict):
+        """Store a full or partial account row that includes its version."""
+        ac_no, version = row.get("account_no"), row.get("version")
+        if ac_no is None or version is None:
+            return
+
+        snapshot = {k: row[k] for k in SNAPSHOT_FIELDS if k in row}
+        with self._lock:
+            current = self._cache.peek(ac_no)
+            if current is not None:
+                if current["version"] > version:
+                    return  # never replace a newer snapshot with an older read
+                if current["version"] + 1 == version or current["version"] == version:
+                    # nothing else touched the row in between: keep the other fields
+                    snapshot = {**current, **snapshot}
+            self._cache.set(ac_no, snapshot)
+        self.observe(ac_no, version)
+
+    def apply(self, ac_no: str, result) -> Optional[int]:
+        """
+        Write through an RPC result carrying {balance, version}; returns the
+        balance, or None when the RPC predates 0006 and returned neither.
+        """
+        if not isinstance(result, dict) or "balance" not in result:
+            return None
+        if "version" in result:
+            self.put({"account_no": ac_no, "balance": result["balance"], "version": result["version"]})
+        return result["balance"]
+
+    def invalidate(self, *ac_nos: str):
+        for ac_no in ac_nos:
+            self._cache.invalidate(ac_no)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        data = self._cache.stats()
+        with self._lock:
+            data["stale"] = self._stale
+        # a stale entry was found but not served: count it as a miss
+        data["hits"] -= data["stale"]
+        data["misses"] += data["stale"]
+        lookups = data["hits"] + data["misses"]
+        data["hit_ratio"] = round(data["hits"] / lookups, 4) if lookups else 0.0
+        return data
+
+
+account_cache = AccountSnapshotCache(maxsize=settings.ACCOUNT_CACHE_SIZE, ttl=settings.ACCOUNT_CACHE_TTL)
@@ -0,0 +1,200 @@
+"""
+In-process prefix index for account search (optional, SEARCH_INDEX_ENABLED).
+
+One sorted key list per searchable field (lower(name), mobileno,
+lower(gmail)); a prefix lookup is a bisect plus a walk over the matching
+run, no DB call. The index is built on a background thread from the whole
+accounts table and is only used while it is complete and fresh:
+
+  - tables larger than SEARCH_INDEX_MAX_ACCOUNTS are never indexed here
+    (the trigram indexes in the DB answer instead)
+  - it is rebuilt after SEARCH_INDEX_TTL seconds
+  - when this worker creates an account or changes a mobile number or
+    email it calls upsert(), which moves just that row's keys in the
+    sorted lists; other workers catch up on their TTL
+
+Until a build finishes, lookups return None and the caller asks the DB.
+"""
+
+import bisect
+import heapq
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from app.config import settings
+
+
+FIELDS = ("name", "mobileno", "gmail")
+ROW_COLUMNS = "account_no, name, mobileno, gmail"
+
+
+def _key(field: str, row: dict) -> str:
+    return (row.get(field) or "").lower()
+
+
+class AccountPrefixIndex:
+    def __init__(self, client_factory: Callable = None, page_size: int = 1000):
+        self._client_factory = client_factory
+        self._page_size = page_size
+        self._lock = threading.Lock()
+        self._building: threading.Thread | None = None
+        self._pid = None
+        self._rows: Dict[str, dict] = {}
+        self._keys: Dict[str, List[str]] = {}
+        self._ids: Dict[str, List[str]] = {}
+        self._built_at = 0.0
+        self._pending: List[dict] | None = None   # upserts made while a build is reading
+        self._state = "empty"         # empty | ready | too_large
+        self._stats = {"builds": 0, "hits": 0, "misses": 0, "build_ms": 0.0}
+
+    # ---------------- BUILD ----------------
+    def _client(self):
+        if self._client_factory:
+            return self._client_factory()
+        from app.core.supabase_client import get_service_client
+        return get_service_client()
+
+    def build(self):
+        with self._lock:
+            self._pending = []
+
+        started = time.perf_counter()
+        db = self._client()
+        rows, after = [], None
+        while True:
+            query = db.table("accounts").select(ROW_COLUMNS).order("account_no").limit(self._page_size)
+            if after is not None:
+                query = query.gt("account_no", after)
+            page = query.execute().data or []
+            rows.extend(page)
+            if len(rows) > settings.SEARCH_INDEX_MAX_ACCOUNTS:
+                with self._lock:
+                    self._pending = None
+                    self._state = "too_large"
+                    self._rows, self._keys, self._ids = {}, {}, {}
+                    self._built_at = time.monotonic()
+                return
+            if len(page) < self._page_size:
+                break
+            after = page[-1]["account_no"]
+
+        keys, ids = {}, {}
+        for field in FIELDS:
+            entries = sorted((_key(field, r), r["account_no"]) for r in rows)
+            keys[field] = [k for k, _ in entries]
+            ids[field] = [a for _, a in entries]
+
+        with self._lock:
+            self._rows = {r["account_no"]: r for r in rows}
+            self._keys, self._ids = keys, ids
+            # rows written after the build read them
+            for row in self._pending or ():
+                self._apply(row)
+            self._pending = None
+            self._built_at = time.monotonic()
+            self._state = "ready"
+            self._stats["builds"] += 1
+            self._stats["build_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._building and self._building.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._building = threading.Thread(target=self._safe_build, name="account-index", daemon=True)
+            self._building.start()
+
+    def _safe_build(self):
+        try:
+            self.build()
+        except Exception:
+            pass
+
+    # ---------------- ROW UPDATES ----------------
+    def _position(self, field: str, key: str, ac_no: str) -> int:
+        keys, ids = self._keys[field], self._ids[field]
+        i = bisect.bisect_left(keys, key)
+        while i < len(keys) and keys[i] == key and ids[i] < ac_no:
+            i += 1
+        return i
+
+    def _apply(self, row: dict):
+        ac_no = row["account_no"]
+        old = self._rows.get(ac_no)
+        if old is None and not all(f in row for f in FIELDS):
+            return                  # made by another worker: picked up on the next build
+        row = {**(old or {}), **row}
+        for field in FIELDS:
+            keys, ids = self._keys[field], self._ids[field]
+            if old is not None:
+                i = self._position(field, _key(field, old), ac_no)
+                if i < len(ids) and ids[i] == ac_no:
+                    del keys[i], ids[i]
+            i = self._position(field, _key(field, row), ac_no)
+            keys.insert(i, _key(field, row))
+            ids.insert(i, ac_no)
+        self._rows[ac_no] = row
+
+    def upsert(self, row: dict):
+        """Add a new account, or move a changed one, without a rebuild."""
+        row = {c: row[c] for c in ("account_no", *FIELDS) if c in row}
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(row)
+            if self._state == "ready":
+                self._apply(row)
+
+    # ---------------- LOOKUP ----------------
+    def _usable(self) -> bool:
+        fresh = time.monotonic() - self._built_at < settings.SEARCH_INDEX_TTL
+        return fresh and self._state in ("ready", "too_large")
+
+    def _run(self, field: str, prefix: str, after_ac: Optional[str]) -> Iterator[str]:
+        keys, ids = self._keys[field], self._ids[field]
+        i = bisect.bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            if after_ac is None or ids[i] > after_ac:
+                yield ids[i]
+            i += 1
+
+    def lookup(self, prefix: str, field: Optional[str], limit: int, after_ac: Optional[str] = None) -> Optional[List[dict]]:
+        """
+        Prefix matches ordered by account_no (after `after_ac`), at most
+        `limit` rows; None when the index can't answer.
+        """
+        if not settings.SEARCH_INDEX_ENABLED:
+            return None
+
+        with self._lock:
+            usable = self._usable()
+            state = self._state
+            if usable and state == "ready":
+                prefix = prefix.lower()
+                # each field's run is in key order, not account_no order, so
+                # only its `limit` smallest account numbers are kept
+                candidates = set()
+                for f in ([field] if field else FIELDS):
+                    candidates.update(heapq.nsmallest(limit, self._run(f, prefix, after_ac)))
+                rows = [self._rows[a] for a in sorted(candidates)[:limit]]
+                self._stats["hits"] += 1
+                return rows
+            self._stats["misses"] += 1
+
+        if not usable:
+            self._refresh_in_background()
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "enabled": settings.SEARCH_INDEX_ENABLED,
+                "state": self._state,
+                "accounts": len(self._rows),
+                "age_s": round(time.monotonic() - self._built_at, 1) if self._built_at else None,
+            }
+
+
+account_index = AccountPrefixIndex()
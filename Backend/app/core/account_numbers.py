@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from typing import Tuple
+
+from app.config import settings
+from app.utils.db_errors import is_missing_function
+
+
+PREFIX = "AC"
+# New numbers are AC + 10-digit base + 1 Luhn digit (11 digits). The legacy
+# random numbers are AC + 10 digits, so the two spaces can never collide.
+BASE_OFFSET = 10**9
+GENERATED_DIGITS = 11
+
+RESERVE_ATTEMPTS = 3
+RESERVE_BACKOFF = 0.05      # seconds, grows linearly per attempt
+
+
+def luhn_check_digit(digits: str) -> int:
+    total = 0
+    # double every second digit counting from the right of the final number
+    for i, ch in enumerate(reversed(digits)):
+        d = int(ch)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return (10 - total % 10) % 10
+
+
+def is_valid_account_no(ac_no: str) -> bool:
+    """Luhn check for generated numbers (legacy 10-digit numbers have none)."""
+    if not ac_no.startswith(PREFIX):
+        return False
+    digits = ac_no[len(PREFIX):]
+    if len(digits) != GENERATED_DIGITS or not digits.isdigit():
+        return False
+    return luhn_check_digit(digits[:-1]) == int(digits[-1])
+
+
+def format_account_no(n: int) -> str:
+    base = str(BASE_OFFSET + n)
+    return f"{PREFIX}{base}{luhn_check_digit(base)}"
+
+
+class AccountNumberAllocator:
+    """
+    Hands out account numbers from blocks reserved in the DB.
+
+    reserve_account_block() returns the next value of a Postgres sequence;
+    block k owns the numbers [k * size, (k + 1) * size). Each worker process
+    reserves its own block, so numbers never collide and only one round
+    trip is needed per ACCOUNT_NO_BLOCK_SIZE accounts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = 0
+        self._end = 0
+
+    def _reserve(self, db) -> Tuple[int, int]:
+        """Retries transient failures; raises if no block can be reserved."""
+        size = settings.ACCOUNT_NO_BLOCK_SIZE
+        for attempt in range(1, RESERVE_ATTEMPTS + 1):
+            try:
+                res = db.rpc("reserve_account_block").execute()
+                break
+            except Exception as e:
+                if is_missing_function(e) or attempt == RESERVE_ATTEMPTS:
+                    raise
+                time.sleep(RESERVE_BACKOFF * attempt)
+        block = int(res.data)
+        return block * size, (block + 1) * size
+
+    def next(self, db) -> str:
+        with self._lock:
+            # a forked worker must never reuse its parent's block
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._next = self._end = 0
+
+            if self._next >= self._end:
+                self._next, self._end = self._reserve(db)
+
+            n = self._next
+            self._next += 1
+
+        return format_account_no(n)
+
+
+allocator = AccountNumberAllocator()
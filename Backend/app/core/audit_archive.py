@@ -0,0 +1,48 @@
+"""
+Chunk format for the app_audit_log_archive table (migration 0016).
+
+A chunk is up to AUDIT_ARCHIVE_PAGE_SIZE audit rows of one UTC day, taken
+in (created_at, id) order. Its rows are stored as gzip JSONL, newest row
+first, base64-encoded for the text column. Next to the data sit the
+chunk's key range and its actors and actions, so reads can pick chunks
+by cursor and filter in the database.
+
+Readers stream a chunk line by line and stop as soon as the page is
+full; a chunk is never decoded into one big list.
+"""
+
+import base64
+import gzip
+import io
+import json
+from datetime import date
+from typing import Iterator, List
+
+
+def encode_chunk(day: date, rows: List[dict]) -> dict:
+    """archive_audit_chunk() parameters for `rows` (ascending (created_at, id))."""
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb") as fh:
+        for row in reversed(rows):
+            fh.write((json.dumps(row, separators=(",", ":"), default=str) + "\n").encode())
+
+    first, last = rows[0], rows[-1]
+    return {
+        "p_day": day.isoformat(),
+        "p_row_count": len(rows),
+        "p_min_created_at": first["created_at"],
+        "p_min_id": first["id"],
+        "p_max_created_at": last["created_at"],
+        "p_max_id": last["id"],
+        "p_actors": sorted({r["actor"] for r in rows if r.get("actor") is not None}),
+        "p_actions": sorted({r["action"] for r in rows if r.get("action") is not None}),
+        "p_data": base64.b64encode(buf.getvalue()).decode(),
+    }
+
+
+def iter_chunk(data: str) -> Iterator[dict]:
+    """A chunk's rows, newest first, decoded one line at a time."""
+    with gzip.GzipFile(fileobj=io.BytesIO(base64.b64decode(data)), mode="rb") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
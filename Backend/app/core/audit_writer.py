@@ -0,0 +1,220 @@
+import atexit
+import fcntl
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from typing import Callable, List
+
+from app.config import settings
+
+
+class AuditWriter:
+    """
+    Background writer for app_audit_logs.
+
+    Request threads only enqueue rows; a single worker thread flushes them
+    as multi-row inserts when BATCH_SIZE rows are waiting or FLUSH_INTERVAL
+    has passed. Rows that cannot be queued or inserted are appended to a
+    local JSONL spool file, which is replayed the next time the writer starts.
+    """
+
+    def __init__(self, client_factory: Callable = None):
+        self._client_factory = client_factory
+        self._queue: queue.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._pid = None
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "spooled": 0,
+            "replayed": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "flush_failures": 0,
+        }
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+
+            # fresh queue + thread per worker process (gunicorn forks)
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=settings.AUDIT_QUEUE_SIZE)
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="audit-writer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Flush everything still queued, then stop the worker."""
+        thread = self._thread
+        if not thread or self._pid != os.getpid():
+            return
+
+        self._stop.set()
+        thread.join(timeout)
+
+        # anything the worker could not drain in time goes to the spool
+        leftovers = self._drain(self._queue.qsize())
+        if leftovers:
+            self._spool(leftovers)
+
+    # ---------------- PRODUCER ----------------
+    def submit(self, row: dict):
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+            self._bump("enqueued")
+        except queue.Full:
+            self._spool([row])
+
+    # ---------------- WORKER ----------------
+    def _run(self):
+        self._replay_spool()
+
+        batch_size = settings.AUDIT_BATCH_SIZE
+        interval = settings.AUDIT_FLUSH_INTERVAL
+
+        while not self._stop.is_set():
+            batch = []
+            deadline = time.monotonic() + interval
+
+            while len(batch) < batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._flush(batch)
+
+        # flush-on-shutdown
+        while True:
+            batch = self._drain(batch_size)
+            if not batch:
+                break
+            self._flush(batch)
+
+    def _drain(self, limit: int) -> List[dict]:
+        rows = []
+        while len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _flush(self, rows: List[dict]) -> bool:
+        try:
+            client = self._client_factory()
+            client.table("app_audit_logs").insert(rows).execute()
+        except Exception as e:
+            print(f"[AUDIT ERROR] {e}")
+            self._bump("flush_failures")
+            self._spool(rows)
+            return False
+
+        self._bump("flushes")
+        self._bump("written", len(rows))
+        return True
+
+    # ---------------- SPOOL ----------------
+    def _spool(self, rows: List[dict]):
+        try:
+            with self._spool_lock, open(settings.AUDIT_SPOOL_PATH, "a", encoding="utf-8") as fh:
+                for row in rows:
+                    fh.write(json.dumps(row, default=str) + "\n")
+            self._bump("spooled", len(rows))
+        except Exception as e:
+            print(f"[AUDIT SPOOL ERROR] {e}")
+            self._bump("dropped", len(rows))
+
+    def _replay_spool(self):
+        """
+        Replays the spool, plus any `.replay` file a worker claimed but died
+        before finishing. Replay is at-least-once: a file cut short mid-way
+        is replayed again from the start.
+        """
+        path = settings.AUDIT_SPOOL_PATH
+
+        # claim the file so concurrent workers never replay the same rows
+        claimed = f"{path}.{os.getpid()}.replay"
+        if os.path.exists(path):
+            try:
+                with self._spool_lock:
+                    os.replace(path, claimed)
+            except OSError:
+                pass
+
+        for leftover in sorted(glob.glob(f"{glob.escape(path)}.*.replay")):
+            self._replay_file(leftover)
+
+    def _replay_file(self, claimed: str):
+        try:
+            fh = open(claimed, encoding="utf-8")
+        except OSError:
+            return
+
+        with fh:
+            # held for the whole replay and released if this process dies, so
+            # a lockable file nobody is replaying is an orphan we can take over
+            try:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return
+            if os.fstat(fh.fileno()).st_nlink == 0:
+                return      # finished and removed by another worker after we opened it
+
+            batch = []
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    continue
+
+                if len(batch) >= settings.AUDIT_BATCH_SIZE:
+                    if self._flush(batch):
+                        self._bump("replayed", len(batch))
+                    batch = []
+
+            if batch and self._flush(batch):
+                self._bump("replayed", len(batch))
+
+            # failed batches were re-spooled by _flush
+            os.remove(claimed)
+
+    # ---------------- STATS ----------------
+    def _bump(self, key: str, n: int = 1):
+        with self._lock:
+            self._stats[key] += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._stats)
+        data["queue_depth"] = self._queue.qsize() if self._queue else 0
+        data["queue_max"] = settings.AUDIT_QUEUE_SIZE
+        return data
+
+
+def _service_client():
+    from app.core.supabase_client import get_service_client
+    return get_service_client()
+
+
+audit_writer = AuditWriter(client_factory=_service_client)
+atexit.register(audit_writer.stop)
@@ -0,0 +1,46 @@
+from typing import Any, Dict, Optional, Protocol
+
+
+class QueryResult(Protocol):
+    data: Any
+    count: Optional[int]
+
+
+class Query(Protocol):
+    """
+    The PostgREST builder subset the services use. Filters and modifiers
+    return the builder itself; execute() runs the request.
+    """
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "Query": ...
+    def insert(self, rows: Any) -> "Query": ...
+    def upsert(self, rows: Any, on_conflict: str = "") -> "Query": ...
+    def update(self, values: Dict[str, Any]) -> "Query": ...
+    def delete(self) -> "Query": ...
+
+    def eq(self, column: str, value: Any) -> "Query": ...
+    def neq(self, column: str, value: Any) -> "Query": ...
+    def gt(self, column: str, value: Any) -> "Query": ...
+    def gte(self, column: str, value: Any) -> "Query": ...
+    def lt(self, column: str, value: Any) -> "Query": ...
+    def lte(self, column: str, value: Any) -> "Query": ...
+    def like(self, column: str, pattern: str) -> "Query": ...
+    def ilike(self, column: str, pattern: str) -> "Query": ...
+    def in_(self, column: str, values: list) -> "Query": ...
+    def or_(self, filters: str) -> "Query": ...
+
+    def order(self, column: str, desc: bool = False) -> "Query": ...
+    def limit(self, size: int) -> "Query": ...
+    def single(self) -> "Query": ...
+
+    def execute(self) -> QueryResult: ...
+
+
+class DataClient(Protocol):
+    """
+    What the services need from `db`. Implemented by supabase.Client
+    (DB_BACKEND=supabase) and by SQLiteClient (DB_BACKEND=sqlite).
+    """
+
+    def table(self, name: str) -> Query: ...
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> Query: ...
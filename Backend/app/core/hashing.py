@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import List
+
+from bcrypt import hashpw, gensalt, checkpw
+
+from app.config import settings
+from app.core.metrics import observe_bcrypt
+
+
+class HashQueueFull(RuntimeError):
+    """Raised when the bcrypt pool stays saturated past HASH_QUEUE_TIMEOUT."""
+
+
+class HashExecutor:
+    """
+    Bounded pool for bcrypt work.
+
+    bcrypt releases the GIL, so a pool sized to the CPU count keeps every
+    core busy while capping how much hashing can run at once. At most
+    HASH_QUEUE_SIZE jobs may wait behind the running ones; beyond that
+    callers block up to HASH_QUEUE_TIMEOUT and then get HashQueueFull.
+    Bulk hashing (hash_many) keeps at most half the workers busy, so
+    logins and PIN checks still get slots during an import.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots: threading.BoundedSemaphore | None = None
+        self._pid = None
+        self._workers = 1
+        self._timings = {}
+
+    def _ensure_pool(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                return
+
+            workers = settings.HASH_WORKERS or os.cpu_count() or 1
+            self._workers = workers
+            self._pid = os.getpid()
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+            self._slots = threading.BoundedSemaphore(workers + settings.HASH_QUEUE_SIZE)
+
+    def start(self):
+        """Build this worker's pool now instead of on the first hash (warmup)."""
+        self._ensure_pool()
+
+    def _submit(self, op: str, fn) -> Future:
+        self._ensure_pool()
+
+        if not self._slots.acquire(timeout=settings.HASH_QUEUE_TIMEOUT):
+            self._record(op, None)
+            raise HashQueueFull("Hashing pool is saturated")
+
+        def job():
+            start = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                self._record(op, time.perf_counter() - start)
+                self._slots.release()
+
+        return self._pool.submit(job)
+
+    def _run(self, op: str, fn):
+        return self._submit(op, fn).result()
+
+    # ---------------- BCRYPT ----------------
+    def hash(self, secret: str, rounds: int | None = None) -> str:
+        rounds = rounds or settings.BCRYPT_ROUNDS
+        return self._run("hash", lambda: hashpw(secret.encode(), gensalt(rounds)).decode())
+
+    def hash_many(self, secrets: List[str], rounds: int | None = None) -> List[str]:
+        """
+        Hashes in order with at most half the workers in flight. On a
+        failure the queued hashes are cancelled and the running ones
+        drained before the error is raised.
+        """
+        rounds = rounds or settings.BCRYPT_ROUNDS
+        self._ensure_pool()
+        limit = max(1, self._workers // 2)
+
+        in_flight: deque = deque()
+        results: List[str] = []
+        try:
+            for secret in secrets:
+                if len(in_flight) >= limit:
+                    results.append(in_flight.popleft().result())
+                in_flight.append(
+                    self._submit("hash", lambda s=secret: hashpw(s.encode(), gensalt(rounds)).decode())
+                )
+            while in_flight:
+                results.append(in_flight.popleft().result())
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            wait(in_flight)
+            raise
+        return results
+
+    def verify(self, secret: str, hashed: str) -> bool:
+        return self._run("verify", lambda: checkpw(secret.encode(), hashed.encode()))
+
+    # ---------------- STATS ----------------
+    def _record(self, op: str, seconds: float | None):
+        observe_bcrypt(op, seconds)
+        with self._lock:
+            t = self._timings.setdefault(
+                op, {"count": 0, "rejected": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            if seconds is None:
+                t["rejected"] += 1
+                return
+            ms = seconds * 1000
+            t["count"] += 1
+            t["total_ms"] += ms
+            t["max_ms"] = max(t["max_ms"], ms)
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = {}
+            for op, t in self._timings.items():
+                data[op] = {
+                    **t,
+                    "total_ms": round(t["total_ms"], 3),
+                    "max_ms": round(t["max_ms"], 3),
+                    "avg_ms": round(t["total_ms"] / t["count"], 3) if t["count"] else 0.0,
+                }
+        data["rounds"] = settings.BCRYPT_ROUNDS
+        data["workers"] = settings.HASH_WORKERS or os.cpu_count() or 1
+        return data
+
+
+def hash_cost(hashed: str) -> int | None:
+    """Cost factor of a '$2b$12$...' hash, or None if unparseable."""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed: str) -> bool:
+    return hash_cost(hashed) != settings.BCRYPT_ROUNDS
+
+
+hasher = HashExecutor()
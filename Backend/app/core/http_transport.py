@@ -0,0 +1,37 @@
+"""
+Pooled httpx transport with counters, used by the Supabase client registry.
+Kept apart from supabase_client so httpx loads with the first client.
+"""
+
+import httpx
+
+
+class CountingTransport(httpx.BaseTransport):
+    """
+    Wraps the pooled httpx transport and counts requests, new TCP
+    connections and requests that had to wait for a free pool slot.
+    """
+
+    def __init__(self, registry, limits: httpx.Limits):
+        self._registry = registry
+        self._limits = limits
+        self._inner = httpx.HTTPTransport(limits=limits)
+
+    def _trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            self._registry._bump("connections_opened")
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions["trace"] = self._trace
+        self._registry._enter(self._limits.max_connections)
+        try:
+            return self._inner.handle_request(request)
+        finally:
+            self._registry._leave()
+
+    def pool_size(self) -> int:
+        pool = getattr(self._inner, "_pool", None)
+        return len(getattr(pool, "connections", []) or [])
+
+    def close(self):
+        self._inner.close()
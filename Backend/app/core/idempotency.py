@@ -0,0 +1,255 @@
+"""
+Idempotency-Key support for money-moving routes.
+
+The first request for a key runs normally. If its response is final (a
+success or a business rejection) it is kept for IDEMPOTENCY_TTL seconds,
+and a retry with the same key and payload gets it back without running
+the view. A retry that arrives while the original is still running waits
+for it, up to IDEMPOTENCY_WAIT seconds. Reusing a key with a different
+payload is a 422.
+
+A failed request ("Try again." messages, 409/429, 5xx, an exception)
+only releases its key if it failed before the money write: services call
+write_started() right before the money RPC. After that the write may
+have committed, so the key keeps an "outcome unknown" response and a
+retry never posts the money twice.
+
+Keys are scoped per user and path and live in the idempotency_keys table
+(migration 0015), so a retry is caught whichever worker it lands on.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+from typing import Optional, Tuple
+
+from flask import Response, g, has_app_context, jsonify, make_response, request
+
+from app.config import settings
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+IDEMPOTENCY_CALLS = 2         # DB round trips a keyed request adds: claim + finish
+
+# a retry of these can succeed: not replayed unless the write had started
+RETRYABLE_STATUSES = {408, 409, 425, 429}
+UNKNOWN_OUTCOME = (
+    "The original request with this Idempotency-Key failed after the money write started; "
+    "check the account history before retrying with a new key."
+)
+POLL_INTERVAL = 0.05          # seconds, doubles up to POLL_MAX while waiting
+POLL_MAX = 0.5
+
+logger = logging.getLogger("rupeewave.idempotency")
+
+
+class _Stored:
+    __slots__ = ("fingerprint", "status", "body", "mimetype")
+
+    def __init__(self, fingerprint: str, status: int, body: bytes, mimetype: str):
+        self.fingerprint = fingerprint
+        self.status = status
+        self.body = body
+        self.mimetype = mimetype
+
+
+class IdempotencyStore:
+    """
+    Claims keys with claim_idempotency_key(): the primary key on
+    (user, path, key) makes exactly one request the owner. The owner
+    stores the final response on the row, or deletes the row so a retry
+    can run again.
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {"originals": 0, "replays": 0, "waits": 0, "timeouts": 0, "mismatches": 0, "finish_failures": 0}
+
+    def _bump(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _claim(self, db, scope: Tuple[str, str, str], fingerprint: str) -> dict:
+        user, path, key = scope
+        return db.rpc("claim_idempotency_key", {
+            "p_user": user,
+            "p_path": path,
+            "p_key": key,
+            "p_fingerprint": fingerprint,
+            "p_ttl_seconds": int(self._ttl),
+        }).execute().data
+
+    # ---------------- LIFECYCLE ----------------
+    def begin(self, db, scope: Tuple[str, str, str], fingerprint: str, wait: float) -> Tuple[str, Optional[_Stored]]:
+        """
+        Returns ("run", None) when the caller owns the key and must finish() it,
+        ("replay", stored), ("mismatch", None) or ("busy", None).
+        """
+        deadline = time.monotonic() + wait
+        delay = POLL_INTERVAL
+        waited = False
+        while True:
+            row = self._claim(db, scope, fingerprint)
+            if row["claimed"]:
+                with self._lock:
+                    self._stats["originals"] += 1
+                    self._in_flight += 1
+                return "run", None
+
+            # fingerprint None: released between our insert and read, claim again
+            if row["fingerprint"] is not None:
+                if row["fingerprint"] != fingerprint:
+                    self._bump("mismatches")
+                    return "mismatch", None
+                if row["response_status"] is not None:
+                    self._bump("replays")
+                    return "replay", _Stored(
+                        fingerprint, row["response_status"], row["response_body"].encode(), row["mimetype"],
+                    )
+
+            # in flight (maybe on another worker) or just released: same deadline and backoff
+            if not waited:
+                waited = True
+                self._bump("waits")
+            if time.monotonic() + delay > deadline:
+                self._bump("timeouts")
+                return "busy", None
+            time.sleep(delay)
+            delay = min(delay * 2, POLL_MAX)
+
+    def finish(self, db, scope: Tuple[str, str, str], stored: Optional[_Stored]):
+        """Store the outcome, or release the key (None = a retry should run)."""
+        with self._lock:
+            self._in_flight -= 1
+
+        user, path, key = scope
+        table = db.table("idempotency_keys")
+        query = table.delete() if stored is None else table.update({
+            "response_status": stored.status,
+            "response_body": stored.body.decode(),
+            "mimetype": stored.mimetype,
+        })
+        try:
+            query.eq("user_id", user).eq("path", path).eq("key", key).execute()
+        except Exception as e:
+            # the response stands; the key stays in flight (409) until it expires
+            self._bump("finish_failures")
+            logger.warning("idempotency key %s not finished: %s", scope, e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._stats)
+            data["in_flight"] = self._in_flight
+        return data
+
+
+store = IdempotencyStore(ttl=settings.IDEMPOTENCY_TTL)
+
+
+# ---------------- REQUEST HELPERS ----------------
+def _scope() -> Tuple[Optional[tuple], Optional[Response]]:
+    raw = request.headers.get(IDEMPOTENCY_HEADER)
+    if raw is None:
+        return None, None
+
+    raw = raw.strip()
+    if not raw or len(raw) > MAX_KEY_LENGTH or not raw.isprintable():
+        return None, (jsonify({"detail": f"Invalid {IDEMPOTENCY_HEADER} header"}), 400)
+
+    user = g.get("current_user") or {}
+    return (user.get("sub", "-"), request.path, raw), None
+
+
+def _fingerprint() -> str:
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _early_response(outcome: str, stored: Optional[_Stored]):
+    if outcome == "replay":
+        response = Response(stored.body, status=stored.status, mimetype=stored.mimetype)
+        response.headers[REPLAYED_HEADER] = "true"
+        return response
+    if outcome == "mismatch":
+        return jsonify({"detail": f"{IDEMPOTENCY_HEADER} was already used with a different request"}), 422
+    return jsonify({"detail": "A request with this Idempotency-Key is still in progress"}), 409
+
+
+def _is_final(response: Response) -> bool:
+    """A success or a business rejection; not a transient failure."""
+    status = response.status_code
+    if status >= 500 or status in RETRYABLE_STATUSES or response.is_streamed:
+        return False
+    if status < 400:
+        return True
+    detail = (response.get_json(silent=True) or {}).get("detail")
+    # "Server busy. Try again.", "Server error. Try again.", "... Try again later."
+    return not (isinstance(detail, str) and "try again" in detail.lower())
+
+
+def write_started():
+    """
+    Call right before the DB write a retry must not repeat (the money
+    RPC). From then on a failed request keeps its key.
+    """
+    if has_app_context():
+        g.idempotent_write_started = True
+
+
+def _unknown(fingerprint: str) -> _Stored:
+    body = jsonify({"detail": UNKNOWN_OUTCOME}).get_data()
+    return _Stored(fingerprint, 409, body, "application/json")
+
+
+def _capture(fingerprint: str, rv) -> Tuple[Response, Optional[_Stored]]:
+    response = make_response(rv)
+    if _is_final(response):
+        return response, _Stored(fingerprint, response.status_code, response.get_data(), response.mimetype)
+    if g.get("idempotent_write_started"):
+        return response, _unknown(fingerprint)
+    return response, None
+
+
+# ---------------- DECORATOR ----------------
+def idempotent(fn):
+    """
+    Honour Idempotency-Key on a view. Put it under roles_required so keys
+    are scoped to the caller.
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        scope, error = _scope()
+        if error:
+            return error
+        if scope is None:
+            return fn(*args, **kwargs)
+
+        db = g.service
+        fingerprint = _fingerprint()
+        outcome, stored = store.begin(db, scope, fingerprint, settings.IDEMPOTENCY_WAIT)
+        if outcome != "run":
+            return _early_response(outcome, stored)
+
+        g.idempotent_write_started = False
+        stored = None
+        try:
+            response, stored = _capture(fingerprint, fn(*args, **kwargs))
+            return response
+        except Exception:
+            # the view raised: release the key only if no money write started
+            if g.get("idempotent_write_started"):
+                stored = _unknown(fingerprint)
+            raise
+        finally:
+            store.finish(db, scope, stored)
+
+    return wrapper
@@ -0,0 +1,54 @@
+"""
+orjson-backed Flask JSON provider (JSON_PROVIDER=orjson).
+
+Output matches Flask's DefaultJSONProvider: sorted keys, compact outside
+debug, and anything orjson can't encode natively (dates as HTTP dates,
+Decimal, Markup, ...) goes through Flask's own `default`. The one
+difference: non-ASCII text is sent as UTF-8 instead of \\u escapes.
+Responses are written as bytes, with no str round trip.
+"""
+
+import orjson
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    # datetimes/dataclasses go through `default` so they look exactly like before
+    options = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+    def _encode(self, obj, indent: bool = False) -> bytes:
+        option = self.options | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs.keys() - {"indent", "separators", "default"}:
+            return super().dumps(obj, **kwargs)  # stdlib-only options
+        return self._encode(obj, indent=bool(kwargs.get("indent"))).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+PROVIDERS = {
+    "orjson": OrjsonProvider,
+    "stdlib": DefaultJSONProvider,
+}
+
+
+def install_json_provider(app: Flask, name: str) -> Flask:
+    app.json_provider_class = PROVIDERS[name]
+    app.json = app.json_provider_class(app)
+    return app
@@ -0,0 +1,189 @@
+"""
+Prometheus metrics.
+
+Under gunicorn set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does) so every
+worker writes its samples to shared mmap files; /metrics then aggregates all
+live workers. Without it, metrics come from the current process only.
+"""
+
+import os
+import threading
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+# ---------------- HTTP ----------------
+REQUEST_LATENCY = Histogram(
+    "rupeewave_http_request_duration_seconds",
+    "Request latency by blueprint, route and status.",
+    ["blueprint", "route", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "rupeewave_http_requests_in_flight",
+    "Requests currently being handled.",
+    multiprocess_mode="livesum",
+)
+
+# ---------------- BCRYPT ----------------
+BCRYPT_SECONDS = Histogram(
+    "rupeewave_bcrypt_duration_seconds",
+    "Time spent inside bcrypt, by operation.",
+    ["op"],
+    buckets=LATENCY_BUCKETS,
+)
+BCRYPT_REJECTED = Counter(
+    "rupeewave_bcrypt_rejected_total",
+    "bcrypt jobs refused because the hashing pool was saturated.",
+    ["op"],
+)
+
+# ---------------- DATABASE ----------------
+DB_SECONDS = Histogram(
+    "rupeewave_db_call_duration_seconds",
+    "PostgREST round-trip latency by table / RPC.",
+    ["kind", "target", "ok"],
+    buckets=DB_BUCKETS,
+)
+
+# ---------------- PROCESS STATE (refreshed, not event driven) ----------------
+AUDIT_QUEUE_DEPTH = Gauge(
+    "rupeewave_audit_queue_depth",
+    "Audit rows waiting for the background writer.",
+    multiprocess_mode="livesum",
+)
+AUDIT_SPOOLED = Gauge(
+    "rupeewave_audit_spooled_rows",
+    "Audit rows spooled to disk because the queue was full or the DB failed.",
+    multiprocess_mode="livesum",
+)
+CACHE_HITS = Gauge(
+    "rupeewave_cache_hits", "Cache hits.", ["cache"], multiprocess_mode="livesum"
+)
+CACHE_MISSES = Gauge(
+    "rupeewave_cache_misses", "Cache misses.", ["cache"], multiprocess_mode="livesum"
+)
+CACHE_HIT_RATIO = Gauge(
+    "rupeewave_cache_hit_ratio", "Per-process cache hit ratio.", ["cache"], multiprocess_mode="liveall"
+)
+CACHE_STALE = Gauge(
+    "rupeewave_cache_stale_skips",
+    "Cached account snapshots skipped because the DB version had moved on.",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+
+# ---------------- RECORDERS ----------------
+def observe_request(blueprint, route, method, status, seconds: float):
+    REQUEST_LATENCY.labels(blueprint or "", route or "unmatched", method, str(status)).observe(seconds)
+
+
+def observe_bcrypt(op: str, seconds: float | None):
+    if seconds is None:
+        BCRYPT_REJECTED.labels(op).inc()
+    else:
+        BCRYPT_SECONDS.labels(op).observe(seconds)
+
+
+def observe_db(kind: str, target: str, seconds: float, ok: bool):
+    DB_SECONDS.labels(kind, target, "true" if ok else "false").observe(seconds)
+
+
+_refresh_lock = threading.Lock()
+_last_refresh = 0.0
+
+
+def refresh_process_gauges(force: bool = False, every: float = 1.0):
+    """Copy audit-writer and cache stats into gauges, at most once per `every` seconds."""
+    global _last_refresh
+    now = time.monotonic()
+    if not force and now - _last_refresh < every:
+        return
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        _last_refresh = now
+
+        from app.core.account_cache import account_cache
+        from app.core.audit_writer import audit_writer
+        from app.core.user_cache import role_cache
+
+        audit = audit_writer.stats()
+        AUDIT_QUEUE_DEPTH.set(audit.get("queue_depth", 0))
+        AUDIT_SPOOLED.set(audit.get("spooled", 0))
+
+        for name, cache in {"user_role": role_cache, "account_snapshot": account_cache}.items():
+            stats = cache.stats()
+            CACHE_HITS.labels(name).set(stats["hits"])
+            CACHE_MISSES.labels(name).set(stats["misses"])
+            CACHE_HIT_RATIO.labels(name).set(stats["hit_ratio"])
+            if "stale" in stats:
+                CACHE_STALE.labels(name).set(stats["stale"])
+    finally:
+        _refresh_lock.release()
+
+
+# ---------------- EXPOSITION ----------------
+def render() -> tuple[bytes, str]:
+    refresh_process_gauges(force=True)
+
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """gunicorn child_exit hook: drop a dead worker's live gauges."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
+
+
+# ---------------- MIDDLEWARE ----------------
+def attach_metrics(app):
+    """Times every request and tracks in-flight requests."""
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_in_flight = True
+        IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get("metrics_started")
+        if started is not None:
+            rule = request.url_rule.rule if request.url_rule else None
+            observe_request(
+                request.blueprint, rule, request.method, response.status_code,
+                time.perf_counter() - started,
+            )
+        refresh_process_gauges()
+        return response
+
+    @app.teardown_request
+    def leave(exc):
+        if g.pop("metrics_in_flight", False):
+            IN_FLIGHT.dec()
+
+    return app
@@ -1,16 +1,33 @@
-from flask import g
+from functools import cached_property
+
+from flask.ctx import _AppCtxGlobals
+
+from app.core.query_tracking import TrackedClient
 from app.core.supabase_client import get_public_client, get_service_client
 
 
+class SupabaseGlobals(_AppCtxGlobals):
+    """
+    Flask 'g' with lazily attached Supabase clients.
+    A client is only looked up the first time a route touches g.supabase
+    or g.service, so routes like /auth/health never pay for one. Both are
+    wrapped so every round trip is counted (see app/core/query_tracking.py).
+    """
+
+    @cached_property
+    def supabase(self):
+        return TrackedClient(get_public_client())
+
+    @cached_property
+    def service(self):
+        return TrackedClient(get_service_client())
+
+
 def attach_supabase_middleware(app):
     """
     Flask equivalent of the FastAPI middleware.
     Uses Flask's 'g' context object for per-request storage.
     """
 
-    @app.before_request
-    def add_supabase_clients():
-        g.supabase = get_public_client()
-        g.service = get_service_client()
-
+    app.app_ctx_globals_class = SupabaseGlobals
     return app
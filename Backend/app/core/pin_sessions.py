@@ -0,0 +1,86 @@
+import hashlib
+import time
+import uuid
+from datetime import datetime, UTC
+from typing import Dict, Any
+
+from app.config import settings
+from app.utils.jwt_tools import ALGORITHM
+
+
+PIN_SESSION_HEADER = "X-PIN-Session"
+
+# Revocation lives in the DB (accounts.pin_sessions_revoked_at, 0014), so it
+# holds on every worker: a session issued at or before that instant is dead.
+# Every use already re-reads the account row, which carries the column.
+REVOKED_COLUMN = "pin_sessions_revoked_at"
+
+
+def pin_fingerprint(stored_hash: str) -> str:
+    """Short digest of the stored PIN hash; changes whenever the PIN does."""
+    return hashlib.sha256(stored_hash.encode()).hexdigest()[:16]
+
+
+def issue(ac_no: str, sid: str, stored_hash: str) -> str:
+    import jwt  # lazy, see jwt_tools
+    now = time.time()
+    return jwt.encode({
+        "type": "pin_session",
+        "acc": ac_no,
+        "sid": str(sid),
+        "pv": pin_fingerprint(stored_hash),
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": int(now + settings.PIN_SESSION_TTL),
+    }, settings.JWT_SECRET, algorithm=ALGORITHM)
+
+
+def decode(token: str) -> Dict[str, Any] | None:
+    import jwt
+    try:
+        claims = jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+    return claims if claims.get("type") == "pin_session" else None
+
+
+def validate(token: str, ac_no: str, sid: str | None) -> Dict[str, Any] | None:
+    """
+    Signature, expiry and scope (account + login session). The caller still
+    has to check the account row: is_revoked() and claims["pv"] against the
+    stored PIN hash.
+    """
+    claims = decode(token)
+    if not claims or not sid:
+        return None
+    if claims.get("acc") != ac_no or claims.get("sid") != str(sid):
+        return None
+    return claims
+
+
+def is_revoked(claims: Dict[str, Any], revoked_at) -> bool:
+    if not revoked_at:
+        return False
+    return claims.get("iat", 0) <= datetime.fromisoformat(str(revoked_at)).timestamp()
+
+
+def revocation() -> Dict[str, str]:
+    """Column update that revokes every session issued so far; merge it into an account write."""
+    return {REVOKED_COLUMN: datetime.now(UTC).isoformat(timespec="microseconds")}
+
+
+def revoke_account(db, ac_no: str):
+    """Invalidate every session issued so far for this account, on every worker."""
+    db.table("accounts").update(revocation()).eq("account_no", ac_no).execute()
+
+
+def revoke(db, token: str) -> bool:
+    """
+    Ends the session. Revocation is per account, so this also ends any
+    other PIN session open on the same account; those re-enter the PIN.
+    """
+    claims = decode(token)
+    if not claims:
+        return False
+    revoke_account(db, claims["acc"])
+    return True
@@ -0,0 +1,191 @@
+"""
+Per-request DB call accounting.
+
+Every table()/rpc() request issued through g.supabase / g.service is timed
+and attributed to its target (and fed to the DB latency histogram). After each request the totals go out as a
+Server-Timing header and one structured log line, and routes decorated
+with @query_budget(n) are checked against their declared round-trip budget.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from flask import g, has_app_context, request
+
+from app.config import settings
+from app.core.metrics import observe_db
+
+
+logger = logging.getLogger("rupeewave.requests")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A route issued more DB calls than its @query_budget allows."""
+
+
+# ---------------- PER-REQUEST STATS ----------------
+class QueryStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.calls: List[tuple] = []   # (kind, target, ms, ok)
+
+    def record(self, kind: str, target: str, ms: float, ok: bool):
+        self.calls.append((kind, target, ms, ok))
+
+    @property
+    def count(self) -> int:
+        return len(self.calls)
+
+    @property
+    def db_ms(self) -> float:
+        return sum(c[2] for c in self.calls)
+
+    def by_target(self) -> Dict[str, dict]:
+        out: Dict[str, dict] = {}
+        for kind, target, ms, _ in self.calls:
+            t = out.setdefault(f"{kind}:{target}", {"count": 0, "ms": 0.0})
+            t["count"] += 1
+            t["ms"] = round(t["ms"] + ms, 3)
+        return out
+
+
+def current_stats() -> Optional[QueryStats]:
+    if not has_app_context():
+        return None
+    return g.get("db_stats")
+
+
+# ---------------- CLIENT PROXIES ----------------
+class TrackedQuery:
+    """
+    Wraps a PostgREST request builder. Chained calls stay wrapped, and
+    execute() is timed into the current request's QueryStats.
+    """
+
+    def __init__(self, inner: Any, kind: str, target: str):
+        self._inner = inner
+        self._kind = kind
+        self._target = target
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._inner, name)
+        if not callable(attr):
+            # e.g. the `.not_` property, which returns a builder
+            return TrackedQuery(attr, self._kind, self._target) if hasattr(attr, "execute") else attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # builders return a (possibly new) builder; keep tracking it
+            if hasattr(result, "execute") and not isinstance(result, TrackedQuery):
+                return TrackedQuery(result, self._kind, self._target)
+            return result
+
+        return call
+
+    def execute(self):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = self._inner.execute()
+            ok = True
+            return result
+        finally:
+            seconds = time.perf_counter() - start
+            observe_db(self._kind, self._target, seconds, ok)
+            stats = current_stats()
+            if stats is not None:
+                stats.record(self._kind, self._target, seconds * 1000, ok)
+
+
+class TrackedClient:
+    """Drop-in for a supabase.Client / SQLiteClient that tracks table() and rpc()."""
+
+    def __init__(self, inner: Any):
+        self._inner = inner
+
+    def table(self, name: str) -> TrackedQuery:
+        return TrackedQuery(self._inner.table(name), "table", name)
+
+    def from_(self, name: str) -> TrackedQuery:
+        return self.table(name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None, **kwargs) -> TrackedQuery:
+        return TrackedQuery(self._inner.rpc(fn, params or {}, **kwargs), "rpc", fn)
+
+    def __getattr__(self, name: str):
+        return getattr(self._inner, name)
+
+
+# ---------------- BUDGETS ----------------
+def query_budget(max_calls: Union[int, Callable[[], int]]):
+    """
+    Declares how many DB round trips a route may make. Place it directly
+    under @bp.route so the attribute lands on the registered view. A
+    callable is evaluated per request, for budgets that follow settings.
+    """
+
+    def decorator(fn):
+        fn.query_budget = max_calls
+        return fn
+
+    return decorator
+
+
+def route_budget(app, endpoint: Optional[str]) -> Optional[int]:
+    view = app.view_functions.get(endpoint) if endpoint else None
+    budget = getattr(view, "query_budget", None)
+    return budget() if callable(budget) else budget
+
+
+# ---------------- MIDDLEWARE ----------------
+def attach_query_tracking(app):
+    """
+    Adds Server-Timing and a structured log line to every response, and
+    checks @query_budget (raising when QUERY_BUDGET_ENFORCE is on).
+    """
+
+    @app.before_request
+    def start_tracking():
+        g.db_stats = QueryStats()
+
+    @app.after_request
+    def report_queries(response):
+        stats = g.get("db_stats")
+        if stats is None:
+            return response
+
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats.db_ms:.2f};desc="{stats.count} calls", app;dur={total_ms:.2f}',
+        )
+
+        budget = route_budget(app, request.endpoint)
+        over = budget is not None and stats.count > budget
+
+        if over or logger.isEnabledFor(logging.INFO):
+            logger.log(
+                logging.WARNING if over else logging.INFO,
+                json.dumps({
+                    "event": "request",
+                    "method": request.method,
+                    "endpoint": request.endpoint,
+                    "status": response.status_code,
+                    "duration_ms": round(total_ms, 3),
+                    "db_calls": stats.count,
+                    "db_ms": round(stats.db_ms, 3),
+                    "db_budget": budget,
+                    "db_targets": stats.by_target(),
+                }),
+            )
+
+        if over and settings.QUERY_BUDGET_ENFORCE:
+            raise QueryBudgetExceeded(
+                f"{request.endpoint} made {stats.count} DB calls (budget {budget}): "
+                f"{', '.join(stats.by_target())}"
+            )
+        return response
+
+    return app
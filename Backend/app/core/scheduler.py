@@ -0,0 +1,148 @@
+"""
+Standing instruction scheduler.
+
+The durable queue is the database: standing_instructions.next_run_at with a
+partial index over active rows, which run_standing_instructions() reads in
+due order and claims with SKIP LOCKED (so several workers can tick at once).
+
+This class only decides *when* to tick. It keeps a min-heap of the next
+SCHEDULER_LOOKAHEAD due times, sleeps until the earliest one (or at most
+SCHEDULER_TICK_SECONDS), then drains what is due in SCHEDULER_BATCH_SIZE
+batches, capped at SCHEDULER_MAX_PER_TICK per tick; anything left over is
+picked up on the next tick. New instructions are pushed in via notify().
+"""
+
+import heapq
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from app.config import settings
+
+
+def _epoch(at: str) -> float:
+    return datetime.fromisoformat(at).timestamp()
+
+
+class InstructionScheduler:
+    def __init__(self, client_factory: Callable = None):
+        self._client_factory = client_factory
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid = None
+        self._heap: List[Tuple[float, int]] = []
+        self._stats = {
+            "ticks": 0,
+            "processed": 0,
+            "done": 0,
+            "retry": 0,
+            "missed": 0,
+            "failed": 0,
+            "tick_failures": 0,
+            "last_tick_ms": 0.0,
+        }
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+
+            # one thread per worker process (gunicorn forks)
+            self._pid = os.getpid()
+            self._heap = []
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="si-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        thread = self._thread
+        if not thread or self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._wake.set()
+        thread.join(timeout)
+
+    # ---------------- QUEUE ----------------
+    def notify(self, instruction_id: int, next_run_at: str):
+        """A new or rescheduled instruction: wake early if it is due first."""
+        with self._lock:
+            heapq.heappush(self._heap, (_epoch(next_run_at), instruction_id))
+        self._wake.set()
+
+    def _refill(self, db):
+        from app.services.instruction_service import InstructionService
+
+        rows = InstructionService().upcoming(db, settings.SCHEDULER_LOOKAHEAD)
+        heap = [(_epoch(r["next_run_at"]), r["id"]) for r in rows]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap = heap
+
+    def _seconds_to_next(self) -> float:
+        with self._lock:
+            if not self._heap:
+                return settings.SCHEDULER_TICK_SECONDS
+            due_in = self._heap[0][0] - time.time()
+        return min(max(due_in, 0.0), settings.SCHEDULER_TICK_SECONDS)
+
+    # ---------------- TICK ----------------
+    def tick(self, db=None) -> dict:
+        """Run everything due now (up to SCHEDULER_MAX_PER_TICK) and refill the heap."""
+        from app.services.instruction_service import InstructionService
+
+        db = db or self._client()
+        service = InstructionService()
+        started = time.perf_counter()
+        summary = {"processed": 0, "done": 0, "retry": 0, "missed": 0, "failed": 0}
+
+        while summary["processed"] < settings.SCHEDULER_MAX_PER_TICK:
+            limit = min(settings.SCHEDULER_BATCH_SIZE, settings.SCHEDULER_MAX_PER_TICK - summary["processed"])
+            batch = service.run_due(db, limit)
+            summary["processed"] += batch["processed"]
+            for r in batch["results"]:
+                summary[r["outcome"]] += 1
+            if batch["processed"] < limit:
+                break
+
+        self._refill(db)
+
+        elapsed = round((time.perf_counter() - started) * 1000, 2)
+        with self._lock:
+            self._stats["ticks"] += 1
+            self._stats["last_tick_ms"] = elapsed
+            for key, n in summary.items():
+                self._stats[key] += n
+        return summary
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception:
+                with self._lock:
+                    self._stats["tick_failures"] += 1
+            self._wake.clear()
+            self._wake.wait(self._seconds_to_next())
+
+    def _client(self):
+        if self._client_factory:
+            return self._client_factory()
+        from app.core.supabase_client import get_service_client
+        return get_service_client()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "running": bool(self._thread and self._thread.is_alive()),
+                "queued": len(self._heap),
+                "next_due_in": round(self._heap[0][0] - time.time(), 2) if self._heap else None,
+            }
+
+
+scheduler = InstructionScheduler()
@@ -0,0 +1,591 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.sqlite_rpc import RPCS, db_error, now_iso
+
+
+# Mirrors the Supabase tables the backend uses (plus the migrations).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid         TEXT UNIQUE,
+    user_name   TEXT NOT NULL UNIQUE,
+    password    TEXT NOT NULL,
+    role        TEXT NOT NULL DEFAULT 'customer',
+    created_at  TEXT
+);
+
+-- Supabase keeps an auth uid per user; locally it is simply the id
+CREATE TRIGGER IF NOT EXISTS users_default_uid AFTER INSERT ON users
+WHEN NEW.uid IS NULL
+BEGIN
+    UPDATE users SET uid = CAST(NEW.id AS TEXT) WHERE id = NEW.id;
+END;
+
+CREATE TABLE IF NOT EXISTS accounts (
+    account_no       TEXT PRIMARY KEY,
+    name             TEXT NOT NULL,
+    pin              TEXT NOT NULL,
+    mobileno         TEXT,
+    gmail            TEXT,
+    balance          INTEGER NOT NULL DEFAULT 0,
+    failed_attempts  INTEGER NOT NULL DEFAULT 0,
+    is_locked        INTEGER NOT NULL DEFAULT 0,
+    locked_until     TEXT,
+    user_id          INTEGER REFERENCES users(id),
+    version          INTEGER NOT NULL DEFAULT 0,
+    pin_sessions_revoked_at TEXT,
+    created_at       TEXT
+);
+
+-- 0006: every update of an account row bumps its version
+CREATE TRIGGER IF NOT EXISTS accounts_bump_version AFTER UPDATE ON accounts
+WHEN NEW.version = OLD.version
+BEGIN
+    UPDATE accounts SET version = OLD.version + 1 WHERE account_no = NEW.account_no;
+END;
+
+CREATE TABLE IF NOT EXISTS history (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_no  TEXT NOT NULL,
+    action      TEXT NOT NULL,
+    amount      INTEGER NOT NULL DEFAULT 0,
+    context     TEXT,
+    created_at  TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS history_account_created_id_idx
+    ON history (account_no, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS app_audit_logs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    actor       TEXT,
+    action      TEXT,
+    details     TEXT,
+    ip          TEXT,
+    user_agent  TEXT,
+    created_at  TEXT NOT NULL
+);
+
+-- 0012: keyset reads, newest first, overall and per actor
+CREATE INDEX IF NOT EXISTS app_audit_logs_created_id_idx
+    ON app_audit_logs (created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS app_audit_logs_actor_created_id_idx
+    ON app_audit_logs (actor, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS sequences (
+    name   TEXT PRIMARY KEY,
+    value  INTEGER NOT NULL
+);
+
+-- 0008: standing instructions; the partial index is the scheduler's due queue
+CREATE TABLE IF NOT EXISTS standing_instructions (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    from_ac      TEXT NOT NULL,
+    to_ac        TEXT NOT NULL,
+    amount       INTEGER NOT NULL CHECK (amount > 0),
+    frequency    TEXT NOT NULL CHECK (frequency IN ('daily', 'weekly', 'monthly')),
+    start_at     TEXT NOT NULL,
+    occurrence   INTEGER NOT NULL DEFAULT 0,
+    next_run_at  TEXT NOT NULL,
+    retries      INTEGER NOT NULL DEFAULT 0,
+    status       TEXT NOT NULL DEFAULT 'active' CHECK (status IN ('active', 'cancelled', 'failed')),
+    ref          TEXT,
+    last_run_at  TEXT,
+    last_error   TEXT,
+    created_by   TEXT,
+    created_at   TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS standing_instructions_due_idx
+    ON standing_instructions (next_run_at) WHERE status = 'active';
+
+CREATE INDEX IF NOT EXISTS standing_instructions_from_ac_idx
+    ON standing_instructions (from_ac, id);
+
+-- 0009: end-of-day balances, built incrementally past a history id watermark
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    account_no  TEXT NOT NULL,
+    day         TEXT NOT NULL,
+    balance     INTEGER NOT NULL,
+    PRIMARY KEY (account_no, day)
+);
+
+CREATE TABLE IF NOT EXISTS job_watermarks (
+    name        TEXT PRIMARY KEY,
+    last_id     INTEGER NOT NULL DEFAULT 0,
+    updated_at  TEXT
+);
+
+INSERT OR IGNORE INTO job_watermarks (name) VALUES ('balance_snapshots');
+
+-- 0015: Idempotency-Key claims and stored responses
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    user_id          TEXT NOT NULL,
+    path             TEXT NOT NULL,
+    key              TEXT NOT NULL,
+    fingerprint      TEXT NOT NULL,
+    response_status  INTEGER,
+    response_body    TEXT,
+    mimetype         TEXT,
+    created_at       TEXT,
+    expires_at       TEXT NOT NULL,
+    PRIMARY KEY (user_id, path, key)
+);
+
+CREATE INDEX IF NOT EXISTS idempotency_keys_expires_idx ON idempotency_keys (expires_at);
+
+-- 0016: archived audit rows, gzip chunks of one day each
+CREATE TABLE IF NOT EXISTS app_audit_log_archive (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    day             TEXT NOT NULL,
+    row_count       INTEGER NOT NULL,
+    min_created_at  TEXT NOT NULL,
+    min_id          INTEGER NOT NULL,
+    max_created_at  TEXT NOT NULL,
+    max_id          INTEGER NOT NULL,
+    actors          TEXT NOT NULL DEFAULT '[]',
+    actions         TEXT NOT NULL DEFAULT '[]',
+    data            TEXT NOT NULL,
+    archived_at     TEXT
+);
+
+CREATE INDEX IF NOT EXISTS app_audit_log_archive_min_key_idx
+    ON app_audit_log_archive (min_created_at DESC, min_id DESC);
+"""
+
+BOOL_COLUMNS = {"accounts": {"is_locked"}}
+JSON_COLUMNS = {"history": {"context"}, "app_audit_log_archive": {"actors", "actions"}}
+
+IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _ident(name: str) -> str:
+    name = name.strip()
+    if not IDENT.match(name):
+        raise db_error(f"Invalid identifier: {name!r}", "42601")
+    return name
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _split_top(expr: str) -> List[str]:
+    """Split a PostgREST logic expression on top-level commas."""
+    parts, buf, depth, quoted, escaped = [], [], 0, False, False
+    for ch in expr:
+        if escaped:
+            buf.append(ch)
+            escaped = False
+            continue
+        if ch == "\\" and quoted:
+            buf.append(ch)
+            escaped = True
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append("".join(buf))
+            buf = []
+            continue
+        buf.append(ch)
+    if buf:
+        parts.append("".join(buf))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+class LocalResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class SQLiteQuery:
+    """PostgREST-style request builder over one SQLite table."""
+
+    def __init__(self, client: "SQLiteClient", table: str):
+        self._client = client
+        self._table = _ident(table)
+        self._op = "select"
+        self._columns = "*"
+        self._count = None
+        self._values: Any = None
+        self._on_conflict = ""
+        self._where: List[Tuple[str, list]] = []
+        self._order: List[str] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+        self._single = False
+
+    # ---------------- OPERATIONS ----------------
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self._columns = columns or "*"
+        self._count = count
+        return self
+
+    def insert(self, rows: Any):
+        self._op, self._values = "insert", rows
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = ""):
+        self._op, self._values, self._on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values: Dict[str, Any]):
+        self._op, self._values = "update", values
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # ---------------- FILTERS ----------------
+    def _filter(self, column: str, op: str, value: Any) -> Tuple[str, list]:
+        column = _ident(column)
+        if op in OPERATORS:
+            return f"{column} {OPERATORS[op]} ?", [_encode(value)]
+        if op in ("like", "ilike"):
+            # SQLite LIKE is case-insensitive for ASCII
+            return f"{column} LIKE ?", [value]
+        if op == "in":
+            values = list(value)
+            if not values:
+                return "0", []
+            return f"{column} IN ({', '.join('?' for _ in values)})", [_encode(v) for v in values]
+        if op == "is":
+            keyword = {"null": "NULL", "true": "1", "false": "0"}.get(str(value).lower())
+            if keyword is None:
+                raise db_error(f"Invalid is value: {value!r}", "42601")
+            return (f"{column} IS {keyword}", []) if keyword == "NULL" else (f"{column} = {keyword}", [])
+        raise db_error(f"Unsupported operator: {op}", "42601")
+
+    def _add(self, column: str, op: str, value: Any):
+        self._where.append(self._filter(column, op, value))
+        return self
+
+    def eq(self, column, value): return self._add(column, "eq", value)
+    def neq(self, column, value): return self._add(column, "neq", value)
+    def gt(self, column, value): return self._add(column, "gt", value)
+    def gte(self, column, value): return self._add(column, "gte", value)
+    def lt(self, column, value): return self._add(column, "lt", value)
+    def lte(self, column, value): return self._add(column, "lte", value)
+    def like(self, column, pattern): return self._add(column, "like", pattern)
+    def ilike(self, column, pattern): return self._add(column, "ilike", pattern)
+    def in_(self, column, values): return self._add(column, "in", values)
+    def is_(self, column, value): return self._add(column, "is", value)
+
+    def _logic(self, expr: str, joiner: str) -> Tuple[str, list]:
+        fragments, params = [], []
+        for term in _split_top(expr):
+            if term.startswith("and(") and term.endswith(")"):
+                sql, args = self._logic(term[4:-1], " AND ")
+            elif term.startswith("or(") and term.endswith(")"):
+                sql, args = self._logic(term[3:-1], " OR ")
+            else:
+                column, op, raw = term.split(".", 2)
+                if op == "in":
+                    value = [_unquote(v) for v in _split_top(raw.strip("()"))]
+                else:
+                    value = _unquote(raw)
+                sql, args = self._filter(column, op, value)
+            fragments.append(f"({sql})")
+            params.extend(args)
+        return joiner.join(fragments), params
+
+    def or_(self, filters: str):
+        self._where.append(self._logic(filters, " OR "))
+        return self
+
+    # ---------------- MODIFIERS ----------------
+    def order(self, column: str, desc: bool = False):
+        self._order.append(f"{_ident(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size: int):
+        self._limit = int(size)
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset, self._limit = int(start), int(end) - int(start) + 1
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    # ---------------- EXECUTION ----------------
+    def _where_sql(self) -> Tuple[str, list]:
+        if not self._where:
+            return "", []
+        params = [p for _, args in self._where for p in args]
+        return " WHERE " + " AND ".join(f"({sql})" for sql, _ in self._where), params
+
+    def execute(self) -> LocalResponse:
+        return self._client._execute(self)
+
+
+class SQLiteRPC:
+    def __init__(self, client: "SQLiteClient", fn: str, params: Optional[dict]):
+        self._client = client
+        self._fn = fn
+        self._params = params or {}
+
+    def execute(self) -> LocalResponse:
+        return self._client._call(self._fn, self._params)
+
+
+class SQLiteClient:
+    """
+    Local stand-in for supabase.Client (DB_BACKEND=sqlite).
+
+    Implements the table()/rpc() subset described in app/core/data_client.py
+    over one SQLite connection guarded by a lock, so the whole app can run
+    and be load-tested without a Supabase project. SQLITE_LATENCY_MS adds
+    a simulated network round trip to every call.
+    """
+
+    def __init__(self, path: str = ":memory:", latency_ms: float = 0.0):
+        self.path = path
+        self.latency = latency_ms / 1000
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._local = threading.local()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._columns: Dict[str, List[str]] = {}
+
+    # ---------------- PUBLIC API ----------------
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> SQLiteRPC:
+        return SQLiteRPC(self, fn, params)
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            outer = self._depth == 0
+            if outer:
+                self.conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self._depth -= 1
+                if outer:
+                    self.conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if outer:
+                self.conn.execute("COMMIT")
+
+    # ---------------- INTERNALS ----------------
+    def _round_trip(self):
+        self._local.calls = getattr(self._local, "calls", 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def thread_calls(self) -> int:
+        """DB calls issued so far by the current thread."""
+        return getattr(self._local, "calls", 0)
+
+    def columns(self, table: str) -> List[str]:
+        if table not in self._columns:
+            rows = self.conn.execute(f"PRAGMA table_info({table})").fetchall()
+            if not rows:
+                raise db_error(f'relation "{table}" does not exist', "42P01")
+            self._columns[table] = [r["name"] for r in rows]
+        return self._columns[table]
+
+    def _decode(self, table: str, row: sqlite3.Row) -> dict:
+        data = dict(row)
+        for col in BOOL_COLUMNS.get(table, ()):
+            if col in data and data[col] is not None:
+                data[col] = bool(data[col])
+        for col in JSON_COLUMNS.get(table, ()):
+            if isinstance(data.get(col), str):
+                data[col] = json.loads(data[col])
+        return data
+
+    def _select_list(self, q: SQLiteQuery) -> str:
+        if q._columns.strip() == "*":
+            return "*"
+        return ", ".join(_ident(c) for c in q._columns.split(","))
+
+    def _execute(self, q: SQLiteQuery) -> LocalResponse:
+        self._round_trip()
+        try:
+            with self.transaction():
+                self.columns(q._table)
+                rows, count = getattr(self, f"_{q._op}")(q)
+        except sqlite3.IntegrityError as e:
+            if "UNIQUE" in str(e):
+                raise db_error(f"duplicate key value violates unique constraint ({e})", "23505")
+            raise db_error(str(e), "23000")
+        except sqlite3.Error as e:
+            if "no such column" in str(e):
+                raise db_error(str(e), "42703")
+            raise db_error(str(e), "XX000")
+
+        if q._single:
+            if len(rows) != 1:
+                raise db_error(
+                    "JSON object requested, multiple (or no) rows returned", "PGRST116"
+                )
+            return LocalResponse(rows[0], count)
+        return LocalResponse(rows, count)
+
+    def _select(self, q: SQLiteQuery):
+        where, params = q._where_sql()
+        sql = f"SELECT {self._select_list(q)} FROM {q._table}{where}"
+        if q._order:
+            sql += " ORDER BY " + ", ".join(q._order)
+        if q._limit is not None:
+            sql += f" LIMIT {q._limit}"
+            if q._offset:
+                sql += f" OFFSET {q._offset}"
+
+        rows = [self._decode(q._table, r) for r in self.conn.execute(sql, params)]
+
+        count = None
+        if q._count:
+            count = self.conn.execute(f"SELECT COUNT(*) FROM {q._table}{where}", params).fetchone()[0]
+        return rows, count
+
+    def _prepare(self, table: str, row: dict) -> dict:
+        if not isinstance(row, dict):
+            raise db_error("Row must be an object", "PGRST102")
+        row = {_ident(k): _encode(v) for k, v in row.items()}
+        if "created_at" in self.columns(table) and not row.get("created_at"):
+            row["created_at"] = now_iso()
+        return row
+
+    def _insert(self, q: SQLiteQuery):
+        rows = q._values if isinstance(q._values, list) else [q._values]
+        out = []
+        for row in rows:
+            row = self._prepare(q._table, row)
+            cols = ", ".join(row)
+            marks = ", ".join("?" for _ in row)
+            cur = self.conn.execute(
+                f"INSERT INTO {q._table} ({cols}) VALUES ({marks})", list(row.values())
+            )
+            # re-read so trigger-set columns (users.uid) are returned
+            new = self.conn.execute(
+                f"SELECT * FROM {q._table} WHERE rowid = ?", (cur.lastrowid,)
+            ).fetchone()
+            out.append(self._decode(q._table, new))
+        return out, None
+
+    def _upsert(self, q: SQLiteQuery):
+        rows = q._values if isinstance(q._values, list) else [q._values]
+        if q._on_conflict:
+            keys = [_ident(c) for c in q._on_conflict.split(",")]
+        else:
+            info = self.conn.execute(f"PRAGMA table_info({q._table})").fetchall()
+            keys = [r["name"] for r in info if r["pk"]]
+
+        out = []
+        for row in rows:
+            row = self._prepare(q._table, row)
+            cols = ", ".join(row)
+            marks = ", ".join("?" for _ in row)
+            updates = ", ".join(f"{c} = excluded.{c}" for c in row if c not in keys) or f"{keys[0]} = {keys[0]}"
+            cur = self.conn.execute(
+                f"INSERT INTO {q._table} ({cols}) VALUES ({marks}) "
+                f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates} RETURNING *",
+                list(row.values()),
+            )
+            out.extend(self._decode(q._table, r) for r in cur.fetchall())
+        return out, None
+
+    def _update(self, q: SQLiteQuery):
+        values = {_ident(k): _encode(v) for k, v in q._values.items()}
+        where, params = q._where_sql()
+        sets = ", ".join(f"{c} = ?" for c in values)
+        cur = self.conn.execute(
+            f"UPDATE {q._table} SET {sets}{where} RETURNING rowid",
+            list(values.values()) + params,
+        )
+        # re-read so trigger-set columns (accounts.version) are returned
+        rowids = [r[0] for r in cur.fetchall()]
+        if not rowids:
+            return [], None
+        rows = self.conn.execute(
+            f"SELECT * FROM {q._table} WHERE rowid IN ({', '.join('?' for _ in rowids)})", rowids
+        ).fetchall()
+        return [self._decode(q._table, r) for r in rows], None
+
+    def _delete(self, q: SQLiteQuery):
+        where, params = q._where_sql()
+        cur = self.conn.execute(f"DELETE FROM {q._table}{where} RETURNING *", params)
+        return [self._decode(q._table, r) for r in cur.fetchall()], None
+
+    def _call(self, fn: str, params: dict) -> LocalResponse:
+        self._round_trip()
+        impl = RPCS.get(fn)
+        if impl is None:
+            raise db_error(f"Could not find the function public.{fn}", "PGRST202")
+
+        try:
+            with self.transaction() as conn:
+                return LocalResponse(impl(conn, **params))
+        except sqlite3.IntegrityError as e:
+            raise db_error(f"duplicate key value violates unique constraint ({e})", "23505")
+        except sqlite3.Error as e:
+            if "no such column" in str(e):
+                raise db_error(str(e), "42703")
+            raise db_error(str(e), "XX000")
+
+
+_client: SQLiteClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_sqlite_client() -> SQLiteClient:
+    """Process-wide SQLite client (DB_BACKEND=sqlite)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SQLiteClient(settings.SQLITE_PATH, settings.SQLITE_LATENCY_MS)
+        return _client
+
+
+def reset_sqlite_client(client: SQLiteClient | None = None):
+    """
+    Swap the process-wide client (fresh DB per test / benchmark run).
+    Returns the client that was replaced.
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
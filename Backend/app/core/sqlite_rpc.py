@@ -0,0 +1,665 @@
+"""
+Python ports of the Postgres functions the backend calls through db.rpc(),
+for the SQLite backend. Each one runs inside a single SQLite transaction and
+raises the same messages as its SQL counterpart in supabase/migrations.
+"""
+
+import json
+import re
+import sqlite3
+from calendar import monthrange
+from datetime import datetime, timedelta, UTC
+from typing import Any, Callable, Dict
+
+from postgrest.exceptions import APIError
+
+
+RPCS: Dict[str, Callable] = {}
+
+
+def rpc(name: str):
+    def decorator(fn):
+        RPCS[name] = fn
+        return fn
+    return decorator
+
+
+def db_error(message: str, code: str = "P0001") -> APIError:
+    return APIError({"message": message, "code": code, "hint": None, "details": None})
+
+
+def now_iso() -> str:
+    return datetime.now(UTC).isoformat(timespec="microseconds")
+
+
+def insert_row(conn: sqlite3.Connection, table: str, row: Dict[str, Any]) -> int:
+    row = {"created_at": now_iso(), **row}
+    row = {k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in row.items()}
+    cols = ", ".join(row)
+    marks = ", ".join("?" for _ in row)
+    cur = conn.execute(f"INSERT INTO {table} ({cols}) VALUES ({marks})", list(row.values()))
+    return cur.lastrowid
+
+
+def _account(conn: sqlite3.Connection, ac_no: str):
+    return conn.execute(
+        "SELECT account_no, balance, failed_attempts, is_locked, version FROM accounts WHERE account_no = ?",
+        (ac_no,),
+    ).fetchone()
+
+
+def _snapshot(conn, ac_no: str) -> dict:
+    acc = _account(conn, ac_no)
+    return {"balance": acc["balance"], "version": acc["version"]}
+
+
+def _audit(conn, actor, action, details, ip="unknown", user_agent="unknown") -> int:
+    return insert_row(conn, "app_audit_logs", {
+        "actor": actor,
+        "action": action,
+        "details": details,
+        "ip": ip,
+        "user_agent": user_agent,
+    })
+
+
+# -------------------- LEGACY MONEY RPCS (return type from 0006) --------------------
+@rpc("deposit_money")
+def deposit_money(conn, ac_no: str, amount: int):
+    if amount is None or amount <= 0:
+        raise db_error("Amount must be greater than zero")
+    if not _account(conn, ac_no):
+        raise db_error("Account not found")
+    conn.execute("UPDATE accounts SET balance = balance + ? WHERE account_no = ?", (amount, ac_no))
+    return _snapshot(conn, ac_no)
+
+
+@rpc("withdraw_money")
+def withdraw_money(conn, ac_no: str, amount: int):
+    if amount is None or amount <= 0:
+        raise db_error("Amount must be greater than zero")
+    acc = _account(conn, ac_no)
+    if not acc:
+        raise db_error("Account not found")
+    if acc["balance"] < amount:
+        raise db_error("Insufficient balance")
+    conn.execute("UPDATE accounts SET balance = balance - ? WHERE account_no = ?", (amount, ac_no))
+    return _snapshot(conn, ac_no)
+
+
+@rpc("transfer_money")
+def transfer_money(conn, from_ac: str, to_ac: str, amount: int):
+    if amount is None or amount <= 0:
+        raise db_error("Amount must be greater than zero")
+    sender = _account(conn, from_ac)
+    if not sender:
+        raise db_error("Sender account not found")
+    if not _account(conn, to_ac):
+        raise db_error("Receiver account not found")
+    if sender["balance"] < amount:
+        raise db_error("Insufficient balance")
+    conn.execute("UPDATE accounts SET balance = balance - ? WHERE account_no = ?", (amount, from_ac))
+    conn.execute("UPDATE accounts SET balance = balance + ? WHERE account_no = ?", (amount, to_ac))
+    return _snapshot(conn, from_ac)
+
+
+# -------------------- ATOMIC MONEY RPCS (0001) --------------------
+def _unlocked(conn, ac_no: str, missing: str = "Account not found"):
+    acc = _account(conn, ac_no)
+    if not acc:
+        raise db_error(missing)
+    if acc["is_locked"]:
+        raise db_error("Account locked")
+    return acc
+
+
+
+
+@rpc("atm_deposit")
+def atm_deposit(conn, p_ac_no, p_amount, p_ip="unknown", p_user_agent="unknown"):
+    if p_amount is None or p_amount <= 0:
+        raise db_error("Amount must be greater than zero")
+    _unlocked(conn, p_ac_no)
+
+    conn.execute(
+        "UPDATE accounts SET balance = balance + ?, failed_attempts = 0 WHERE account_no = ?",
+        (p_amount, p_ac_no),
+    )
+    history_id = insert_row(conn, "history", {
+        "account_no": p_ac_no, "action": "deposit", "amount": p_amount, "context": None,
+    })
+    _audit(conn, p_ac_no, "pin_success", "PIN verified", p_ip, p_user_agent)
+    audit_id = _audit(conn, p_ac_no, "deposit_success", f"Deposited {p_amount}", p_ip, p_user_agent)
+
+    return {**_snapshot(conn, p_ac_no), "history_id": history_id, "audit_id": audit_id}
+
+
+@rpc("atm_withdraw")
+def atm_withdraw(conn, p_ac_no, p_amount, p_ip="unknown", p_user_agent="unknown"):
+    if p_amount is None or p_amount <= 0:
+        raise db_error("Amount must be greater than zero")
+    acc = _unlocked(conn, p_ac_no)
+    if acc["balance"] < p_amount:
+        raise db_error("Insufficient balance")
+
+    conn.execute(
+        "UPDATE accounts SET balance = balance - ?, failed_attempts = 0 WHERE account_no = ?",
+        (p_amount, p_ac_no),
+    )
+    history_id = insert_row(conn, "history", {
+        "account_no": p_ac_no, "action": "withdraw", "amount": p_amount, "context": None,
+    })
+    _audit(conn, p_ac_no, "pin_success", "PIN verified", p_ip, p_user_agent)
+    audit_id = _audit(conn, p_ac_no, "withdraw_success", f"Withdrew {p_amount}", p_ip, p_user_agent)
+
+    return {**_snapshot(conn, p_ac_no), "history_id": history_id, "audit_id": audit_id}
+
+
+@rpc("atm_transfer")
+def atm_transfer(conn, p_from_ac, p_to_ac, p_amount, p_ip="unknown", p_user_agent="unknown"):
+    if p_amount is None or p_amount <= 0:
+        raise db_error("Amount must be greater than zero")
+    if p_from_ac == p_to_ac:
+        raise db_error("Sender and receiver must differ")
+
+    sender = _unlocked(conn, p_from_ac, "Sender account not found")
+    if not _account(conn, p_to_ac):
+        raise db_error("Receiver account not found")
+    if sender["balance"] < p_amount:
+        raise db_error("Insufficient balance")
+
+    conn.execute(
+        "UPDATE accounts SET balance = balance - ?, failed_attempts = 0 WHERE account_no = ?",
+        (p_amount, p_from_ac),
+    )
+    conn.execute("UPDATE accounts SET balance = balance + ? WHERE account_no = ?", (p_amount, p_to_ac))
+
+    history_id = insert_row(conn, "history", {
+        "account_no": p_from_ac, "action": "transfer_out", "amount": p_amount, "context": {"to": p_to_ac},
+    })
+    insert_row(conn, "history", {
+        "account_no": p_to_ac, "action": "transfer_in", "amount": p_amount, "context": {"from": p_from_ac},
+    })
+    _audit(conn, p_from_ac, "pin_success", "PIN verified", p_ip, p_user_agent)
+    audit_id = _audit(
+        conn, p_from_ac, "transfer_success", f"Sent {p_amount} to {p_to_ac}", p_ip, p_user_agent
+    )
+
+    return {**_snapshot(conn, p_from_ac), "history_id": history_id, "audit_id": audit_id}
+
+
+# -------------------- PIN LOCKOUT (0003) --------------------
+@rpc("register_pin_failure")
+def register_pin_failure(conn, p_ac_no, p_max_attempts=3, p_cooldown_minutes=0):
+    acc = _account(conn, p_ac_no)
+    if not acc:
+        raise db_error("Account not found")
+    if acc["is_locked"]:
+        return {"failed_attempts": acc["failed_attempts"], "is_locked": True}
+
+    attempts = (acc["failed_attempts"] or 0) + 1
+    locked = attempts >= p_max_attempts
+    locked_until = None
+    if locked and p_cooldown_minutes > 0:
+        locked_until = (datetime.now(UTC) + timedelta(minutes=p_cooldown_minutes)).isoformat()
+
+    conn.execute(
+        "UPDATE accounts SET failed_attempts = ?, is_locked = ?, locked_until = ? WHERE account_no = ?",
+        (attempts, int(locked), locked_until, p_ac_no),
+    )
+    return {"failed_attempts": attempts, "is_locked": locked}
+
+
+@rpc("release_expired_pin_lock")
+def release_expired_pin_lock(conn, p_ac_no):
+    cur = conn.execute(
+        "UPDATE accounts SET is_locked = 0, failed_attempts = 0, locked_until = NULL "
+        "WHERE account_no = ? AND is_locked AND locked_until IS NOT NULL AND locked_until <= ?",
+        (p_ac_no, now_iso()),
+    )
+    return cur.rowcount > 0
+
+
+# -------------------- ACCOUNT NUMBERS (0004) --------------------
+@rpc("reserve_account_block")
+def reserve_account_block(conn):
+    conn.execute(
+        "INSERT INTO sequences (name, value) VALUES ('account_no_block_seq', 0) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+    )
+    return conn.execute(
+        "SELECT value FROM sequences WHERE name = 'account_no_block_seq'"
+    ).fetchone()["value"]
+
+
+# -------------------- BULK ONBOARDING (0005) --------------------
+@rpc("bulk_create_accounts")
+def bulk_create_accounts(conn, p_rows, p_actor="bulk", p_ip="unknown", p_user_agent="unknown"):
+    created = []
+    try:
+        for row in p_rows:
+            user_id = insert_row(conn, "users", {
+                "user_name": row["account_no"],
+                "password": row["pin_hash"],
+                "role": "customer",
+            })
+            insert_row(conn, "accounts", {
+                "account_no": row["account_no"],
+                "name": row["holder_name"],
+                "pin": row["pin_hash"],
+                "mobileno": row["mobileno"],
+                "gmail": row["gmail"],
+                "failed_attempts": 0,
+                "is_locked": 0,
+                "user_id": user_id,
+            })
+            created.append(row["account_no"])
+    except sqlite3.IntegrityError as e:
+        raise db_error(f"duplicate key value violates unique constraint ({e})", "23505")
+
+    for ac_no in created:
+        _audit(conn, ac_no, "create_account", f"created (bulk by {p_actor})", p_ip, p_user_agent)
+    return created
+
+
+# -------------------- BATCH TRANSFERS (0007) --------------------
+@rpc("batch_transfer")
+def batch_transfer(conn, p_from_ac, p_items, p_all_or_nothing=False, p_batch_id=None,
+                   p_ip="unknown", p_user_agent="unknown"):
+    sender = _unlocked(conn, p_from_ac, "Sender account not found")
+    receivers = {
+        row["account_no"]
+        for row in conn.execute(
+            "SELECT account_no FROM accounts WHERE account_no IN (SELECT json_extract(value, '$.to') FROM json_each(?))",
+            (json.dumps(p_items),),
+        )
+    }
+
+    total, ok, failed = 0, [], []
+    for item in p_items:
+        amount = item.get("amount")
+        if amount is None or amount <= 0:
+            error = "Amount must be greater than zero"
+        elif item["to"] == p_from_ac:
+            error = "Sender and receiver must differ"
+        elif item["to"] not in receivers:
+            error = "Receiver account not found"
+        elif total + amount > sender["balance"]:
+            error = "Insufficient balance"
+        else:
+            total += amount
+            ok.append(item)
+            continue
+        failed.append({"i": item["i"], "error": error})
+
+    if not ok or (p_all_or_nothing and failed):
+        return {**_snapshot(conn, p_from_ac), "applied": 0, "total": 0, "failed": failed}
+
+    conn.execute("UPDATE accounts SET balance = balance - ? WHERE account_no = ?", (total, p_from_ac))
+    credits: Dict[str, int] = {}
+    for item in ok:
+        credits[item["to"]] = credits.get(item["to"], 0) + item["amount"]
+    conn.executemany(
+        "UPDATE accounts SET balance = balance + ? WHERE account_no = ?",
+        [(amount, ac_no) for ac_no, amount in credits.items()],
+    )
+
+    def context(**values):
+        return json.dumps({k: v for k, v in values.items() if v is not None})
+
+    created = now_iso()
+    conn.executemany(
+        "INSERT INTO history (account_no, action, amount, context, created_at) VALUES (?, ?, ?, ?, ?)",
+        [
+            (p_from_ac, "transfer_out", item["amount"],
+             context(to=item["to"], batch=p_batch_id, ref=item.get("ref")), created)
+            for item in ok
+        ] + [
+            (item["to"], "transfer_in", item["amount"],
+             context(**{"from": p_from_ac}, batch=p_batch_id, ref=item.get("ref")), created)
+            for item in ok
+        ],
+    )
+    _audit(
+        conn, p_from_ac, "batch_transfer_success",
+        f"Sent {total} in {len(ok)} transfers (batch {p_batch_id or '-'})", p_ip, p_user_agent,
+    )
+
+    return {**_snapshot(conn, p_from_ac), "applied": len(ok), "total": total, "failed": failed}
+
+
+# -------------------- STANDING INSTRUCTIONS (0008) --------------------
+def si_occurrence_at(start_at: str, frequency: str, occurrence: int) -> str:
+    """start_at + occurrence * step; monthly steps clamp to the month's last day like Postgres."""
+    start = datetime.fromisoformat(start_at)
+    if frequency == "daily":
+        at = start + timedelta(days=occurrence)
+    elif frequency == "weekly":
+        at = start + timedelta(days=7 * occurrence)
+    else:
+        months = start.month - 1 + occurrence
+        year, month = start.year + months // 12, months % 12 + 1
+        at = start.replace(year=year, month=month, day=min(start.day, monthrange(year, month)[1]))
+    return at.astimezone(UTC).isoformat(timespec="microseconds")
+
+
+@rpc("run_standing_instructions")
+def run_standing_instructions(conn, p_limit=200, p_max_retries=3, p_retry_base_seconds=900):
+    now = now_iso()
+    due = conn.execute(
+        "SELECT * FROM standing_instructions WHERE status = 'active' AND next_run_at <= ? "
+        "ORDER BY next_run_at LIMIT ?",
+        (now, p_limit),
+    ).fetchall()
+
+    results = []
+    for si in due:
+        sender = _account(conn, si["from_ac"])
+        if not sender:
+            error = "Sender account not found"
+        elif not _account(conn, si["to_ac"]):
+            error = "Receiver account not found"
+        elif sender["is_locked"]:
+            error = "Account locked"
+        elif sender["balance"] < si["amount"]:
+            error = "Insufficient balance"
+        else:
+            error = None
+
+        if error is None:
+            conn.execute("UPDATE accounts SET balance = balance - ? WHERE account_no = ?", (si["amount"], si["from_ac"]))
+            conn.execute("UPDATE accounts SET balance = balance + ? WHERE account_no = ?", (si["amount"], si["to_ac"]))
+            tags = {"instruction": si["id"], **({"ref": si["ref"]} if si["ref"] else {})}
+            insert_row(conn, "history", {
+                "account_no": si["from_ac"], "action": "transfer_out", "amount": si["amount"],
+                "context": {"to": si["to_ac"], **tags},
+            })
+            insert_row(conn, "history", {
+                "account_no": si["to_ac"], "action": "transfer_in", "amount": si["amount"],
+                "context": {"from": si["from_ac"], **tags},
+            })
+            _audit(
+                conn, si["from_ac"], "standing_instruction_success",
+                f"Sent {si['amount']} to {si['to_ac']} (instruction {si['id']})", "scheduler", "scheduler",
+            )
+            outcome = "done"
+        elif error in ("Sender account not found", "Receiver account not found"):
+            outcome = "failed"
+        elif si["retries"] < p_max_retries:
+            outcome = "retry"
+        else:
+            outcome = "missed"
+
+        if outcome in ("done", "missed"):
+            occurrence = si["occurrence"] + 1
+            while si_occurrence_at(si["start_at"], si["frequency"], occurrence) <= now:
+                occurrence += 1
+            conn.execute(
+                "UPDATE standing_instructions SET occurrence = ?, retries = 0, last_run_at = ?, last_error = ?, "
+                "next_run_at = ? WHERE id = ?",
+                (occurrence, now, error, si_occurrence_at(si["start_at"], si["frequency"], occurrence), si["id"]),
+            )
+        elif outcome == "retry":
+            retry_at = datetime.fromisoformat(now) + timedelta(seconds=p_retry_base_seconds * 2 ** si["retries"])
+            conn.execute(
+                "UPDATE standing_instructions SET retries = retries + 1, last_run_at = ?, last_error = ?, "
+                "next_run_at = ? WHERE id = ?",
+                (now, error, retry_at.isoformat(timespec="microseconds"), si["id"]),
+            )
+        else:
+            conn.execute(
+                "UPDATE standing_instructions SET status = 'failed', last_run_at = ?, last_error = ? WHERE id = ?",
+                (now, error, si["id"]),
+            )
+
+        results.append({"id": si["id"], "outcome": outcome, **({"error": error} if error else {})})
+
+    return {"processed": len(results), "results": results}
+
+
+# -------------------- BALANCE SNAPSHOTS (0009) --------------------
+SIGNED_ACTIONS = {"deposit": 1, "transfer_in": 1, "withdraw": -1, "transfer_out": -1}
+
+
+@rpc("build_balance_snapshots")
+def build_balance_snapshots(conn, p_before, p_limit=50000):
+    start = conn.execute("SELECT last_id FROM job_watermarks WHERE name = 'balance_snapshots'").fetchone()["last_id"]
+    candidates = conn.execute(
+        "SELECT id, account_no, action, amount, created_at FROM history WHERE id > ? ORDER BY id LIMIT ?",
+        (start, p_limit),
+    ).fetchall()
+
+    daily: Dict[tuple, int] = {}
+    watermark, processed = start, 0
+    for row in candidates:
+        if row["created_at"] >= p_before:
+            break
+        key = (row["account_no"], row["created_at"][:10])
+        daily[key] = daily.get(key, 0) + SIGNED_ACTIONS.get(row["action"], 0) * row["amount"]
+        watermark, processed = row["id"], processed + 1
+
+    balances: Dict[str, int] = {}
+    for (ac_no, day), delta in sorted(daily.items()):
+        if ac_no not in balances:
+            latest = conn.execute(
+                "SELECT balance FROM balance_snapshots WHERE account_no = ? ORDER BY day DESC LIMIT 1", (ac_no,),
+            ).fetchone()
+            balances[ac_no] = latest["balance"] if latest else 0
+        balances[ac_no] += delta
+        conn.execute(
+            "INSERT INTO balance_snapshots (account_no, day, balance) VALUES (?, ?, ?) "
+            "ON CONFLICT (account_no, day) DO UPDATE SET balance = excluded.balance",
+            (ac_no, day, balances[ac_no]),
+        )
+
+    conn.execute(
+        "UPDATE job_watermarks SET last_id = ?, updated_at = ? WHERE name = 'balance_snapshots'",
+        (watermark, now_iso()),
+    )
+    return {"processed": processed, "snapshots": len(daily), "watermark": watermark, "more": processed == p_limit}
+
+
+# -------------------- RECONCILIATION (0010) --------------------
+SIGNED_AMOUNT_SQL = (
+    "CASE WHEN h.action IN ('deposit', 'transfer_in') THEN h.amount "
+    "WHEN h.action IN ('withdraw', 'transfer_out') THEN -h.amount ELSE 0 END"
+)
+
+
+@rpc("account_partitions")
+def account_partitions(conn, p_parts):
+    rows = conn.execute(
+        "SELECT MAX(account_no) AS upper_ac FROM "
+        "(SELECT account_no, NTILE(?) OVER (ORDER BY account_no) AS part FROM accounts) "
+        "GROUP BY part ORDER BY upper_ac",
+        (max(p_parts, 1),),
+    ).fetchall()
+    return [r["upper_ac"] for r in rows]
+
+
+@rpc("reconcile_balances")
+def reconcile_balances(conn, p_after=None, p_until=None, p_limit=2000):
+    rows = conn.execute(
+        "WITH page AS ("
+        "  SELECT account_no, balance FROM accounts"
+        "   WHERE (? IS NULL OR account_no > ?) AND (? IS NULL OR account_no <= ?)"
+        "   ORDER BY account_no LIMIT ?"
+        ") "
+        f"SELECT p.account_no, p.balance, COALESCE(SUM({SIGNED_AMOUNT_SQL}), 0) AS ledger, COUNT(h.id) AS entries "
+        "FROM page p LEFT JOIN history h ON h.account_no = p.account_no "
+        "GROUP BY p.account_no, p.balance ORDER BY p.account_no",
+        (p_after, p_after, p_until, p_until, p_limit),
+    ).fetchall()
+    return {
+        "checked": len(rows),
+        "entries": sum(r["entries"] for r in rows),
+        "last": rows[-1]["account_no"] if rows else None,
+        "mismatches": [
+            {"account_no": r["account_no"], "balance": r["balance"], "ledger": r["ledger"],
+             "difference": r["balance"] - r["ledger"]}
+            for r in rows if r["balance"] != r["ledger"]
+        ],
+    }
+
+
+# -------------------- ACCOUNT SEARCH (0011, 0013) --------------------
+SEARCH_FIELDS = ("name", "mobileno", "gmail")
+TRGM_THRESHOLD = 0.3      # pg_trgm.similarity_threshold default
+
+
+def _trigrams(text: str) -> set:
+    """pg_trgm's trigram set: each alphanumeric word padded '  word '."""
+    grams = set()
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    ta, tb = _trigrams(a), _trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+@rpc("search_accounts")
+def search_accounts(conn, p_query, p_field=None, p_fuzzy=True, p_limit=20, p_after_rank=None, p_after_ac=None):
+    # no trigram index here: a scan, ranked exactly like the SQL function
+    fields = [p_field] if p_field else list(SEARCH_FIELDS)
+    if any(f not in SEARCH_FIELDS for f in fields):
+        raise db_error(f"Unknown search field: {p_field}")
+
+    term = p_query.lower()
+    if not p_fuzzy:
+        # 0013: prefix hits all rank 1.0, keyset on account_no alone
+        like = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        match = " OR ".join(f"lower(coalesce({f}, '')) LIKE ? ESCAPE '\\'" for f in fields)
+        rows = conn.execute(
+            f"SELECT account_no, name, mobileno, gmail FROM accounts"
+            f" WHERE ({match}) AND (? IS NULL OR account_no > ?) ORDER BY account_no LIMIT ?",
+            [like] * len(fields) + [p_after_ac, p_after_ac, p_limit],
+        )
+        return [{**dict(row), "rank": 1.0} for row in rows]
+
+    hits = []
+    for row in conn.execute("SELECT account_no, name, mobileno, gmail FROM accounts"):
+        values = [(row[f] or "").lower() for f in fields]
+        if any(v.startswith(term) for v in values):
+            rank = 1.0
+        elif p_fuzzy:
+            best = max(similarity(v, term) for v in values)
+            if best < TRGM_THRESHOLD:
+                continue
+            rank = round(best, 4)
+        else:
+            continue
+        hits.append({**dict(row), "rank": rank})
+
+    if p_after_ac is not None:
+        hits = [
+            h for h in hits
+            if h["rank"] < p_after_rank or (h["rank"] == p_after_rank and h["account_no"] > p_after_ac)
+        ]
+    hits.sort(key=lambda h: (-h["rank"], h["account_no"]))
+    return hits[:p_limit]
+
+
+# -------------------- IDEMPOTENCY KEYS (0015) --------------------
+@rpc("claim_idempotency_key")
+def claim_idempotency_key(conn, p_user, p_path, p_key, p_fingerprint, p_ttl_seconds):
+    now = now_iso()
+    conn.execute(
+        "DELETE FROM idempotency_keys WHERE rowid IN ("
+        " SELECT rowid FROM idempotency_keys WHERE expires_at <= ? ORDER BY expires_at LIMIT 10)"
+        " OR (user_id = ? AND path = ? AND key = ? AND expires_at <= ?)",
+        (now, p_user, p_path, p_key, now),
+    )
+    expires = (datetime.now(UTC) + timedelta(seconds=p_ttl_seconds)).isoformat(timespec="microseconds")
+    cur = conn.execute(
+        "INSERT INTO idempotency_keys (user_id, path, key, fingerprint, created_at, expires_at)"
+        " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+        (p_user, p_path, p_key, p_fingerprint, now, expires),
+    )
+    if cur.rowcount:
+        return {"claimed": True}
+
+    row = conn.execute(
+        "SELECT fingerprint, response_status, response_body, mimetype FROM idempotency_keys"
+        " WHERE user_id = ? AND path = ? AND key = ?",
+        (p_user, p_path, p_key),
+    ).fetchone()
+    return {"claimed": False, **(dict(row) if row else {
+        "fingerprint": None, "response_status": None, "response_body": None, "mimetype": None,
+    })}
+
+
+# -------------------- AUDIT LOG ARCHIVE (0016) --------------------
+def _audit_key(at, row_id) -> tuple:
+    return datetime.fromisoformat(str(at)), row_id
+
+
+@rpc("archive_audit_chunk")
+def archive_audit_chunk(conn, p_day, p_row_count, p_min_created_at, p_min_id, p_max_created_at, p_max_id,
+                        p_actors, p_actions, p_data):
+    conn.execute(
+        "INSERT INTO app_audit_log_archive (day, row_count, min_created_at, min_id, max_created_at, max_id,"
+        " actors, actions, data, archived_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (p_day, p_row_count, p_min_created_at, p_min_id, p_max_created_at, p_max_id,
+         json.dumps(p_actors), json.dumps(p_actions), p_data, now_iso()),
+    )
+
+    low, high = _audit_key(p_min_created_at, p_min_id), _audit_key(p_max_created_at, p_max_id)
+    ids = [
+        row["id"] for row in conn.execute(
+            "SELECT id, created_at FROM app_audit_logs WHERE created_at >= ? AND created_at <= ?",
+            (p_min_created_at, p_max_created_at),
+        )
+        if low <= _audit_key(row["created_at"], row["id"]) <= high
+    ]
+    if len(ids) != p_row_count:
+        raise db_error(
+            f"Audit chunk changed while archiving: {len(ids)} rows to delete, {p_row_count} archived"
+        )
+    conn.executemany("DELETE FROM app_audit_logs WHERE id = ?", [(i,) for i in ids])
+    return len(ids)
+
+
+@rpc("read_audit_archive")
+def read_audit_archive(conn, p_actor=None, p_actions=None, p_from=None, p_to=None,
+                       p_before_at=None, p_before_id=None, p_limit=4):
+    before = _audit_key(p_before_at, p_before_id) if p_before_at is not None else None
+    out = []
+    for row in conn.execute("SELECT * FROM app_audit_log_archive ORDER BY min_created_at DESC, min_id DESC"):
+        chunk = {**dict(row), "actors": json.loads(row["actors"]), "actions": json.loads(row["actions"])}
+        if p_actor is not None and p_actor not in chunk["actors"]:
+            continue
+        if p_actions is not None and not set(p_actions) & set(chunk["actions"]):
+            continue
+        if p_from is not None and _audit_key(chunk["max_created_at"], 0)[0] < _audit_key(p_from, 0)[0]:
+            continue
+        if p_to is not None and _audit_key(chunk["min_created_at"], 0)[0] >= _audit_key(p_to, 0)[0]:
+            continue
+        if before is not None and _audit_key(chunk["min_created_at"], chunk["min_id"]) >= before:
+            continue
+        out.append(chunk)
+        if len(out) >= p_limit:
+            break
+    return out
+
+
+# -------------------- HISTORY BALANCE DELTA (0017) --------------------
+@rpc("history_balance_delta")
+def history_balance_delta(conn, p_ac_no, p_from=None, p_to=None):
+    row = conn.execute(
+        f"SELECT COALESCE(SUM({SIGNED_AMOUNT_SQL}), 0) AS delta FROM history h"
+        " WHERE h.account_no = ? AND (? IS NULL OR h.created_at >= ?) AND (? IS NULL OR h.created_at < ?)",
+        (p_ac_no, p_from, p_from, p_to, p_to),
+    ).fetchone()
+    return row["delta"]
+
+
+# -------------------- DEBUG --------------------
+@rpc("debug_claims")
+def debug_claims(conn):
+    return {"backend": "sqlite", "role": "service_role"}
@@ -1,19 +1,154 @@
-from supabase import create_client, Client
+from __future__ import annotations
+
+import os
+import threading
+from typing import TYPE_CHECKING
+
 from app.config import settings
 
+if TYPE_CHECKING:
+    # supabase + httpx cost ~0.5s to import: loaded on first client build instead
+    import httpx
+    from supabase import Client
+    from app.core.http_transport import CountingTransport
+
+
+class ClientRegistry:
+    """
+    Process-wide Supabase clients.
+    Both clients share ONE bounded keep-alive httpx pool and are built
+    lazily, once per worker process (safe across gunicorn forks).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._clients: dict[str, Client] = {}
+        self._http: httpx.Client | None = None
+        self._transport: CountingTransport | None = None
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {
+            "clients_built": 0,
+            "client_lookups": 0,
+            "http_requests": 0,
+            "connections_opened": 0,
+            "connection_waits": 0,
+            "in_flight": 0,
+        }
+
+    # ---------------- COUNTERS ----------------
+    def _bump(self, key: str, n: int = 1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _enter(self, max_connections: int | None):
+        with self._lock:
+            self._stats["http_requests"] += 1
+            self._stats["in_flight"] += 1
+            if max_connections and self._stats["in_flight"] > max_connections:
+                self._stats["connection_waits"] += 1
+
+    def _leave(self):
+        with self._lock:
+            self._stats["in_flight"] -= 1
+
+    # ---------------- CONSTRUCTION ----------------
+    def _reset_after_fork(self):
+        # Sockets must never be shared between worker processes
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._clients = {}
+            self._http = None
+            self._transport = None
+            self._stats = self._empty_stats()
+
+    def _http_client(self) -> httpx.Client:
+        if self._http is None:
+            import httpx
+            from app.core.http_transport import CountingTransport
+
+            limits = httpx.Limits(
+                max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+            )
+            self._transport = CountingTransport(self, limits)
+            self._http = httpx.Client(
+                transport=self._transport,
+                timeout=settings.SUPABASE_HTTP_TIMEOUT,
+            )
+        return self._http
+
+    def get(self, name: str, key: str) -> Client:
+        with self._lock:
+            self._reset_after_fork()
+            self._stats["client_lookups"] += 1
+
+            client = self._clients.get(name)
+            if client is None:
+                from supabase import create_client, ClientOptions
+
+                options = ClientOptions(httpx_client=self._http_client())
+                client = create_client(settings.SUPABASE_URL, key, options)
+                client.postgrest  # build eagerly while holding the lock
+                self._clients[name] = client
+                self._stats["clients_built"] += 1
+
+            return client
+
+    def close(self):
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+            self._clients = {}
+            self._http = None
+            self._transport = None
+
+    # ---------------- STATS ----------------
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._stats)
+            data["pool_size"] = self._transport.pool_size() if self._transport else 0
+
+        data["pool_max"] = settings.SUPABASE_POOL_MAX_CONNECTIONS
+        lookups = data["client_lookups"]
+        requests = data["http_requests"]
+        data["client_reuse_rate"] = (
+            round(1 - data["clients_built"] / lookups, 4) if lookups else 0.0
+        )
+        data["connection_reuse_rate"] = (
+            round(1 - data["connections_opened"] / requests, 4) if requests else 0.0
+        )
+        return data
+
+
+registry = ClientRegistry()
+
 
 def get_public_client() -> Client:
     """
-    Returns a fresh Supabase client using anon (public) key.
+    Returns the shared Supabase client using anon (public) key.
     Safe to use for user-level operations.
     """
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    if settings.DB_BACKEND == "sqlite":
+        from app.core.sqlite_client import get_sqlite_client
+        return get_sqlite_client()
+    return registry.get("public", settings.SUPABASE_KEY)
 
 
 def get_service_client() -> Client:
     """
-    Returns a fresh Supabase client using the service role key.
+    Returns the shared Supabase client using the service role key.
     Must ONLY be used for privileged or internal operations.
     """
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    if settings.DB_BACKEND == "sqlite":
+        from app.core.sqlite_client import get_sqlite_client
+        return get_sqlite_client()
+    return registry.get("service", settings.SUPABASE_SERVICE_ROLE_KEY)
+
 
+def pool_stats() -> dict:
+    return registry.stats()
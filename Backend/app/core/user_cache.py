@@ -0,0 +1,15 @@
+from app.config import settings
+from app.utils.cache_tools import TTLCache
+
+
+# uid → role, consulted by get_current_user before hitting the users table.
+# Per process: invalidate_user() only clears this worker's copy, so other
+# workers keep a changed role for up to USER_CACHE_TTL seconds.
+role_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+def invalidate_user(*uids):
+    """Drop cached roles (call whenever a user's role changes)."""
+    for uid in uids:
+        if uid is not None:
+            role_cache.invalidate(str(uid))
@@ -0,0 +1,59 @@
+"""
+Request body validation for JSON routes.
+
+`@validate_body(Schema)` parses and validates the raw body in one pass with
+the schema's compiled pydantic-core validator (no json.loads + Model(**dict)
+step), then calls the view with `data=<Schema instance>`.
+
+    400  missing or malformed JSON
+    415  body is not application/json
+    422  JSON is fine but fails the schema; `errors` lists every field problem
+"""
+
+from functools import wraps
+from typing import Type
+
+from flask import jsonify, request
+from pydantic import BaseModel, ValidationError
+
+
+def _error_list(exc: ValidationError) -> list:
+    # never echo the submitted values back (PINs live in these bodies)
+    return [
+        {"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+        for err in exc.errors(include_url=False, include_context=False, include_input=False)
+    ]
+
+
+def parse_body(schema: Type[BaseModel]):
+    """(instance, None) or (None, error response)."""
+    if not request.is_json:
+        return None, (jsonify({"detail": "Expected an application/json body"}), 415)
+
+    raw = request.get_data(cache=True)
+    if not raw.strip():
+        return None, (jsonify({"detail": "Missing JSON"}), 400)
+
+    try:
+        return schema.model_validate_json(raw), None
+    except ValidationError as e:
+        errors = _error_list(e)
+        if any(err["type"] == "json_invalid" for err in errors):
+            return None, (jsonify({"detail": "Malformed JSON"}), 400)
+        return None, (jsonify({"detail": "Invalid payload", "errors": errors}), 422)
+
+
+def validate_body(schema: Type[BaseModel]):
+    """Validate the JSON body against `schema`; the view gets it as `data`."""
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            data, error = parse_body(schema)
+            if error:
+                return error
+            return fn(*args, data=data, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,95 @@
+"""
+Post-boot warmup.
+
+Heavy imports and client construction are deferred so a worker can answer
+its first health check quickly. This runs them right after boot on a
+background thread, once per worker process, so the first real request
+doesn't pay for them either. Every step is best-effort: a failing step is
+recorded and the rest still run.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, List, Tuple
+
+
+# ---------------- STEPS ----------------
+def _import_libraries():
+    import jwt  # noqa: F401  (pulls in cryptography)
+    from app.schemas.account_schemas import CreateAccountRequest
+    from app.schemas.update_schemas import UpdateEmailRequest
+
+    # deferred pydantic schemas (EmailStr loads email_validator)
+    CreateAccountRequest.model_rebuild()
+    UpdateEmailRequest.model_rebuild()
+
+
+def _db_clients():
+    from app.core.supabase_client import get_public_client, get_service_client
+
+    get_public_client()
+    db = get_service_client()
+    # opens (and keeps alive) the first pooled connection: TLS handshake paid here
+    db.table("users").select("id").limit(1).execute()
+
+
+def _hash_pool():
+    from app.core.hashing import hasher
+    hasher.start()
+
+
+def _steps() -> List[Tuple[str, Callable[[], None]]]:
+    return [("imports", _import_libraries), ("db_clients", _db_clients), ("hash_pool", _hash_pool)]
+
+
+# ---------------- RUNNER ----------------
+class Warmup:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread: threading.Thread | None = None
+        self._state = "idle"
+        self._steps: dict = {}
+        self._total_ms = 0.0
+
+    def start(self):
+        """Start warming this worker in the background; no-op if already started."""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._state = "running"
+            self._steps = {}
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def run(self):
+        started = time.perf_counter()
+        for name, step in _steps():
+            t = time.perf_counter()
+            try:
+                step()
+                result = {"ok": True}
+            except Exception as e:
+                result = {"ok": False, "error": str(e)}
+            result["ms"] = round((time.perf_counter() - t) * 1000, 2)
+            with self._lock:
+                self._steps[name] = result
+
+        with self._lock:
+            self._total_ms = round((time.perf_counter() - started) * 1000, 2)
+            self._state = "done"
+
+    def wait(self, timeout: float | None = None) -> bool:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self._state == "done"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self._state, "total_ms": self._total_ms, "steps": dict(self._steps)}
+
+
+warmup = Warmup()
@@ -1,10 +1,11 @@
-from flask import g, jsonify
+from flask import g, jsonify, request
 from functools import wraps
 from typing import Dict, Any
 
 from app.utils.jwt_tools import decode_token, make_access, REFRESH_GRACE_SECONDS
 from app.utils.time_tools import now_utc_ts
 from app.core.supabase_client import get_public_client
+from app.core.user_cache import role_cache
 
 
 def get_current_user() -> Dict[str, str] | None:
@@ -13,7 +14,7 @@ def get_current_user() -> Dict[str, str] | None:
     Returns a dict OR None if unauthorized.
     """
 
-    token = g.cookies.get("atm_token")
+    token = request.cookies.get("atm_token")
     if not token:
         return None
 
@@ -31,25 +32,29 @@ def get_current_user() -> Dict[str, str] | None:
     if not user_id or not app_role:
         return None
 
-    # Fetch user from Supabase
-    client = getattr(g, "supabase", None) or get_public_client()
+    # DB is source of truth (cached for USER_CACHE_TTL seconds)
+    db_role = role_cache.get(str(user_id))
 
-    try:
-        res = (
-            client.table("users")
-            .select("uid, role")
-            .eq("uid", user_id)
-            .single()
-            .execute()
-        )
-    except Exception:
-        return None
+    if db_role is None:
+        client = getattr(g, "supabase", None) or get_public_client()
 
-    if not res.data:
-        return None
+        try:
+            res = (
+                client.table("users")
+                .select("uid, role")
+                .eq("uid", user_id)
+                .single()
+                .execute()
+            )
+        except Exception:
+            return None
+
+        if not res.data:
+            return None
+
+        db_role = res.data["role"]
+        role_cache.set(str(user_id), db_role)
 
-    # DB is source of truth
-    db_role = res.data["role"]
     if db_role != app_role:
         app_role = db_role
 
@@ -57,9 +62,9 @@ def get_current_user() -> Dict[str, str] | None:
     exp = claims.get("exp")
     if exp and (exp - now_utc_ts()) < REFRESH_GRACE_SECONDS:
         # Our converted middleware looks for this
-        g.new_access_token = make_access(str(user_id), app_role)
+        g.new_access_token = make_access(str(user_id), app_role, claims.get("sid"))
 
-    return {"sub": str(user_id), "app_role": app_role}
+    return {"sub": str(user_id), "app_role": app_role, "sid": claims.get("sid")}
 
 
 def roles_required(*roles):
@@ -77,6 +82,7 @@ def roles_required(*roles):
             if user["app_role"] not in roles:
                 return jsonify({"detail": "Forbidden: insufficient role"}), 403
 
+            g.current_user = user
             return fn(*args, **kwargs)
         return wrapper
     return decorator
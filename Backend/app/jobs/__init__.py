@@ -0,0 +1,8 @@
+"""
+Offline jobs, run from cron or by hand:
+
+    cd Backend
+    python -m app.jobs.snapshots
+    python -m app.jobs.reconcile
+    python -m app.jobs.audit_retention
+"""
@@ -0,0 +1,34 @@
+"""
+Audit log retention.
+
+    cd Backend
+    python -m app.jobs.audit_retention
+    python -m app.jobs.audit_retention --days 30
+
+Moves every whole UTC day of app_audit_logs older than --days
+(AUDIT_RETENTION_DAYS) into the app_audit_log_archive table (migration
+0016), one gzip chunk per transaction. Archived days stay readable through
+GET /audit/logs. Safe to re-run: each chunk is stored and deleted
+together, so a run that died just continues with the rows still left.
+"""
+
+import argparse
+import json
+import sys
+
+from app.core.supabase_client import get_service_client
+from app.services.audit_log_service import AuditLogService
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m app.jobs.audit_retention", description="Archive old audit log days")
+    p.add_argument("--days", type=int, default=None, help="keep this many days in the table")
+    args = p.parse_args(argv)
+
+    report = AuditLogService().apply_retention(get_service_client(), days=args.days)
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
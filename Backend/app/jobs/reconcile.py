@@ -0,0 +1,58 @@
+"""
+Ledger reconciliation: accounts.balance vs. history.
+
+    cd Backend
+    python -m app.jobs.reconcile
+    python -m app.jobs.reconcile --workers 8 --out report.json
+
+Prints a summary and one line per account whose balance differs from the
+signed sum of its history (deposit, transfer_in minus withdraw,
+transfer_out). Exits 1 when there is any discrepancy.
+
+Money that moves while the job runs can show up as a one-off difference on
+the non-atomic path (balance and history are separate writes); run it off
+peak, or re-run and compare.
+"""
+
+import argparse
+import json
+import sys
+
+from app.core.supabase_client import get_service_client
+from app.services.reconciliation_service import ReconciliationService
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m app.jobs.reconcile", description="Reconcile balances against history")
+    p.add_argument("--workers", type=int, default=None, help="account ranges checked in parallel")
+    p.add_argument("--page-size", type=int, default=None, help="accounts per DB call")
+    p.add_argument("--out", default=None, help="also write the full report (JSON) here")
+    p.add_argument("--json", action="store_true", help="print the raw report")
+    args = p.parse_args(argv)
+
+    report = ReconciliationService(get_service_client).run(workers=args.workers, page_size=args.page_size)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"accounts checked   {report['accounts_checked']:>12}")
+        print(f"history rows       {report['history_rows']:>12}")
+        print(f"partitions / pages {report['partitions']:>5} / {report['pages']}")
+        print(f"elapsed            {report['elapsed_ms']:>10.1f} ms")
+        if report["mismatches"]:
+            print(f"\n{'account':<20}{'balance':>14}{'ledger':>14}{'difference':>14}")
+            for m in report["mismatches"]:
+                print(f"{m['account_no']:<20}{m['balance']:>14}{m['ledger']:>14}{m['difference']:>14}")
+            print(f"\n{len(report['mismatches'])} DISCREPANCIES, net {report['net_difference']}")
+        else:
+            print("\nbalances match history")
+
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+Incremental balance snapshot job.
+
+    cd Backend
+    python -m app.jobs.snapshots
+
+Run it daily, shortly after midnight UTC (any time is fine: it only ever
+reads history rows past its watermark and only snapshots closed days, so
+missed or repeated runs are harmless).
+"""
+
+import argparse
+import json
+import sys
+
+from app.core.supabase_client import get_service_client
+from app.services.statement_service import StatementService
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m app.jobs.snapshots", description="Build daily balance snapshots")
+    p.parse_args(argv)
+
+    summary = StatementService().build_snapshots(get_service_client())
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,23 @@
-from flask import Blueprint, g, jsonify
+import csv
+import io
+import json
+
+from flask import Blueprint, g, jsonify, request, Response, stream_with_context
 from functools import wraps
 
+from app.core.query_tracking import query_budget
+from app.core.validation import validate_body
 from app.dependencies.auth_deps import get_current_user, roles_required
 from app.services.account_service import AccountService
-from app.schemas.account_schemas import CreateAccountRequest
+from app.services.customer_service import CustomerService
+from app.services.search_service import AccountSearchService
+from app.schemas.account_schemas import AccountBase, AccountSearchQuery, CreateAccountRequest
 
 
 account_bp = Blueprint("account", __name__)
 account_service = AccountService()
+customer_service = CustomerService()
+search_service = AccountSearchService()
 
 
 # -------- ROLE DECORATOR (same as used in auth routes) --------
@@ -18,6 +28,7 @@ def role_required(role):
             user = get_current_user()
             if not user or user.get("app_role") != role:
                 return jsonify({"detail": "Not authorized"}), 403
+            g.current_user = user
             return fn(*args, **kwargs)
         return wrapper
     return decorator
@@ -25,21 +36,12 @@ def role_required(role):
 
 # -------- CREATE ACCOUNT (Admin Only) --------
 @account_bp.route("/create", methods=["POST"])
+@query_budget(6)
 @role_required("admin")
-def create_account():
+@validate_body(CreateAccountRequest)
+def create_account(data: CreateAccountRequest):
     db = g.service  # obtained from middleware
 
-    # Flask doesn't auto-validate JSON → must load manually
-    payload = g.get("json")
-    if not payload:
-        return jsonify({"detail": "Missing JSON"}), 400
-
-    # Pydantic-like validation using your schema
-    try:
-        data = CreateAccountRequest(**payload)
-    except Exception:
-        return jsonify({"detail": "Invalid payload"}), 400
-
     ok, result = account_service.create_account(
         db=db,
         holder_name=data.holder_name,
@@ -47,7 +49,7 @@ def create_account():
         vpin=data.vpin,
         mobileno=data.mobileno,
         gmail=data.gmail,
-        request=g.request,
+        request=request,
     )
 
     if not ok:
@@ -58,3 +60,89 @@ def create_account():
         "account_no": result["account_no"],
         "message": result["message"],
     })
+
+
+# -------- BALANCE ENQUIRY --------
+@account_bp.route("/enquiry", methods=["POST"])
+@query_budget(4)
+@roles_required("admin", "teller", "customer")
+@validate_body(AccountBase)
+def enquiry(data: AccountBase):
+    db = g.service
+
+    ok, msg = customer_service.enquiry(db=db, ac_no=data.acc_no, pin=data.pin, request=request)
+    if not ok:
+        return jsonify({"detail": msg}), 400
+
+    return jsonify({"success": True, "message": msg})
+
+
+# -------- ACCOUNT SEARCH (name / mobile / email) --------
+@account_bp.route("/search", methods=["GET"])
+@query_budget(2)
+@roles_required("admin", "teller")
+def search_accounts():
+    db = g.service
+
+    try:
+        query = AccountSearchQuery(**request.args.to_dict())
+    except Exception:
+        return jsonify({"detail": "Invalid query parameters"}), 400
+
+    ok, page = search_service.search(
+        db,
+        query.q,
+        field=query.field,
+        mode=query.mode,
+        limit=query.limit,
+        cursor=query.cursor,
+    )
+    if not ok:
+        return jsonify({"detail": page}), 400
+
+    return jsonify({"results": page["items"], "next_cursor": page["next_cursor"]})
+
+
+# -------- BULK ONBOARDING (Admin Only) --------
+BULK_MIMETYPES = {"text/csv", "application/x-ndjson", "application/jsonl"}
+
+
+def _iter_upload_rows():
+    """Rows from the request body, read line by line (never fully buffered)."""
+    text = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+
+    if request.mimetype == "text/csv":
+        yield from csv.DictReader(text)
+        return
+
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield {"_error": "Invalid JSON line."}
+
+
+@account_bp.route("/bulk", methods=["POST"])
+@role_required("admin")
+def bulk_create_accounts():
+    if request.mimetype not in BULK_MIMETYPES:
+        return jsonify({"detail": "Send text/csv or application/x-ndjson"}), 415
+
+    db = g.service
+    actor = g.current_user["sub"]
+
+    def generate():
+        created = failed = 0
+        for result in account_service.bulk_create(db, _iter_upload_rows(), actor, request):
+            if result["ok"]:
+                created += 1
+            else:
+                failed += 1
+            yield json.dumps(result) + "\n"
+
+        yield json.dumps({"summary": True, "created": created, "failed": failed}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
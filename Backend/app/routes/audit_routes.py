@@ -0,0 +1,45 @@
+from flask import Blueprint, request, jsonify, g
+
+from app.core.query_tracking import query_budget
+from app.dependencies.auth_deps import roles_required
+from app.schemas.audit_schemas import AuditLogQuery
+from app.services.audit_log_service import AuditLogService
+
+
+audit_bp = Blueprint("audit", __name__)
+audit_log_service = AuditLogService()
+
+FILTER_FIELDS = ("actor", "action", "from_date", "to_date")
+
+
+def _query_args() -> dict:
+    """request.args → dict; ?action=a,b and repeated ?action= both work."""
+    args = {k: v for k, v in request.args.items() if k != "action"}
+    actions = [a for raw in request.args.getlist("action") for a in raw.split(",") if a]
+    if actions:
+        args["action"] = actions
+    return args
+
+
+# -------- AUDIT LOG (Admin Only; hot table, then archive) --------
+@audit_bp.route("/logs", methods=["GET"])
+@query_budget(3)
+@roles_required("admin")
+def get_audit_logs():
+    db = g.service
+
+    try:
+        query = AuditLogQuery(**_query_args())
+    except Exception:
+        return jsonify({"detail": "Invalid query parameters"}), 400
+
+    ok, page = audit_log_service.get_page(
+        db,
+        limit=query.limit,
+        cursor=query.cursor,
+        filters=query.model_dump(include=set(FILTER_FIELDS)),
+    )
+    if not ok:
+        return jsonify({"detail": page}), 400
+
+    return jsonify({"logs": page["items"], "next_cursor": page["next_cursor"]})
@@ -1,17 +1,23 @@
 from flask import Blueprint, request, jsonify, make_response, g
 from functools import wraps
 
-from app.dependencies.auth_deps import get_current_user
+from app.core.query_tracking import query_budget
+from app.dependencies.auth_deps import get_current_user, roles_required
 from app.services.auth_service import AuthService
+from app.core.hashing import HashQueueFull
 from app.utils.jwt_tools import (
     make_access,
     make_refresh,
+    new_session_id,
     decode_token,
     ACCESS_TTL,
     REFRESH_TTL,
 )
 from app.utils.cookie_tools import set_cookie, clear_cookie
-from app.schemas.auth_schemas import CreateUserRequest
+from app.schemas.auth_schemas import CreateUserRequest, PinSessionRequest
+from app.core import pin_sessions
+from app.config import settings
+from app.core.user_cache import role_cache
 
 
 auth_bp = Blueprint("auth", __name__)
@@ -75,6 +81,7 @@ def create_user():
 
 # -------- LOGIN --------
 @auth_bp.route("/login", methods=["POST"])
+@query_budget(4)
 def login():
     db = g.service
 
@@ -84,7 +91,12 @@ def login():
     if not username or not password:
         return jsonify({"detail": "Missing credentials"}), 400
 
-    if not auth_service.password_check(db, username, password):
+    try:
+        valid = auth_service.password_check(db, username, password)
+    except HashQueueFull:
+        return jsonify({"detail": "Server busy. Try again."}), 503
+
+    if not valid:
         auth_service.log_event(db, username, "login_failed", "Wrong password", request)
         return jsonify({"detail": "Invalid credentials"}), 401
 
@@ -95,8 +107,9 @@ def login():
     user_id = str(user["id"])
     app_role = user["role"]
 
-    access_token = make_access(user_id, app_role)
-    refresh_token = make_refresh(user_id, app_role)
+    sid = new_session_id()
+    access_token = make_access(user_id, app_role, sid)
+    refresh_token = make_refresh(user_id, app_role, sid)
 
     response = make_response(
         jsonify({"success": True, "role": app_role, "user_name": username})
@@ -149,9 +162,12 @@ def refresh_tokens():
         return jsonify({"detail": "User not found"}), 401
 
     app_role = res.data["role"]
+    role_cache.set(str(sub), app_role)
 
-    new_access = make_access(str(sub), app_role)
-    new_refresh = make_refresh(str(sub), app_role)
+    # same login session; tokens from before sids existed start a new one
+    sid = claims.get("sid") or new_session_id()
+    new_access = make_access(str(sub), app_role, sid)
+    new_refresh = make_refresh(str(sub), app_role, sid)
 
     response = make_response(jsonify({"success": True}))
 
@@ -163,6 +179,7 @@ def refresh_tokens():
 
 # -------- AUTH CHECK --------
 @auth_bp.route("/check", methods=["GET"])
+@query_budget(0)
 def auth_check():
     user = get_current_user()
     if not user:
@@ -173,3 +190,41 @@ def auth_check():
         "user_id": user["sub"],
         "role": user["app_role"],
     })
+
+
+# -------- PIN SESSION (opt-in) --------
+@auth_bp.route("/pin-session", methods=["POST"])
+@query_budget(4)
+@roles_required("admin", "teller", "customer")
+def open_pin_session():
+    db = g.service
+
+    payload = request.get_json()
+    if not payload:
+        return jsonify({"detail": "Missing JSON"}), 400
+
+    try:
+        data = PinSessionRequest(**payload)
+    except Exception:
+        return jsonify({"detail": "Invalid payload"}), 400
+
+    ok, result = auth_service.open_pin_session(db, data.acc_no, data.pin, request)
+    if not ok:
+        return jsonify({"detail": result}), 400
+
+    return jsonify({
+        "success": True,
+        "pin_session": result,
+        "header": pin_sessions.PIN_SESSION_HEADER,
+        "expires_in": settings.PIN_SESSION_TTL,
+    })
+
+
+@auth_bp.route("/pin-session", methods=["DELETE"])
+@roles_required("admin", "teller", "customer")
+def revoke_pin_session():
+    token = request.headers.get(pin_sessions.PIN_SESSION_HEADER)
+    if not token or not pin_sessions.revoke(g.service, token):
+        return jsonify({"detail": "Invalid PIN session"}), 400
+
+    return jsonify({"success": True, "message": "PIN session revoked"})
@@ -1,6 +1,15 @@
 from flask import Blueprint, g, jsonify
 from functools import wraps
 from app.dependencies.auth_deps import get_current_user
+from app.core.supabase_client import pool_stats
+from app.core.audit_writer import audit_writer
+from app.core.user_cache import role_cache
+from app.core.account_cache import account_cache
+from app.core.account_index import account_index
+from app.core.hashing import hasher
+from app.core import idempotency
+from app.core.warmup import warmup
+from app.core.scheduler import scheduler
 
 
 debug_bp = Blueprint("debug", __name__)
@@ -30,3 +39,56 @@ def debug_jwt():
         return jsonify({"jwt": res.data})
     except Exception as e:
         return jsonify({"error": str(e)})
+
+
+# -------- CONNECTION POOL STATS --------
+@debug_bp.route("/pool", methods=["GET"])
+@role_required("admin")
+def debug_pool():
+    return jsonify({"pool": pool_stats()})
+
+
+# -------- AUDIT WRITER STATS --------
+@debug_bp.route("/audit-writer", methods=["GET"])
+@role_required("admin")
+def debug_audit_writer():
+    return jsonify({"audit_writer": audit_writer.stats()})
+
+
+# -------- CACHE STATS --------
+@debug_bp.route("/cache", methods=["GET"])
+@role_required("admin")
+def debug_cache():
+    return jsonify({
+        "role_cache": role_cache.stats(),
+        "account_cache": account_cache.stats(),
+        "account_index": account_index.stats(),
+    })
+
+
+# -------- BCRYPT POOL STATS --------
+@debug_bp.route("/hashing", methods=["GET"])
+@role_required("admin")
+def debug_hashing():
+    return jsonify({"hashing": hasher.stats()})
+
+
+# -------- IDEMPOTENCY STORE STATS --------
+@debug_bp.route("/idempotency", methods=["GET"])
+@role_required("admin")
+def debug_idempotency():
+    return jsonify({"idempotency": idempotency.store.stats()})
+
+
+# -------- BOOT WARMUP --------
+@debug_bp.route("/warmup", methods=["GET"])
+@role_required("admin")
+def debug_warmup():
+    return jsonify({"warmup": warmup.stats()})
+
+
+# -------- STANDING INSTRUCTION SCHEDULER --------
+@debug_bp.route("/scheduler", methods=["GET"])
+@role_required("admin")
+def debug_scheduler():
+    return jsonify({"scheduler": scheduler.stats()})
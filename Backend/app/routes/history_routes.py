@@ -1,34 +1,177 @@
-from flask import Blueprint, request, jsonify, g
+import csv
+import io
+import json
+
+from flask import Blueprint, request, jsonify, g, Response, stream_with_context
+from app.core.query_tracking import query_budget
 from app.dependencies.auth_deps import roles_required, get_current_user
 from app.services.history_service import HistoryService
+from app.services.statement_service import StatementService
 from app.services.auth_service import AuthService
+from app.schemas.history_schemas import BalanceAtQuery, HistoryQuery, HistoryExportQuery, StatementQuery
+from app.core.pin_sessions import PIN_SESSION_HEADER
 
 
 history_bp = Blueprint("history", __name__)
 
 history_service = HistoryService()
+statement_service = StatementService()
 auth_service = AuthService()
 
+FILTER_FIELDS = ("from_date", "to_date", "action", "min_amount", "max_amount")
+CSV_COLUMNS = ["id", "account_no", "action", "amount", "context", "created_at"]
+
+
+def _query_args() -> dict:
+    """request.args → dict; ?action=a,b and repeated ?action= both work."""
+    args = {k: v for k, v in request.args.items() if k not in ("pin", "action")}
+    actions = [a for raw in request.args.getlist("action") for a in raw.split(",") if a]
+    if actions:
+        args["action"] = actions
+    return args
+
 
 # -------- GET HISTORY --------
 @history_bp.route("/<string:ac_no>", methods=["GET"])
+@query_budget(5)
 @roles_required("admin", "teller")
 def get_history(ac_no):
     db = g.service
 
-    # Query parameter
+    # Query parameter (or a PIN session header)
     pin = request.args.get("pin")
-    if not pin:
+    if not pin and not request.headers.get(PIN_SESSION_HEADER):
         return jsonify({"detail": "PIN is required"}), 400
 
+    try:
+        query = HistoryQuery(**_query_args())
+    except Exception:
+        return jsonify({"detail": "Invalid query parameters"}), 400
+
     # Check PIN correctness
     ok, msg = auth_service.check(db, ac_no=ac_no, pin=pin, request=request)
     if not ok:
         return jsonify({"detail": msg}), 400
 
-    # Fetch history
-    ok, history = history_service.get_history(db, ac_no)
+    # Fetch one keyset page
+    ok, page = history_service.get_page(
+        db,
+        ac_no,
+        limit=query.limit,
+        cursor=query.cursor,
+        filters=query.model_dump(include=set(FILTER_FIELDS)),
+    )
+    if not ok:
+        return jsonify({"detail": page}), 404
+
+    return jsonify({"history": page["items"], "next_cursor": page["next_cursor"]})
+
+
+# -------- STREAMING EXPORT --------
+@history_bp.route("/<string:ac_no>/export", methods=["GET"])
+@roles_required("admin", "teller")
+def export_history(ac_no):
+    db = g.service
+
+    pin = request.args.get("pin")
+    if not pin and not request.headers.get(PIN_SESSION_HEADER):
+        return jsonify({"detail": "PIN is required"}), 400
+
+    try:
+        query = HistoryExportQuery(**_query_args())
+    except Exception:
+        return jsonify({"detail": "Invalid query parameters"}), 400
+
+    ok, msg = auth_service.check(db, ac_no=ac_no, pin=pin, request=request)
+    if not ok:
+        return jsonify({"detail": msg}), 400
+
+    rows = history_service.iter_history(
+        db, ac_no, filters=query.model_dump(include=set(FILTER_FIELDS))
+    )
+
+    if query.format == "csv":
+        def generate():
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(CSV_COLUMNS)
+            for row in rows:
+                row = {**row, "context": json.dumps(row.get("context")) if row.get("context") else ""}
+                writer.writerow([row.get(c) for c in CSV_COLUMNS])
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate(0)
+            yield buf.getvalue()
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/csv",
+            headers={"Content-Disposition": f"attachment; filename=history_{ac_no}.csv"},
+        )
+
+    def generate():
+        for row in rows:
+            yield json.dumps(row, default=str) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+# -------- STATEMENT (nearest snapshot + rows after it) --------
+@history_bp.route("/<string:ac_no>/statement", methods=["GET"])
+@roles_required("admin", "teller")
+def get_statement(ac_no):
+    db = g.service
+
+    pin = request.args.get("pin")
+    if not pin and not request.headers.get(PIN_SESSION_HEADER):
+        return jsonify({"detail": "PIN is required"}), 400
+
+    try:
+        query = StatementQuery(**_query_args())
+    except Exception:
+        return jsonify({"detail": "Invalid query parameters"}), 400
+
+    ok, msg = auth_service.check(db, ac_no=ac_no, pin=pin, request=request)
+    if not ok:
+        return jsonify({"detail": msg}), 400
+
+    ok, statement = statement_service.statement(db, ac_no, query.from_date, query.to_date)
     if not ok:
-        return jsonify({"detail": history}), 404
+        return jsonify({"detail": statement}), 404
+
+    return jsonify({"statement": statement})
+
+
+# -------- POINT-IN-TIME BALANCE --------
+@history_bp.route("/<string:ac_no>/balance-at", methods=["GET"])
+@query_budget(5)
+@roles_required("admin", "teller")
+def get_balance_at(ac_no):
+    db = g.service
+
+    pin = request.args.get("pin")
+    if not pin and not request.headers.get(PIN_SESSION_HEADER):
+        return jsonify({"detail": "PIN is required"}), 400
+
+    try:
+        query = BalanceAtQuery(**_query_args())
+    except Exception:
+        return jsonify({"detail": "Invalid query parameters"}), 400
+
+    ok, msg = auth_service.check(db, ac_no=ac_no, pin=pin, request=request)
+    if not ok:
+        return jsonify({"detail": msg}), 400
+
+    ok, result = statement_service.balance_at(db, ac_no, query.at)
+    if not ok:
+        return jsonify({"detail": result}), 404
+
+    return jsonify(result)
+
 
-    return jsonify({"history": history})
+# -------- BUILD SNAPSHOTS NOW (Admin Only) --------
+@history_bp.route("/snapshots/run", methods=["POST"])
+@roles_required("admin")
+def run_snapshots():
+    summary = statement_service.build_snapshots(g.service)
+    return jsonify({"success": True, **summary})
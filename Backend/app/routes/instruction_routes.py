@@ -0,0 +1,86 @@
+from flask import Blueprint, request, jsonify, g
+
+from app.config import settings
+from app.core.query_tracking import query_budget
+from app.core.scheduler import scheduler
+from app.core.validation import validate_body
+from app.core.pin_sessions import PIN_SESSION_HEADER
+from app.dependencies.auth_deps import roles_required
+from app.schemas.instruction_schemas import CancelInstructionRequest, StandingInstructionRequest
+from app.services.instruction_service import InstructionService
+
+
+instruction_bp = Blueprint("instructions", __name__)
+instruction_service = InstructionService()
+
+
+# -------- CREATE STANDING INSTRUCTION --------
+@instruction_bp.route("/create", methods=["POST"])
+@query_budget(6)
+@roles_required("admin", "teller", "customer")
+@validate_body(StandingInstructionRequest)
+def create_instruction(data: StandingInstructionRequest):
+    db = g.service
+
+    ok, result = instruction_service.create(
+        db=db,
+        from_ac=data.acc_no,
+        to_ac=data.rec_acc_no,
+        amount=data.amount,
+        frequency=data.frequency,
+        start_at=data.start_at,
+        ref=data.ref,
+        pin=data.pin,
+        actor=g.current_user["sub"],
+        request=request,
+    )
+    if not ok:
+        return jsonify({"detail": result}), 400
+
+    if settings.SCHEDULER_ENABLED:
+        scheduler.notify(result["id"], result["next_run_at"])
+
+    return jsonify({"success": True, "instruction": result})
+
+
+# -------- LIST INSTRUCTIONS --------
+@instruction_bp.route("/<string:ac_no>", methods=["GET"])
+@query_budget(4)
+@roles_required("admin", "teller", "customer")
+def list_instructions(ac_no):
+    db = g.service
+
+    pin = request.args.get("pin")
+    if not pin and not request.headers.get(PIN_SESSION_HEADER):
+        return jsonify({"detail": "PIN is required"}), 400
+
+    ok, result = instruction_service.list_for_account(db, ac_no=ac_no, pin=pin, request=request)
+    if not ok:
+        return jsonify({"detail": result}), 400
+
+    return jsonify({"instructions": result})
+
+
+# -------- CANCEL INSTRUCTION --------
+@instruction_bp.route("/<int:instruction_id>/cancel", methods=["PUT"])
+@query_budget(5)
+@roles_required("admin", "teller", "customer")
+@validate_body(CancelInstructionRequest)
+def cancel_instruction(instruction_id, data: CancelInstructionRequest):
+    db = g.service
+
+    ok, msg = instruction_service.cancel(
+        db, instruction_id=instruction_id, ac_no=data.acc_no, pin=data.pin, request=request,
+    )
+    if not ok:
+        return jsonify({"detail": msg}), 400
+
+    return jsonify({"success": True, "message": msg})
+
+
+# -------- RUN DUE INSTRUCTIONS NOW (Admin Only) --------
+@instruction_bp.route("/run", methods=["POST"])
+@roles_required("admin")
+def run_instructions():
+    summary = scheduler.tick(g.service)
+    return jsonify({"success": True, **summary})
@@ -0,0 +1,31 @@
+import hmac
+
+from flask import Blueprint, Response, request
+
+from app.config import settings
+from app.core.metrics import render
+from app.dependencies.auth_deps import roles_required
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+def _scrape_token_ok() -> bool:
+    token = settings.METRICS_SCRAPE_TOKEN
+    if not token:
+        return False
+    scheme, _, value = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(value.encode(), token.encode())
+
+
+def _scrape():
+    body, content_type = render()
+    return Response(body, content_type=content_type)
+
+
+# -------- PROMETHEUS SCRAPE --------
+# Scrapers send METRICS_SCRAPE_TOKEN as a bearer token; anyone else needs an admin session.
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    if _scrape_token_ok():
+        return _scrape()
+    return roles_required("admin")(_scrape)()
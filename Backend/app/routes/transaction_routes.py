@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify, g
 
+from app.config import settings
+from app.core.query_tracking import query_budget
+from app.core.idempotency import IDEMPOTENCY_CALLS, idempotent
+from app.core.validation import validate_body
 from app.dependencies.auth_deps import roles_required
-from app.schemas.transaction_schemas import TransactionRequest, TransferRequest
+from app.schemas.transaction_schemas import BatchTransferRequest, TransactionRequest, TransferRequest
 from app.services.transaction_service import TransactionService
 
 
@@ -11,19 +15,13 @@ transaction_service = TransactionService()
 
 # ---------------- DEPOSIT ----------------
 @transaction_bp.route("/deposit", methods=["POST"])
+@query_budget(8 + IDEMPOTENCY_CALLS)
 @roles_required("admin", "teller", "customer")
-def deposit():
+@idempotent
+@validate_body(TransactionRequest)
+def deposit(data: TransactionRequest):
     db = g.service  # from middleware
 
-    payload = request.get_json()
-    if not payload:
-        return jsonify({"detail": "Missing JSON"}), 400
-
-    try:
-        data = TransactionRequest(**payload)
-    except Exception:
-        return jsonify({"detail": "Invalid payload"}), 400
-
     ok, msg = transaction_service.deposit(
         db=db,
         ac_no=data.acc_no,
@@ -40,19 +38,13 @@ def deposit():
 
 # ---------------- WITHDRAW ----------------
 @transaction_bp.route("/withdraw", methods=["POST"])
+@query_budget(8 + IDEMPOTENCY_CALLS)
 @roles_required("admin", "teller", "customer")
-def withdraw():
+@idempotent
+@validate_body(TransactionRequest)
+def withdraw(data: TransactionRequest):
     db = g.service
 
-    payload = request.get_json()
-    if not payload:
-        return jsonify({"detail": "Missing JSON"}), 400
-
-    try:
-        data = TransactionRequest(**payload)
-    except Exception:
-        return jsonify({"detail": "Invalid payload"}), 400
-
     ok, msg = transaction_service.withdraw(
         db=db,
         ac_no=data.acc_no,
@@ -69,19 +61,13 @@ def withdraw():
 
 # ---------------- TRANSFER ----------------
 @transaction_bp.route("/transfer", methods=["POST"])
+@query_budget(9 + IDEMPOTENCY_CALLS)
 @roles_required("admin", "teller", "customer")
-def transfer():
+@idempotent
+@validate_body(TransferRequest)
+def transfer(data: TransferRequest):
     db = g.service
 
-    payload = request.get_json()
-    if not payload:
-        return jsonify({"detail": "Missing JSON"}), 400
-
-    try:
-        data = TransferRequest(**payload)
-    except Exception:
-        return jsonify({"detail": "Invalid payload"}), 400
-
     ok, msg = transaction_service.transfer(
         db=db,
         from_ac=data.acc_no,
@@ -95,3 +81,37 @@ def transfer():
         return jsonify({"detail": msg}), 400
 
     return jsonify({"success": True, "message": msg})
+
+
+# ---------------- BATCH TRANSFER (PAYROLL) ----------------
+def _batch_budget() -> int:
+    # PIN check (read, reset, audit) + per chunk: the RPC and, if it fails, an audit row
+    chunks = -(-settings.BATCH_MAX_ITEMS // settings.BATCH_CHUNK_SIZE)
+    return 3 + 2 * chunks + IDEMPOTENCY_CALLS
+
+
+@transaction_bp.route("/batch-transfer", methods=["POST"])
+@query_budget(_batch_budget)
+@roles_required("admin", "teller", "customer")
+@idempotent
+@validate_body(BatchTransferRequest)
+def batch_transfer(data: BatchTransferRequest):
+    db = g.service
+
+    ok, result = transaction_service.batch_transfer(
+        db=db,
+        from_ac=data.acc_no,
+        items=data.items,
+        pin=data.pin,
+        all_or_nothing=data.mode == "all_or_nothing",
+        request=request,
+    )
+
+    if not ok:
+        return jsonify({"detail": result}), 400
+
+    # per-item results either way; a batch that moved nothing is a failure
+    if result["summary"]["applied"] == 0:
+        return jsonify({"success": False, "detail": "No transfers were applied.", **result}), 400
+
+    return jsonify({"success": True, **result})
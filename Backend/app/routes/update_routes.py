@@ -1,4 +1,6 @@
 from flask import Blueprint, request, jsonify, g
+from app.core.query_tracking import query_budget
+from app.core.validation import validate_body
 from app.dependencies.auth_deps import roles_required
 from app.schemas.update_schemas import (
     ChangePinRequest,
@@ -14,19 +16,12 @@ update_service = UpdateService()
 
 # -------- CHANGE PIN --------
 @update_bp.route("/change-pin", methods=["PUT"])
+@query_budget(5)
 @roles_required("admin", "teller")
-def change_pin():
+@validate_body(ChangePinRequest)
+def change_pin(data: ChangePinRequest):
     db = g.service   # middleware provided
 
-    payload = request.get_json()
-    if not payload:
-        return jsonify({"detail": "Missing JSON"}), 400
-
-    try:
-        data = ChangePinRequest(**payload)
-    except Exception:
-        return jsonify({"detail": "Invalid payload"}), 400
-
     if data.newpin != data.vnewpin:
         return jsonify({"detail": "New PINs do not match."}), 400
 
@@ -46,19 +41,12 @@ def change_pin():
 
 # -------- UPDATE MOBILE --------
 @update_bp.route("/update-mobile", methods=["PUT"])
+@query_budget(6)
 @roles_required("admin", "teller")
-def update_mobile():
+@validate_body(UpdateMobileRequest)
+def update_mobile(data: UpdateMobileRequest):
     db = g.service
 
-    payload = request.get_json()
-    if not payload:
-        return jsonify({"detail": "Missing JSON"}), 400
-
-    try:
-        data = UpdateMobileRequest(**payload)
-    except Exception:
-        return jsonify({"detail": "Invalid payload"}), 400
-
     ok, msg = update_service.update_mobile(
         db=db,
         ac_no=data.acc_no,
@@ -76,19 +64,12 @@ def update_mobile():
 
 # -------- UPDATE EMAIL --------
 @update_bp.route("/update-email", methods=["PUT"])
+@query_budget(6)
 @roles_required("admin", "teller")
-def update_email():
+@validate_body(UpdateEmailRequest)
+def update_email(data: UpdateEmailRequest):
     db = g.service
 
-    payload = request.get_json()
-    if not payload:
-        return jsonify({"detail": "Missing JSON"}), 400
-
-    try:
-        data = UpdateEmailRequest(**payload)
-    except Exception:
-        return jsonify({"detail": "Invalid payload"}), 400
-
     ok, msg = update_service.update_email(
         db=db,
         ac_no=data.acc_no,
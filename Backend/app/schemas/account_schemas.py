@@ -1,14 +1,35 @@
-from pydantic import BaseModel, Field, EmailStr
+from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, model_validator
+from .common_schemas import AccountNo
 
 
 class AccountBase(BaseModel):
-    acc_no: str = Field(..., min_length=3, max_length=32)
-    pin: str = Field(..., pattern=r"^\d{4}$")
+    acc_no: AccountNo
+    # may be omitted when an X-PIN-Session header is sent
+    pin: Optional[str] = Field(None, pattern=r"^\d{4}$")
 
 
 class CreateAccountRequest(BaseModel):
+    # EmailStr imports email_validator: build on first use / warmup, not at import
+    model_config = ConfigDict(defer_build=True)
+
     holder_name: str = Field(..., min_length=1, max_length=64, pattern=r"^[A-Za-z\s]+$")
     pin: str = Field(..., pattern=r"^\d{4}$")
     vpin: str = Field(..., pattern=r"^\d{4}$")
     mobileno: str = Field(..., min_length=10, max_length=10, pattern=r"^\d{10}$")
     gmail: EmailStr
+
+
+class AccountSearchQuery(BaseModel):
+    q: str = Field(..., min_length=2, max_length=64)
+    field: Optional[Literal["name", "mobileno", "gmail"]] = None
+    mode: Literal["prefix", "fuzzy"] = "fuzzy"
+    limit: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_fuzzy_length(self):
+        # under one trigram, similarity() matches a large share of the table
+        if self.mode == "fuzzy" and len(self.q.strip()) < 3:
+            raise ValueError("Fuzzy search needs at least 3 characters")
+        return self
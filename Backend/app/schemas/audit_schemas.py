@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class AuditLogQuery(BaseModel):
+    actor: Optional[str] = Field(None, max_length=64)
+    action: List[str] = Field(default_factory=list)
+    from_date: Optional[datetime] = None      # inclusive
+    to_date: Optional[datetime] = None        # exclusive
+    limit: int = Field(50, ge=1, le=500)
+    cursor: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.from_date and self.to_date and self.from_date >= self.to_date:
+            raise ValueError("from_date must be before to_date")
+        return self
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
 from enum import Enum
+from .common_schemas import AccountNo
 
 
 class UserRole(str, Enum):
@@ -13,3 +14,8 @@ class CreateUserRequest(BaseModel):
     pas: str = Field(..., min_length=4, max_length=64)
     vps: str = Field(..., min_length=4, max_length=64)
     role: UserRole
+
+
+class PinSessionRequest(BaseModel):
+    acc_no: AccountNo
+    pin: str = Field(..., pattern=r"^\d{4}$")
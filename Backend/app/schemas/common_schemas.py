@@ -0,0 +1,17 @@
+from typing import Annotated
+
+from pydantic import AfterValidator, Field
+
+from app.core.account_numbers import GENERATED_DIGITS, PREFIX, is_valid_account_no
+
+
+def _check_digit(ac_no: str) -> str:
+    # generated numbers carry a Luhn digit; legacy 10-digit numbers pass as-is
+    digits = ac_no[len(PREFIX):]
+    if ac_no.startswith(PREFIX) and len(digits) == GENERATED_DIGITS and digits.isdigit():
+        if not is_valid_account_no(ac_no):
+            raise ValueError("Invalid account number (check digit mismatch)")
+    return ac_no
+
+
+AccountNo = Annotated[str, Field(min_length=3, max_length=32), AfterValidator(_check_digit)]
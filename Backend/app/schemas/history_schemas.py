@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.config import settings
+from app.utils.cursor_tools import decode_cursor
+
+
+class HistoryFilters(BaseModel):
+    from_date: Optional[datetime] = None      # inclusive
+    to_date: Optional[datetime] = None        # exclusive
+    action: List[str] = Field(default_factory=list)
+    min_amount: Optional[int] = Field(None, ge=0)
+    max_amount: Optional[int] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def check_ranges(self):
+        if self.from_date and self.to_date and self.from_date >= self.to_date:
+            raise ValueError("from_date must be before to_date")
+        if (
+            self.min_amount is not None
+            and self.max_amount is not None
+            and self.min_amount > self.max_amount
+        ):
+            raise ValueError("min_amount must not exceed max_amount")
+        return self
+
+
+class HistoryQuery(HistoryFilters):
+    limit: int = Field(50, ge=1, le=500)
+    cursor: Optional[str] = None
+
+    @field_validator("cursor")
+    @classmethod
+    def check_cursor(cls, v):
+        # a mistyped cursor is the caller's error, not a missing account
+        if v is not None:
+            decode_cursor(v, 2)
+        return v
+
+
+class HistoryExportQuery(HistoryFilters):
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+
+class StatementQuery(BaseModel):
+    from_date: datetime                       # inclusive
+    to_date: datetime                         # exclusive
+
+    @model_validator(mode="after")
+    def check_period(self):
+        if self.from_date >= self.to_date:
+            raise ValueError("from_date must be before to_date")
+        if (self.to_date - self.from_date).days > settings.STATEMENT_MAX_DAYS:
+            raise ValueError(f"Statement period is limited to {settings.STATEMENT_MAX_DAYS} days")
+        return self
+
+
+class BalanceAtQuery(BaseModel):
+    at: datetime
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import Field
+
+from .account_schemas import AccountBase
+from .common_schemas import AccountNo
+
+
+class StandingInstructionRequest(AccountBase):
+    rec_acc_no: AccountNo
+    amount: int = Field(..., gt=0)
+    frequency: Literal["daily", "weekly", "monthly"]
+    start_at: Optional[datetime] = None       # first run; default now. Naive times are UTC
+    ref: Optional[str] = Field(None, max_length=64)
+
+
+class CancelInstructionRequest(AccountBase):
+    pass
@@ -1,11 +1,29 @@
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
+from app.config import settings
+from .common_schemas import AccountNo
+
 
 class TransactionRequest(BaseModel):
-    acc_no: str = Field(..., min_length=3, max_length=32)
-    pin: str = Field(..., pattern=r"^\d{4}$")
+    acc_no: AccountNo
+    # may be omitted when an X-PIN-Session header is sent
+    pin: Optional[str] = Field(None, pattern=r"^\d{4}$")
     amount: int = Field(..., gt=0)
 
 
 class TransferRequest(TransactionRequest):
-    rec_acc_no: str = Field(..., min_length=3, max_length=32)
+    rec_acc_no: AccountNo
+
+
+class BatchItem(BaseModel):
+    rec_acc_no: AccountNo
+    amount: int = Field(..., gt=0)
+    ref: Optional[str] = Field(None, max_length=64)   # e.g. payslip id, copied to history
+
+
+class BatchTransferRequest(BaseModel):
+    acc_no: AccountNo
+    pin: Optional[str] = Field(None, pattern=r"^\d{4}$")
+    mode: Literal["best_effort", "all_or_nothing"] = "best_effort"
+    items: List[BatchItem] = Field(..., min_length=1, max_length=settings.BATCH_MAX_ITEMS)
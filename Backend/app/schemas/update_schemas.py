@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from .account_schemas import AccountBase
 
 
@@ -8,10 +8,13 @@ class UpdateMobileRequest(AccountBase):
 
 
 class UpdateEmailRequest(AccountBase):
+    model_config = ConfigDict(defer_build=True)  # see CreateAccountRequest
+
     oemail: EmailStr
     nemail: EmailStr
 
 
 class ChangePinRequest(AccountBase):
+    pin: str = Field(..., pattern=r"^\d{4}$")  # PIN sessions never allowed here
     newpin: str = Field(..., pattern=r"^\d{4}$")
     vnewpin: str = Field(..., pattern=r"^\d{4}$")
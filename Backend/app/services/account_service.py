@@ -1,10 +1,18 @@
 # app/services/account_service.py
 
-from typing import Tuple, Any
+from typing import Tuple, Any, Iterable, Iterator, List
 from flask import Request
+from pydantic import ValidationError
+
+from app.config import settings
+from app.core.account_index import account_index
+from app.schemas.account_schemas import CreateAccountRequest
 from app.services.auth_service import AuthService
 
 
+ACCOUNT_NO_RETRIES = 3
+
+
 class AccountService:
     def __init__(self):
         self.auth = AuthService()
@@ -30,29 +38,37 @@ class AccountService:
         if '@' not in gmail:
             return False, "Invalid email."
 
-        # Generate account no
+        # Hash once; account numbers are retried on the (legacy) duplicate path
         try:
-            account_no = self.auth.generate_account_no()
             hashed = self.auth.hash_pin(pin)
         except Exception as e:
             return False, f"Server Error: {e}"
 
         # Insert into users
-        try:
-            user_res = (
-                db.table("users")
-                .insert({
-                    "user_name": account_no,
-                    "password": hashed,
-                    "role": "customer",
-                })
-                .execute()
-            )
-        except Exception as e:
-            msg = str(e).lower()
-            if "duplicate" in msg:
-                return False, "User already exists."
-            return False, f"User creation failed: {e}"
+        for attempt in range(ACCOUNT_NO_RETRIES):
+            try:
+                account_no = self.auth.generate_account_no(db)
+            except Exception as e:
+                return False, f"Server Error: {e}"
+
+            try:
+                user_res = (
+                    db.table("users")
+                    .insert({
+                        "user_name": account_no,
+                        "password": hashed,
+                        "role": "customer",
+                    })
+                    .execute()
+                )
+                break
+            except Exception as e:
+                msg = str(e).lower()
+                if "duplicate" in msg and attempt + 1 < ACCOUNT_NO_RETRIES:
+                    continue
+                if "duplicate" in msg:
+                    return False, "User already exists."
+                return False, f"User creation failed: {e}"
 
         if not user_res.data:
             return False, "User insert failed."
@@ -76,6 +92,8 @@ class AccountService:
             db.table("users").delete().eq("id", user_id).execute()
             return False, f"Database Error: {e}"
 
+        account_index.upsert({"account_no": account_no, "name": holder_name, "mobileno": mobileno, "gmail": gmail})
+
         # Log event
         self.auth.log_event(db, account_no, "create_account", "created", request)
 
@@ -83,3 +101,85 @@ class AccountService:
             "account_no": account_no,
             "message": f"Account created successfully with Acc_No {account_no}"
         }
+
+    # ---------------- BULK ONBOARDING ----------------
+    def bulk_create(self, db, rows: Iterable[dict], actor: str, request: Request) -> Iterator[dict]:
+        """
+        Yields one result per input row, in order. Rows are processed in
+        chunks of BULK_CHUNK_SIZE; each chunk is one DB transaction.
+        """
+        chunk = []
+        for row_no, row in enumerate(rows, start=1):
+            chunk.append((row_no, row))
+            if len(chunk) >= settings.BULK_CHUNK_SIZE:
+                yield from self._bulk_chunk(db, chunk, actor, request)
+                chunk = []
+
+        if chunk:
+            yield from self._bulk_chunk(db, chunk, actor, request)
+
+    def _bulk_chunk(self, db, chunk: List[tuple], actor: str, request: Request) -> Iterator[dict]:
+        results = {}
+        valid = []
+
+        # Validate
+        for row_no, row in chunk:
+            if not isinstance(row, dict) or "_error" in row:
+                error = row.get("_error") if isinstance(row, dict) else "Row must be an object."
+                results[row_no] = {"row": row_no, "ok": False, "error": error}
+                continue
+            try:
+                data = CreateAccountRequest(**row)
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                results[row_no] = {"row": row_no, "ok": False, "error": error}
+                continue
+            if data.pin != data.vpin:
+                results[row_no] = {"row": row_no, "ok": False, "error": "PINs do not match."}
+                continue
+            valid.append((row_no, data))
+
+        # Hash in parallel + allocate numbers, then one multi-row insert
+        if valid:
+            try:
+                hashes = self.auth.hash_pins([data.pin for _, data in valid])
+                numbers = [self.auth.generate_account_no(db) for _ in valid]
+                ip, ua = self.auth.client_info(request)
+
+                res = db.rpc("bulk_create_accounts", {
+                    "p_rows": [
+                        {
+                            "account_no": ac_no,
+                            "holder_name": data.holder_name,
+                            "pin_hash": hashed,
+                            "mobileno": data.mobileno,
+                            "gmail": data.gmail,
+                        }
+                        for (_, data), ac_no, hashed in zip(valid, numbers, hashes)
+                    ],
+                    "p_actor": actor,
+                    "p_ip": ip,
+                    "p_user_agent": ua,
+                }).execute()
+                created = set(res.data or [])
+
+                for (row_no, data), ac_no in zip(valid, numbers):
+                    if ac_no in created:
+                        account_index.upsert({
+                            "account_no": ac_no,
+                            "name": data.holder_name,
+                            "mobileno": data.mobileno,
+                            "gmail": data.gmail,
+                        })
+                        results[row_no] = {"row": row_no, "ok": True, "account_no": ac_no}
+                    else:
+                        results[row_no] = {"row": row_no, "ok": False, "error": "Not created."}
+            except Exception as e:
+                # whole chunk rolled back
+                for row_no, _ in valid:
+                    results[row_no] = {"row": row_no, "ok": False, "error": f"Chunk failed: {e}"}
+
+        for row_no, _ in chunk:
+            yield results[row_no]
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+from datetime import datetime, date, time, timedelta, UTC
+from typing import Any, List, Optional, Tuple, TYPE_CHECKING
+
+from app.config import settings
+from app.core import audit_archive
+from app.utils.cursor_tools import encode_cursor, decode_cursor, quote
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+AUDIT_COLUMNS = "id, actor, action, details, ip, user_agent, created_at"
+
+
+def _utc(at: datetime) -> datetime:
+    return at.replace(tzinfo=UTC) if at.tzinfo is None else at.astimezone(UTC)
+
+
+def _key(row: dict) -> tuple:
+    return datetime.fromisoformat(row["created_at"]), row["id"]
+
+
+class AuditLogService:
+
+    # ------------------- Hot table -------------------
+    def _query(self, db: Client, filters: dict, after: Optional[list], limit: int):
+        query = db.table("app_audit_logs").select(AUDIT_COLUMNS)
+
+        if filters.get("actor"):
+            query = query.eq("actor", filters["actor"])
+        if filters.get("action"):
+            query = query.in_("action", filters["action"])
+        if filters.get("from_date"):
+            query = query.gte("created_at", _utc(filters["from_date"]).isoformat())
+        if filters.get("to_date"):
+            query = query.lt("created_at", _utc(filters["to_date"]).isoformat())
+
+        # (created_at, id) < cursor, newest first
+        if after:
+            ts, row_id = quote(after[0]), quote(after[1])
+            query = query.or_(f"created_at.lt.{ts},and(created_at.eq.{ts},id.lt.{row_id})")
+
+        return (
+            query
+            .order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit)
+            .execute()
+        )
+
+    # ------------------- Archive -------------------
+    def _archive_page(self, db: Client, filters: dict, after: Optional[list],
+                      limit: int) -> Tuple[List[dict], Optional[list]]:
+        """
+        Archived rows older than `after`, newest first. read_audit_archive()
+        returns at most AUDIT_ARCHIVE_SCAN_CHUNKS chunks that may match, and
+        each is streamed only until the page is full. If every chunk was
+        used with the page still short, also returns the position to resume
+        from: just before the oldest chunk read.
+        """
+        from_date = _utc(filters["from_date"]) if filters.get("from_date") else None
+        to_date = _utc(filters["to_date"]) if filters.get("to_date") else None
+        after_key = (datetime.fromisoformat(after[0]), after[1]) if after else None
+
+        chunks = db.rpc("read_audit_archive", {
+            "p_actor": filters.get("actor"),
+            "p_actions": filters.get("action") or None,
+            "p_from": from_date.isoformat() if from_date else None,
+            "p_to": to_date.isoformat() if to_date else None,
+            "p_before_at": after[0] if after else None,
+            "p_before_id": after[1] if after else None,
+            "p_limit": settings.AUDIT_ARCHIVE_SCAN_CHUNKS,
+        }).execute().data or []
+
+        out = []
+        for chunk in chunks:
+            for row in audit_archive.iter_chunk(chunk["data"]):
+                # the chunk holding the cursor: seek past the rows already served
+                if after_key and _key(row) >= after_key:
+                    continue
+                if filters.get("actor") and row.get("actor") != filters["actor"]:
+                    continue
+                if filters.get("action") and row.get("action") not in filters["action"]:
+                    continue
+                at = datetime.fromisoformat(row["created_at"])
+                if (from_date and at < from_date) or (to_date and at >= to_date):
+                    continue
+                out.append({**row, "archived": True})
+                if len(out) >= limit:
+                    return out, None
+
+        if len(chunks) >= settings.AUDIT_ARCHIVE_SCAN_CHUNKS:
+            oldest = chunks[-1]
+            return out, [oldest["min_created_at"], oldest["min_id"]]
+        return out, None
+
+    # ------------------- Keyset Page -------------------
+    def get_page(
+        self,
+        db: Client,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        filters: Optional[dict] = None,
+    ) -> Tuple[bool, Any]:
+        """
+        Newest first. The hot table is read first; once it runs out, the
+        same page continues into the archive, so a cursor walks from today
+        back into the archive without the caller noticing. A page reads a
+        bounded number of archive chunks, so a selective filter may return
+        a short page together with a next_cursor.
+        """
+        filters = filters or {}
+        try:
+            after = decode_cursor(cursor, 2) if cursor else None
+        except ValueError as e:
+            return False, str(e)
+
+        try:
+            rows = [{**r, "archived": False} for r in (self._query(db, filters, after, limit + 1).data or [])]
+        except Exception as e:
+            return False, f"Database Error: {e}"
+
+        resume = None
+        if len(rows) <= limit:
+            last = [rows[-1]["created_at"], rows[-1]["id"]] if rows else after
+            try:
+                archived, resume = self._archive_page(db, filters, last, limit + 1 - len(rows))
+            except Exception as e:
+                return False, f"Archive Error: {e}"
+            rows += archived
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        elif resume:
+            # scan cap reached: a short (possibly empty) page that continues at the next chunk
+            next_cursor = encode_cursor(*resume)
+
+        return True, {"items": rows, "next_cursor": next_cursor}
+
+    # ------------------- Retention -------------------
+    def _oldest_rows(self, db: Client, start: datetime, end: datetime) -> List[dict]:
+        """The day's oldest AUDIT_ARCHIVE_PAGE_SIZE rows, ascending (created_at, id): the next chunk."""
+        return (
+            db.table("app_audit_logs")
+            .select(AUDIT_COLUMNS)
+            .gte("created_at", start.isoformat())
+            .lt("created_at", end.isoformat())
+            .order("created_at")
+            .order("id")
+            .limit(settings.AUDIT_ARCHIVE_PAGE_SIZE)
+            .execute()
+        ).data or []
+
+    def apply_retention(self, db: Client, days: Optional[int] = None, now: Optional[datetime] = None) -> dict:
+        """
+        Moves every whole UTC day older than `days` (AUDIT_RETENTION_DAYS)
+        into app_audit_log_archive, oldest first, one chunk at a time.
+        archive_audit_chunk() stores a chunk and deletes its rows in one
+        transaction, so an interrupted run just continues where it stopped.
+        """
+        days = settings.AUDIT_RETENTION_DAYS if days is None else days
+        now = _utc(now or datetime.now(UTC))
+        cutoff = datetime.combine((now - timedelta(days=days)).date(), time(), UTC)
+
+        report, seen = [], set()
+        while True:
+            oldest = (
+                db.table("app_audit_logs")
+                .select("created_at")
+                .lt("created_at", cutoff.isoformat())
+                .order("created_at")
+                .limit(1)
+                .execute()
+            ).data
+            if not oldest:
+                break
+
+            day: date = datetime.fromisoformat(oldest[0]["created_at"]).astimezone(UTC).date()
+            if day in seen:
+                raise RuntimeError(f"Audit rows for {day} were archived but not deleted")
+            seen.add(day)
+
+            start = datetime.combine(day, time(), UTC)
+            end = start + timedelta(days=1)
+
+            archived = chunks = 0
+            while True:
+                rows = self._oldest_rows(db, start, end)
+                if not rows:
+                    break
+                archived += db.rpc("archive_audit_chunk", audit_archive.encode_chunk(day, rows)).execute().data
+                chunks += 1
+                if len(rows) < settings.AUDIT_ARCHIVE_PAGE_SIZE:
+                    break
+
+            report.append({"day": day.isoformat(), "archived": archived, "chunks": chunks})
+
+        return {"cutoff": cutoff.isoformat(), "days": report}
@@ -1,8 +1,20 @@
-from bcrypt import hashpw, gensalt, checkpw
-from typing import Tuple, Any
-from flask import request  # Flask request ONLY
-import random
-from supabase import Client
+from __future__ import annotations
+
+from typing import Tuple, Any, Optional, TYPE_CHECKING
+from flask import request, g  # Flask request ONLY
+from datetime import datetime, UTC
+
+from app.config import settings
+from app.core.audit_writer import audit_writer
+from app.core.user_cache import invalidate_user
+from app.core.hashing import hasher, needs_rehash, HashQueueFull
+from app.core import pin_sessions
+from app.core.account_numbers import allocator
+from app.core.account_cache import account_cache, SNAPSHOT_COLUMNS
+from app.utils.db_errors import is_missing_column, is_missing_function
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 class AuthService:
@@ -24,8 +36,8 @@ class AuthService:
         return response.data if response.data else None
 
     # ---------------- EVENT LOGGING ----------------
-    def log_event(self, db: Client, actor: str, action: str, details: str, request):
-        # Flask request object
+    def client_info(self, request) -> Tuple[str, str]:
+        # Flask request object → (ip, user agent)
         try:
             ip = request.remote_addr or "unknown"
         except Exception:
@@ -36,29 +48,47 @@ class AuthService:
         except Exception:
             ua = "unknown"
 
+        return ip, ua
+
+    def log_event(self, db: Client, actor: str, action: str, details: str, request):
+        ip, ua = self.client_info(request)
+
         data = {
             "actor": actor,
             "action": action,
             "details": details,
             "ip": ip,
             "user_agent": ua,
+            "created_at": datetime.now(UTC).isoformat(),
         }
 
+        # Background batched insert (spooled to disk if it cannot be written)
+        if settings.AUDIT_ASYNC:
+            audit_writer.submit(data)
+            return
+
         try:
             db.table("app_audit_logs").insert(data).execute()
         except Exception:
             pass
 
     # ---------------- PIN FUNCTIONS ----------------
+    # bcrypt runs on the bounded hashing pool (may raise HashQueueFull)
     def hash_pin(self, pin: str) -> str:
-        return hashpw(pin.encode(), gensalt()).decode()
+        return hasher.hash(pin)
+
+    def hash_pins(self, pins: list) -> list:
+        return hasher.hash_many(pins)
 
     def verify_pin(self, pin: str, hashed_pin: str) -> bool:
-        return checkpw(pin.encode(), hashed_pin.encode())
+        return hasher.verify(pin, hashed_pin)
 
     # ---------------- ACCOUNT NO ----------------
-    def generate_account_no(self) -> str:
-        return "AC" + str(random.randint(10**9, 10**10 - 1))
+    def generate_account_no(self, db: Client) -> str:
+        # Block-reserved, Luhn-checked numbers (migration 0004). Raises when
+        # no block can be reserved; the create fails rather than falling
+        # back to unchecked random numbers.
+        return allocator.next(db)
 
     # ---------------- ACCOUNT CREATION ----------------
     def create(self, db: Client, holder: str, pin: str, vpin: str, mobileno: str, gmail: str) -> Tuple[bool, Any]:
@@ -73,7 +103,7 @@ class AuthService:
             return False, "Invalid email."
 
         try:
-            account_no = str(self.generate_account_no())
+            account_no = str(self.generate_account_no(db))
             hashed = self.hash_pin(pin)
         except Exception as e:
             return False, f"Server Error: {e}"
@@ -134,11 +164,13 @@ class AuthService:
     def create_employ(self, db: Client, username: str, pas: str, role: str) -> Tuple[bool, str]:
         try:
             hashed = self.hash_pin(pas)
-            db.table("users").insert({
+            res = db.table("users").insert({
                 "user_name": username,
                 "password": hashed,
                 "role": role
             }).execute()
+            for row in res.data or []:
+                invalidate_user(row.get("id"), row.get("uid"))
             return True, f"User created: {username}"
         except Exception as e:
             msg = str(e).lower()
@@ -163,63 +195,266 @@ class AuthService:
             return False
 
         stored_hash = resp.data[0]["password"]
-        return checkpw(pw.encode(), stored_hash.encode())
+        if not self.verify_pin(pw, stored_hash):
+            return False
+
+        # Transparent upgrade to the configured bcrypt cost
+        if needs_rehash(stored_hash):
+            try:
+                db.table("users").update({"password": self.hash_pin(pw)}).eq("user_name", username).execute()
+            except Exception:
+                pass
+
+        return True
 
     # ---------------- PIN VALIDATION & LOCKOUT ----------------
-    def check(self, db: Client, ac_no: str, pin: str, request) -> Tuple[bool, str]:
-        pin = str(pin).strip()
+    def check(self, db: Client, ac_no: str, pin: str, request, defer_success: bool = False) -> Tuple[bool, str]:
+        """
+        defer_success=True skips the success writes (attempt reset + audit);
+        the caller's atomic RPC performs them in the same DB transaction.
+        Without a PIN, a valid X-PIN-Session header is accepted instead.
+        """
+        ok, msg, _ = self._check(db, ac_no, pin, request, defer_success)
+        return ok, msg
+
+    def _check(self, db: Client, ac_no: str, pin: str, request, defer_success: bool = False) -> Tuple[bool, str, Optional[str]]:
+        """check(), plus the account's current PIN hash once it has passed."""
+        token = self._pin_session_header(request)
+        if token and not pin:
+            return self._check_session(db, ac_no, token, request, defer_success)
+
+        pin = str(pin).strip() if pin is not None else ""
+        if not pin:
+            return False, "PIN is required.", None
+
         try:
-            response = (
-                db.table("accounts")
-                .select("pin, failed_attempts, is_locked")
-                .eq("account_no", ac_no)
-                .single()
-                .execute()
-            )
+            response = self._read_account(db, ac_no, self._lock_columns("pin"))
         except Exception as e:
             self.log_event(db, "unknown", "pin_failed", f"DB Error: {e}", request)
-            return False, "Server error. Try again."
+            return False, "Server error. Try again.", None
 
         if not response or not response.data:
             self.log_event(db, "unknown", "pin_failed", f"Account {ac_no} not found", request)
-            return False, "Account not found."
+            return False, "Account not found.", None
 
         stored_hash = response.data["pin"]
-        attempts = response.data["failed_attempts"] or 0
-        locked = response.data["is_locked"]
-
-        if locked:
-            self.log_event(db, ac_no, "pin_failed", "Account locked", request)
-            return False, "Account locked. Contact bank."
+        locked_msg, attempts = self._lock_state(db, ac_no, response.data, request)
+        if locked_msg:
+            return False, locked_msg, None
 
-        if self.verify_pin(pin, stored_hash):
-            try:
-                db.table("accounts").update({"failed_attempts": 0}).eq("account_no", ac_no).execute()
-            except:
-                pass
+        try:
+            pin_ok = self.verify_pin(pin, stored_hash)
+        except HashQueueFull:
+            return False, "Server busy. Try again.", None
+
+        if pin_ok:
+            # Only write when there is something to change
+            reset = {"failed_attempts": 0} if attempts and not defer_success else {}
+            if needs_rehash(stored_hash):
+                try:
+                    reset["pin"] = self.hash_pin(pin)
+                except HashQueueFull:
+                    pass  # upgrade on a later check
+
+            if reset:
+                try:
+                    db.table("accounts").update(reset).eq("account_no", ac_no).execute()
+                    stored_hash = reset.get("pin", stored_hash)
+                except:
+                    pass
+
+            if defer_success:
+                return True, "PIN verified.", stored_hash
 
             self.log_event(db, ac_no, "pin_success", "PIN verified", request)
-            return True, "PIN verified."
+            return True, "PIN verified.", stored_hash
 
         # Wrong PIN
-        attempts += 1
-        if attempts >= 3:
-            try:
-                db.table("accounts").update({
-                    "failed_attempts": attempts,
-                    "is_locked": True
-                }).eq("account_no", ac_no).execute()
-            except:
-                pass
+        max_attempts = settings.PIN_MAX_ATTEMPTS
+        try:
+            attempts, locked = self._register_failure(db, ac_no, attempts)
+        except Exception as e:
+            # fail closed: the PIN was wrong either way
+            self.log_event(db, ac_no, "pin_failed", f"Lockout Error: {e}", request)
+            return False, "Server error. Try again.", None
 
-            self.log_event(db, ac_no, "account_locked", "3 wrong attempts", request)
-            return False, "Account locked after 3 wrong PIN attempts."
+        if locked:
+            self._revoke_sessions(db, ac_no, request)
+            self.log_event(db, ac_no, "account_locked", f"{max_attempts} wrong attempts", request)
+            return False, f"Account locked after {max_attempts} wrong PIN attempts.", None
+
+        left = max_attempts - attempts
+        self.log_event(db, ac_no, "pin_failed", f"Wrong PIN, {left} tries left", request)
+        return False, f"Wrong PIN. {left} tries left.", None
+
+    # ---------------- ACCOUNT READ ----------------
+    _snapshot_columns = True   # False once we learn accounts.version is missing (0006 not applied)
+
+    def _read_account(self, db: Client, ac_no: str, columns: str):
+        """
+        The PIN check's account read. It also fetches the snapshot columns
+        (same round trip) and stores them in the account cache, so the
+        caller can get balance/contact fields without another query.
+        """
+        if AuthService._snapshot_columns:
+            try:
+                response = (
+                    db.table("accounts")
+                    .select(f"{columns}, {SNAPSHOT_COLUMNS}")
+                    .eq("account_no", ac_no)
+                    .single()
+                    .execute()
+                )
+            except Exception as e:
+                # only a missing column settles it; anything else may be transient
+                if not is_missing_column(e):
+                    raise
+                AuthService._snapshot_columns = False
+            else:
+                if response and response.data:
+                    account_cache.put(response.data)
+                return response
+
+        return (
+            db.table("accounts")
+            .select(columns)
+            .eq("account_no", ac_no)
+            .single()
+            .execute()
+        )
+
+    # ---------------- LOCKOUT STATE ----------------
+    def _lock_columns(self, columns: str) -> str:
+        cooldown = settings.PIN_LOCK_COOLDOWN_MINUTES
+        return f"{columns}, failed_attempts, is_locked" + (", locked_until" if cooldown else "")
+
+    def _lock_state(self, db: Client, ac_no: str, row: dict, request) -> Tuple[Optional[str], int]:
+        """
+        (lock message or None, failed attempts) for an account row read
+        with _lock_columns(). A cooldown lock that has run out is released.
+        Shared by the PIN check and the PIN-session check.
+        """
+        attempts = row["failed_attempts"] or 0
+        if not row["is_locked"]:
+            return None, attempts
+
+        cooldown = settings.PIN_LOCK_COOLDOWN_MINUTES
+        if cooldown and self._release_expired_lock(db, ac_no, row.get("locked_until")):
+            return None, 0
+
+        self.log_event(db, ac_no, "pin_failed", "Account locked", request)
+        if cooldown:
+            return "Account locked. Try again later.", attempts
+        return "Account locked. Contact bank.", attempts
+
+    def _register_failure(self, db: Client, ac_no: str, attempts: int) -> Tuple[int, bool]:
+        """
+        Atomic server-side increment + lock (register_pin_failure RPC).
+        Falls back to the old read-then-update only if the RPC is not
+        deployed; any other error is raised, since the fallback can lose
+        increments under concurrent wrong PINs.
+        """
+        max_attempts = settings.PIN_MAX_ATTEMPTS
+        try:
+            res = db.rpc("register_pin_failure", {
+                "p_ac_no": ac_no,
+                "p_max_attempts": max_attempts,
+                "p_cooldown_minutes": settings.PIN_LOCK_COOLDOWN_MINUTES,
+            }).execute()
+            return res.data["failed_attempts"], res.data["is_locked"]
+        except Exception as e:
+            if not is_missing_function(e):
+                raise
 
-        # Update attempts
+        attempts += 1
+        update = {"failed_attempts": attempts}
+        if attempts >= max_attempts:
+            update["is_locked"] = True
         try:
-            db.table("accounts").update({"failed_attempts": attempts}).eq("account_no", ac_no).execute()
+            db.table("accounts").update(update).eq("account_no", ac_no).execute()
         except:
             pass
+        return attempts, attempts >= max_attempts
+
+    def _release_expired_lock(self, db: Client, ac_no: str, locked_until) -> bool:
+        if not locked_until:
+            return False
+        try:
+            if datetime.fromisoformat(str(locked_until)) > datetime.now(UTC):
+                return False
+            res = db.rpc("release_expired_pin_lock", {"p_ac_no": ac_no}).execute()
+            return bool(res.data)
+        except Exception:
+            return False
+
+    # ---------------- PIN SESSIONS ----------------
+    def _pin_session_header(self, request):
+        try:
+            return request.headers.get(pin_sessions.PIN_SESSION_HEADER)
+        except Exception:
+            return None
+
+    def _session_id(self):
+        # the login session (access token's sid), not the user: another
+        # login by the same user cannot reuse this session's PIN sessions
+        user = getattr(g, "current_user", None)
+        return user.get("sid") if user else None
+
+    def _revoke_sessions(self, db: Client, ac_no: str, request):
+        try:
+            pin_sessions.revoke_account(db, ac_no)
+        except Exception as e:
+            self.log_event(db, ac_no, "pin_session_revoke_failed", f"DB Error: {e}", request)
+
+    def open_pin_session(self, db: Client, ac_no: str, pin: str, request) -> Tuple[bool, str]:
+        """Full PIN check, then a short-lived token scoped to account + login session."""
+        sid = self._session_id()
+        if not sid:
+            return False, "Login session required."
+
+        # the check's own account read supplies the hash the session is bound to
+        ok, msg, pin_hash = self._check(db, ac_no, pin, request)
+        if not ok:
+            return False, msg
+
+        token = pin_sessions.issue(ac_no, sid, pin_hash)
+        self.log_event(db, ac_no, "pin_session_open", f"Session for {sid}", request)
+        return True, token
+
+    def _check_session(self, db: Client, ac_no: str, token: str, request, defer_success: bool) -> Tuple[bool, str, Optional[str]]:
+        claims = pin_sessions.validate(token, ac_no, self._session_id())
+        if not claims:
+            self.log_event(db, ac_no, "pin_failed", "Invalid PIN session", request)
+            return False, "PIN session expired or invalid.", None
+
+        # No bcrypt and no writes, but lock state is always re-read
+        try:
+            response = self._read_account(
+                db, ac_no, self._lock_columns(f"pin, {pin_sessions.REVOKED_COLUMN}")
+            )
+        except Exception:
+            return False, "Server error. Try again.", None
+
+        if not response or not response.data:
+            return False, "Account not found.", None
+
+        revoked = pin_sessions.is_revoked(claims, response.data[pin_sessions.REVOKED_COLUMN])
+
+        locked_msg, attempts = self._lock_state(db, ac_no, response.data, request)
+        if locked_msg:
+            if not revoked:
+                self._revoke_sessions(db, ac_no, request)
+            return False, locked_msg, None
+
+        if revoked:
+            return False, "PIN session expired or invalid.", None
+
+        # A PIN change, or any wrong PIN since, forces the PIN again
+        if claims.get("pv") != pin_sessions.pin_fingerprint(response.data["pin"]):
+            return False, "PIN session expired or invalid.", None
+        if attempts:
+            return False, "PIN required.", None
 
-        self.log_event(db, ac_no, "pin_failed", f"Wrong PIN, {3-attempts} tries left", request)
-        return False, f"Wrong PIN. {3 - attempts} tries left."
+        if not defer_success:
+            self.log_event(db, ac_no, "pin_success", "PIN session verified", request)
+        return True, "PIN verified.", response.data["pin"]
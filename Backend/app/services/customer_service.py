@@ -1,7 +1,13 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from flask import Request
-from supabase import Client
+from app.core.account_cache import account_cache, SNAPSHOT_COLUMNS
 from app.services.auth_service import AuthService
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 
 class CustomerService:
     def __init__(self):
@@ -15,14 +21,19 @@ class CustomerService:
             return False, msg
 
         try:
-            response = (
-                db.table("accounts")
-                .select("balance")
-                .eq("account_no", ac_no)
-                .single()
-                .execute()
-            )
-            balance = response.data["balance"]
+            # the PIN check has usually just cached the balance at the current version
+            snapshot = account_cache.get_fresh(ac_no, "balance")
+            if snapshot is None:
+                response = (
+                    db.table("accounts")
+                    .select(SNAPSHOT_COLUMNS if AuthService._snapshot_columns else "balance")
+                    .eq("account_no", ac_no)
+                    .single()
+                    .execute()
+                )
+                snapshot = response.data
+                account_cache.put(snapshot)
+            balance = snapshot["balance"]
 
             self.auth.log_event(
                 db,
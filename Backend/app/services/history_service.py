@@ -1,7 +1,16 @@
 # app/services/history_service.py
 
-from typing import Any, Tuple, Optional
-from supabase import Client
+from __future__ import annotations
+
+from typing import Any, Tuple, Optional, Iterator, TYPE_CHECKING
+
+from app.utils.cursor_tools import encode_cursor, decode_cursor, quote
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+HISTORY_COLUMNS = "id, account_no, action, amount, context, created_at"
 
 
 class HistoryService:
@@ -30,7 +39,7 @@ class HistoryService:
         try:
             response = (
                 db.table("history")
-                .select("id, account_no, action, amount, context, created_at")
+                .select(HISTORY_COLUMNS)
                 .eq("account_no", ac_no)
                 .order("created_at", desc=True)
                 .execute()
@@ -42,3 +51,81 @@ class HistoryService:
 
         except Exception as e:
             return False, f"Database Error: {e}"
+
+    # ------------------- Keyset Page -------------------
+    def _query(self, db: Client, ac_no: str, filters: Optional[dict], after: Optional[list], limit: int):
+        query = (
+            db.table("history")
+            .select(HISTORY_COLUMNS)
+            .eq("account_no", ac_no)
+        )
+
+        filters = filters or {}
+        if filters.get("from_date"):
+            query = query.gte("created_at", filters["from_date"].isoformat())
+        if filters.get("to_date"):
+            query = query.lt("created_at", filters["to_date"].isoformat())
+        if filters.get("action"):
+            query = query.in_("action", filters["action"])
+        if filters.get("min_amount") is not None:
+            query = query.gte("amount", filters["min_amount"])
+        if filters.get("max_amount") is not None:
+            query = query.lte("amount", filters["max_amount"])
+
+        # (created_at, id) < cursor, newest first
+        if after:
+            ts, row_id = quote(after[0]), quote(after[1])
+            query = query.or_(f"created_at.lt.{ts},and(created_at.eq.{ts},id.lt.{row_id})")
+
+        return (
+            query
+            .order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit)
+            .execute()
+        )
+
+    def get_page(
+        self,
+        db: Client,
+        ac_no: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        filters: Optional[dict] = None,
+    ) -> Tuple[bool, Any]:
+        try:
+            after = decode_cursor(cursor, 2) if cursor else None
+        except ValueError as e:
+            return False, str(e)
+
+        try:
+            # one extra row tells us whether another page exists
+            rows = self._query(db, ac_no, filters, after, limit + 1).data or []
+        except Exception as e:
+            return False, f"Database Error: {e}"
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+
+        return True, {"items": rows, "next_cursor": next_cursor}
+
+    # ------------------- Streaming Export -------------------
+    def iter_history(
+        self,
+        db: Client,
+        ac_no: str,
+        filters: Optional[dict] = None,
+        chunk_size: int = 500,
+    ) -> Iterator[dict]:
+        """Yields every matching row, one keyset page in memory at a time."""
+        after = None
+        while True:
+            rows = self._query(db, ac_no, filters, after, chunk_size).data or []
+            yield from rows
+
+            if len(rows) < chunk_size:
+                return
+            after = [rows[-1]["created_at"], rows[-1]["id"]]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from datetime import datetime, UTC
+from typing import Any, Optional, Tuple, TYPE_CHECKING
+from flask import Request
+
+from app.config import settings
+from app.core.account_cache import account_cache
+from app.services.auth_service import AuthService
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+INSTRUCTION_COLUMNS = (
+    "id, from_ac, to_ac, amount, frequency, start_at, next_run_at, status, "
+    "retries, ref, last_run_at, last_error, created_at"
+)
+
+
+def utc_iso(at: Optional[datetime] = None) -> str:
+    at = at or datetime.now(UTC)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=UTC)
+    return at.astimezone(UTC).isoformat(timespec="microseconds")
+
+
+class InstructionService:
+    def __init__(self):
+        self.auth = AuthService()
+
+    # ---------- Create ----------
+    def create(self, db: Client, from_ac: str, to_ac: str, amount: int, frequency: str,
+               start_at: Optional[datetime], ref: Optional[str], pin: str, actor: str,
+               request: Request) -> Tuple[bool, Any]:
+        if from_ac == to_ac:
+            return False, "Sender and receiver must differ."
+
+        ok, msg = self.auth.check(db, ac_no=from_ac, pin=pin, request=request)
+        if not ok:
+            return False, msg
+
+        try:
+            receiver = db.table("accounts").select("account_no").eq("account_no", to_ac).execute()
+            if not receiver.data:
+                return False, "Receiver account not found."
+
+            first_run = utc_iso(start_at)
+            res = db.table("standing_instructions").insert({
+                "from_ac": from_ac,
+                "to_ac": to_ac,
+                "amount": amount,
+                "frequency": frequency,
+                "start_at": first_run,
+                "next_run_at": first_run,
+                "ref": ref,
+                "created_by": actor,
+            }).execute()
+        except Exception as e:
+            return False, f"Could not save instruction: {e}"
+
+        instruction = res.data[0]
+        self.auth.log_event(
+            db, from_ac, "standing_instruction_created",
+            f"#{instruction['id']}: {amount} to {to_ac} {frequency}", request,
+        )
+        return True, instruction
+
+    # ---------- List ----------
+    def list_for_account(self, db: Client, ac_no: str, pin: str, request: Request) -> Tuple[bool, Any]:
+        ok, msg = self.auth.check(db, ac_no=ac_no, pin=pin, request=request)
+        if not ok:
+            return False, msg
+
+        try:
+            res = (
+                db.table("standing_instructions")
+                .select(INSTRUCTION_COLUMNS)
+                .eq("from_ac", ac_no)
+                .order("id")
+                .execute()
+            )
+        except Exception as e:
+            return False, f"Could not load instructions: {e}"
+        return True, res.data or []
+
+    # ---------- Cancel ----------
+    def cancel(self, db: Client, instruction_id: int, ac_no: str, pin: str, request: Request) -> Tuple[bool, str]:
+        ok, msg = self.auth.check(db, ac_no=ac_no, pin=pin, request=request)
+        if not ok:
+            return False, msg
+
+        try:
+            res = (
+                db.table("standing_instructions")
+                .update({"status": "cancelled"})
+                .eq("id", instruction_id)
+                .eq("from_ac", ac_no)
+                .eq("status", "active")
+                .execute()
+            )
+        except Exception as e:
+            return False, f"Cancel failed: {e}"
+
+        if not res.data:
+            return False, "No active instruction with that id on this account."
+
+        self.auth.log_event(db, ac_no, "standing_instruction_cancelled", f"#{instruction_id}", request)
+        return True, "Standing instruction cancelled."
+
+    # ---------- Run due instructions ----------
+    def run_due(self, db: Client, limit: int) -> dict:
+        """
+        One DB transaction: claims up to `limit` due instructions, runs them
+        and reschedules them. Returns {"processed", "results"}.
+        """
+        res = db.rpc("run_standing_instructions", {
+            "p_limit": limit,
+            "p_max_retries": settings.SI_MAX_RETRIES,
+            "p_retry_base_seconds": settings.SI_RETRY_BASE_SECONDS,
+        }).execute()
+        data = res.data or {"processed": 0, "results": []}
+
+        if data["processed"]:
+            # balances moved outside any request: drop the snapshots
+            ids = [r["id"] for r in data["results"] if r["outcome"] == "done"]
+            if ids:
+                rows = (
+                    db.table("standing_instructions").select("from_ac, to_ac").in_("id", ids).execute()
+                ).data or []
+                account_cache.invalidate(*{ac for row in rows for ac in (row["from_ac"], row["to_ac"])})
+        return data
+
+    def upcoming(self, db: Client, limit: int) -> list:
+        """Next due times in order, read from the due-time index."""
+        res = (
+            db.table("standing_instructions")
+            .select("id, next_run_at")
+            .eq("status", "active")
+            .order("next_run_at")
+            .limit(limit)
+            .execute()
+        )
+        return res.data or []
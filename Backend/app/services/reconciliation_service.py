@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC
+from typing import Callable, List, Optional, TYPE_CHECKING
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+class ReconciliationService:
+    """
+    accounts.balance vs. the signed sum of each account's history.
+
+    The per-account group-by runs in the database (reconcile_balances, one
+    keyset page of accounts per call), so nothing here holds more than one
+    page. The account number space is split into `workers` ranges that are
+    walked on parallel connections.
+    """
+
+    def __init__(self, client_factory: Callable[[], Client]):
+        self._client_factory = client_factory
+
+    def _ranges(self, db: Client, parts: int) -> List[tuple]:
+        bounds = db.rpc("account_partitions", {"p_parts": parts}).execute().data or []
+        lowers = [None] + bounds[:-1]
+        return list(zip(lowers, bounds))
+
+    def _walk(self, lower: Optional[str], upper: Optional[str], page_size: int) -> dict:
+        db = self._client_factory()
+        summary = {"checked": 0, "entries": 0, "pages": 0, "mismatches": []}
+        after = lower
+        while True:
+            page = db.rpc("reconcile_balances", {
+                "p_after": after, "p_until": upper, "p_limit": page_size,
+            }).execute().data
+            summary["pages"] += 1
+            summary["checked"] += page["checked"]
+            summary["entries"] += page["entries"]
+            summary["mismatches"].extend(page["mismatches"])
+            if page["checked"] < page_size:
+                return summary
+            after = page["last"]
+
+    def run(self, workers: Optional[int] = None, page_size: Optional[int] = None) -> dict:
+        workers = workers or settings.RECONCILE_WORKERS
+        page_size = page_size or settings.RECONCILE_PAGE_SIZE
+        started = time.perf_counter()
+
+        ranges = self._ranges(self._client_factory(), workers)
+        with ThreadPoolExecutor(max_workers=max(len(ranges), 1), thread_name_prefix="reconcile") as pool:
+            parts = list(pool.map(lambda r: self._walk(r[0], r[1], page_size), ranges))
+
+        mismatches = sorted((m for p in parts for m in p["mismatches"]), key=lambda m: m["account_no"])
+        return {
+            "generated_at": datetime.now(UTC).isoformat(),
+            "ok": not mismatches,
+            "accounts_checked": sum(p["checked"] for p in parts),
+            "history_rows": sum(p["entries"] for p in parts),
+            "partitions": len(ranges),
+            "pages": sum(p["pages"] for p in parts),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "net_difference": sum(m["difference"] for m in mismatches),
+            "mismatches": mismatches,
+        }
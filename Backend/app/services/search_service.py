@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Any, Optional, Tuple, TYPE_CHECKING
+
+from app.core.account_index import account_index
+from app.utils.cursor_tools import encode_cursor, decode_cursor
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+PREFIX_RANK = 1.0
+
+
+class AccountSearchService:
+
+    # ------------------- Search -------------------
+    def search(
+        self,
+        db: Client,
+        query: str,
+        field: Optional[str] = None,
+        mode: str = "fuzzy",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[bool, Any]:
+        """
+        Prefix (and, in fuzzy mode, trigram) matches on name, mobile number
+        and email, ranked (rank desc, account_no). One keyset page per call;
+        the cursor is the last row's (rank, account_no). Prefix hits all
+        rank PREFIX_RANK, so prefix mode pages on account_no alone.
+        """
+        try:
+            after_rank, after_ac = decode_cursor(cursor, 2) if cursor else (None, None)
+        except ValueError as e:
+            return False, str(e)
+
+        rows = None
+        if mode == "prefix" and (after_rank is None or after_rank == PREFIX_RANK):
+            # served from memory when the in-process index is complete and fresh
+            rows = account_index.lookup(query, field, limit + 1, after_ac)
+            if rows is not None:
+                rows = [{**r, "rank": PREFIX_RANK} for r in rows]
+
+        if rows is None:
+            try:
+                rows = db.rpc("search_accounts", {
+                    "p_query": query,
+                    "p_field": field,
+                    "p_fuzzy": mode == "fuzzy",
+                    "p_limit": limit + 1,
+                    "p_after_rank": after_rank,
+                    "p_after_ac": after_ac,
+                }).execute().data or []
+            except Exception as e:
+                return False, f"Database Error: {e}"
+
+        # one extra row tells us whether another page exists
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["rank"], rows[-1]["account_no"])
+
+        return True, {"items": rows, "next_cursor": next_cursor}
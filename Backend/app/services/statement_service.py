@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from datetime import datetime, date, time, timedelta, UTC
+from typing import Any, Optional, Tuple, TYPE_CHECKING
+
+from app.config import settings
+from app.services.history_service import HistoryService
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+# effect of a history row on the balance; every other action is 0
+SIGNED_ACTIONS = {"deposit": 1, "transfer_in": 1, "withdraw": -1, "transfer_out": -1}
+
+
+def signed_amount(row: dict) -> int:
+    return SIGNED_ACTIONS.get(row["action"], 0) * (row.get("amount") or 0)
+
+
+def _utc(at: datetime) -> datetime:
+    return at.replace(tzinfo=UTC) if at.tzinfo is None else at.astimezone(UTC)
+
+
+class StatementService:
+    def __init__(self):
+        self.history = HistoryService()
+
+    # ------------------- Snapshot Job -------------------
+    def build_snapshots(self, db: Client, now: Optional[datetime] = None) -> dict:
+        """
+        Brings balance_snapshots up to the last closed UTC day, one
+        SNAPSHOT_CHUNK_SIZE transaction at a time, reading only history
+        rows past the watermark.
+        """
+        now = _utc(now or datetime.now(UTC)) - timedelta(seconds=settings.SNAPSHOT_SETTLE_SECONDS)
+        before = datetime.combine(now.date(), time(), UTC).isoformat(timespec="microseconds")
+
+        summary = {"processed": 0, "snapshots": 0, "watermark": None, "chunks": 0}
+        while True:
+            res = db.rpc("build_balance_snapshots", {
+                "p_before": before, "p_limit": settings.SNAPSHOT_CHUNK_SIZE,
+            }).execute()
+            chunk = res.data
+            summary["processed"] += chunk["processed"]
+            summary["snapshots"] += chunk["snapshots"]
+            summary["watermark"] = chunk["watermark"]
+            summary["chunks"] += 1
+            if not chunk["more"]:
+                return summary
+
+    # ------------------- Replay -------------------
+    def _replay(self, db: Client, ac_no: str, until: datetime, keep_from: Optional[datetime] = None):
+        """
+        Balance just before `until`: the latest snapshot of a day that ended
+        by then (by `keep_from`, if given), plus the history rows after it.
+        Rows at or after `keep_from` are returned oldest first with the
+        balance after each one.
+
+        Rows that are only summed never leave the database
+        (history_balance_delta, 0017); only the statement entries are
+        fetched.
+        """
+        anchor = keep_from or until
+        snap = (
+            db.table("balance_snapshots")
+            .select("day, balance")
+            .eq("account_no", ac_no)
+            .lt("day", anchor.date().isoformat())
+            .order("day", desc=True)
+            .limit(1)
+            .execute()
+        ).data
+
+        balance, since = 0, None
+        if snap:
+            balance = snap[0]["balance"]
+            since = datetime.combine(date.fromisoformat(str(snap[0]["day"])[:10]) + timedelta(days=1), time(), UTC)
+
+        balance += db.rpc("history_balance_delta", {
+            "p_ac_no": ac_no,
+            "p_from": since.isoformat() if since else None,
+            "p_to": anchor.isoformat(),
+        }).execute().data or 0
+
+        opening, entries = balance, []
+        if keep_from is not None:
+            # newest first from the keyset index; reversed to replay in order
+            rows = list(self.history.iter_history(db, ac_no, filters={"from_date": keep_from, "to_date": until}))
+            rows.reverse()
+            for row in rows:
+                balance += signed_amount(row)
+                entries.append({**row, "balance": balance})
+        return opening, balance, entries, snap[0]["day"] if snap else None
+
+    # ------------------- Point-in-time Balance -------------------
+    def balance_at(self, db: Client, ac_no: str, at: datetime) -> Tuple[bool, Any]:
+        try:
+            _, balance, _, snapshot_day = self._replay(db, ac_no, _utc(at))
+        except Exception as e:
+            return False, f"Database Error: {e}"
+        return True, {"account_no": ac_no, "at": _utc(at).isoformat(), "balance": balance, "snapshot_day": snapshot_day}
+
+    # ------------------- Statement -------------------
+    def statement(self, db: Client, ac_no: str, from_date: datetime, to_date: datetime) -> Tuple[bool, Any]:
+        from_date, to_date = _utc(from_date), _utc(to_date)
+        try:
+            opening, closing, entries, snapshot_day = self._replay(db, ac_no, to_date, keep_from=from_date)
+        except Exception as e:
+            return False, f"Database Error: {e}"
+
+        return True, {
+            "account_no": ac_no,
+            "from_date": from_date.isoformat(),
+            "to_date": to_date.isoformat(),
+            "opening_balance": opening,
+            "closing_balance": closing,
+            "credits": sum(e["amount"] for e in entries if signed_amount(e) > 0),
+            "debits": sum(e["amount"] for e in entries if signed_amount(e) < 0),
+            "entries": entries,
+            "snapshot_day": snapshot_day,
+        }
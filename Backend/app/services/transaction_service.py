@@ -1,20 +1,105 @@
 # app/services/transaction_service.py
 
-from typing import Tuple
+from __future__ import annotations
+
+import uuid
+from typing import Any, List, Tuple, Optional, TYPE_CHECKING
 from flask import Request
-from supabase import Client
 
+from app.config import settings
+from app.core.account_cache import account_cache
+from app.core.idempotency import write_started
 from app.services.auth_service import AuthService
 from app.services.history_service import HistoryService
 
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+def rpc_error_message(label: str, e: Exception | str) -> str:
+    error = str(e).lower()
+
+    if "locked" in error:
+        return "Account locked. Contact bank."
+    # before the "sender"/"receiver" checks: this message mentions both
+    if "must differ" in error:
+        return "Sender and receiver must differ."
+    if "sender" in error:
+        return "Sender account not found."
+    if "receiver" in error:
+        return "Receiver account not found."
+    if "insufficient" in error:
+        return "Insufficient balance."
+    if "account" in error:
+        return "Account not found."
+
+    return f"{label} failed: {e}"
+
+
+# Per-item errors of the batch_transfer RPC (migration 0007), mapped exactly:
+# each item only ever fails for one of these reasons.
+BATCH_ITEM_ERRORS = {
+    "Amount must be greater than zero": "Amount must be greater than zero.",
+    "Sender and receiver must differ": "Sender and receiver must differ.",
+    "Receiver account not found": "Receiver account not found.",
+    "Insufficient balance": "Insufficient balance.",
+}
+
 
 class TransactionService:
-    def __init__(self):
+    def __init__(self, mode: Optional[str] = None):
         self.auth = AuthService()
         self.history = HistoryService()
+        # "atomic" → one atm_* RPC moves money + writes history/audit + returns balance
+        self.mode = mode or settings.TRANSACTION_MODE
+
+    # ---------- Atomic RPC path ----------
+    def _atomic(self, db: Client, fn: str, params: dict, ac_no: str, pin: str, request: Request, label: str) -> Tuple[bool, str]:
+        ok, msg = self.auth.check(db, ac_no=ac_no, pin=pin, request=request, defer_success=True)
+        if not ok:
+            return False, msg
+
+        if params["p_amount"] <= 0:
+            return False, "Amount must be greater than zero."
+
+        ip, ua = self.auth.client_info(request)
+
+        write_started()
+        try:
+            res = db.rpc(fn, {**params, "p_ip": ip, "p_user_agent": ua}).execute()
+        except Exception as e:
+            self.auth.log_event(db, ac_no, f"{label.lower()}_failed", str(e), request)
+            return False, rpc_error_message(label, e)
+
+        new_balance = account_cache.apply(ac_no, res.data)
+        if "p_to_ac" in params:
+            account_cache.invalidate(params["p_to_ac"])
+        return True, f"{label} successful. New balance: {new_balance}"
+
+    # ---------- Balance after a write ----------
+    def _new_balance(self, db: Client, ac_no: str, result) -> int:
+        # 0006 RPCs return {balance, version}; older ones return nothing
+        new_balance = account_cache.apply(ac_no, result)
+        if new_balance is not None:
+            return new_balance
+
+        resp = (
+            db.table("accounts")
+            .select("balance")
+            .eq("account_no", ac_no)
+            .single()
+            .execute()
+        )
+        return resp.data["balance"]
 
     # ---------- Deposit ----------
     def deposit(self, db: Client, ac_no: str, amount: int, pin: str, request: Request) -> Tuple[bool, str]:
+        if self.mode == "atomic":
+            return self._atomic(
+                db, "atm_deposit", {"p_ac_no": ac_no, "p_amount": amount},
+                ac_no, pin, request, "Deposit",
+            )
+
         ok, msg = self.auth.check(db, ac_no=ac_no, pin=pin, request=request)
         if not ok:
             return False, msg
@@ -22,8 +107,9 @@ class TransactionService:
         if amount <= 0:
             return False, "Amount must be greater than zero."
 
+        write_started()
         try:
-            db.rpc("deposit_money", {"ac_no": ac_no, "amount": amount}).execute()
+            res = db.rpc("deposit_money", {"ac_no": ac_no, "amount": amount}).execute()
         except Exception as e:
             self.auth.log_event(db, ac_no, "deposit_failed", str(e), request)
             return False, f"Deposit failed: {e}"
@@ -31,20 +117,18 @@ class TransactionService:
         self.auth.log_event(db, ac_no, "deposit_success", f"Deposited {amount}", request)
         self.history.add_entry(db, ac_no, "deposit", amount)
 
-        # fetch balance
-        resp = (
-            db.table("accounts")
-            .select("balance")
-            .eq("account_no", ac_no)
-            .single()
-            .execute()
-        )
-        new_balance = resp.data["balance"]
+        new_balance = self._new_balance(db, ac_no, res.data)
 
         return True, f"Deposit successful. New balance: {new_balance}"
 
     # ---------- Withdraw ----------
     def withdraw(self, db: Client, ac_no: str, amount: int, pin: str, request: Request) -> Tuple[bool, str]:
+        if self.mode == "atomic":
+            return self._atomic(
+                db, "atm_withdraw", {"p_ac_no": ac_no, "p_amount": amount},
+                ac_no, pin, request, "Withdraw",
+            )
+
         ok, msg = self.auth.check(db, ac_no=ac_no, pin=pin, request=request)
         if not ok:
             return False, msg
@@ -52,8 +136,9 @@ class TransactionService:
         if amount <= 0:
             return False, "Amount must be greater than zero."
 
+        write_started()
         try:
-            db.rpc("withdraw_money", {"ac_no": ac_no, "amount": amount}).execute()
+            res = db.rpc("withdraw_money", {"ac_no": ac_no, "amount": amount}).execute()
         except Exception as e:
             self.auth.log_event(db, ac_no, "withdraw_failed", str(e), request)
             error = str(e).lower()
@@ -68,19 +153,18 @@ class TransactionService:
         self.auth.log_event(db, ac_no, "withdraw_success", f"Withdrew {amount}", request)
         self.history.add_entry(db, ac_no, "withdraw", amount)
 
-        resp = (
-            db.table("accounts")
-            .select("balance")
-            .eq("account_no", ac_no)
-            .single()
-            .execute()
-        )
-        new_balance = resp.data["balance"]
+        new_balance = self._new_balance(db, ac_no, res.data)
 
         return True, f"Withdraw successful. New balance: {new_balance}"
 
     # ---------- Transfer ----------
     def transfer(self, db: Client, from_ac: str, to_ac: str, amount: int, pin: str, request: Request) -> Tuple[bool, str]:
+        if self.mode == "atomic":
+            return self._atomic(
+                db, "atm_transfer", {"p_from_ac": from_ac, "p_to_ac": to_ac, "p_amount": amount},
+                from_ac, pin, request, "Transfer",
+            )
+
         ok, msg = self.auth.check(db, ac_no=from_ac, pin=pin, request=request)
         if not ok:
             return False, msg
@@ -88,8 +172,9 @@ class TransactionService:
         if amount <= 0:
             return False, "Amount must be greater than zero."
 
+        write_started()
         try:
-            db.rpc(
+            res = db.rpc(
                 "transfer_money",
                 {"from_ac": from_ac, "to_ac": to_ac, "amount": amount},
             ).execute()
@@ -106,6 +191,8 @@ class TransactionService:
 
             return False, f"Transfer failed: {e}"
 
+        account_cache.invalidate(to_ac)
+
         # Log success
         self.auth.log_event(db, from_ac, "transfer_success", f"Sent {amount} to {to_ac}", request)
 
@@ -113,13 +200,78 @@ class TransactionService:
         self.history.add_entry(db, from_ac, "transfer_out", amount, context={"to": to_ac})
         self.history.add_entry(db, to_ac, "transfer_in", amount, context={"from": from_ac})
 
-        resp = (
-            db.table("accounts")
-            .select("balance")
-            .eq("account_no", from_ac)
-            .single()
-            .execute()
-        )
-        new_balance = resp.data["balance"]
+        new_balance = self._new_balance(db, from_ac, res.data)
 
         return True, f"Transfer successful. New balance: {new_balance}"
+
+    # ---------- Batch transfer (payroll) ----------
+    def batch_transfer(self, db: Client, from_ac: str, items: List[Any], pin: str,
+                       all_or_nothing: bool, request: Request) -> Tuple[bool, Any]:
+        """
+        One PIN check, then every item through the batch_transfer RPC.
+        all-or-nothing batches are a single DB transaction; best-effort ones
+        are sent in chunks of BATCH_CHUNK_SIZE, one transaction each.
+        Returns (ok, {"summary", "results"}) with one result per item, in order.
+        """
+        ok, msg = self.auth.check(db, ac_no=from_ac, pin=pin, request=request)
+        if not ok:
+            return False, msg
+
+        batch_id = uuid.uuid4().hex
+        ip, ua = self.auth.client_info(request)
+        size = len(items) if all_or_nothing else settings.BATCH_CHUNK_SIZE
+
+        results: List[dict] = []
+        applied = total = 0
+        balance = None
+        write_started()
+        for start in range(0, len(items), size):
+            chunk = items[start:start + size]
+            payload = [
+                {"i": start + n, "to": item.rec_acc_no, "amount": item.amount, "ref": item.ref}
+                for n, item in enumerate(chunk)
+            ]
+            try:
+                res = db.rpc("batch_transfer", {
+                    "p_from_ac": from_ac,
+                    "p_items": payload,
+                    "p_all_or_nothing": all_or_nothing,
+                    "p_batch_id": batch_id,
+                    "p_ip": ip,
+                    "p_user_agent": ua,
+                }).execute()
+            except Exception as e:
+                # whole chunk rolled back
+                self.auth.log_event(db, from_ac, "batch_transfer_failed", str(e), request)
+                error = rpc_error_message("Transfer", e)
+                results.extend({"i": p["i"], "ok": False, "error": error} for p in payload)
+                continue
+
+            data = res.data or {}
+            balance = account_cache.apply(from_ac, data)
+            applied += data.get("applied", 0)
+            total += data.get("total", 0)
+
+            failed = {f["i"]: BATCH_ITEM_ERRORS.get(f["error"], f"Transfer failed: {f['error']}")
+                      for f in data.get("failed", [])}
+            rolled_back = all_or_nothing and bool(failed)
+            for p in payload:
+                if p["i"] in failed:
+                    results.append({"i": p["i"], "ok": False, "error": failed[p["i"]]})
+                elif rolled_back:
+                    results.append({"i": p["i"], "ok": False, "error": "Not applied: batch rolled back."})
+                else:
+                    results.append({"i": p["i"], "ok": True, "rec_acc_no": p["to"], "amount": p["amount"]})
+            if data.get("applied"):
+                account_cache.invalidate(*{p["to"] for p in payload})
+
+        summary = {
+            "batch_id": batch_id,
+            "mode": "all_or_nothing" if all_or_nothing else "best_effort",
+            "items": len(items),
+            "applied": applied,
+            "failed": len(items) - applied,
+            "total_amount": total,
+            "balance": balance,
+        }
+        return True, {"summary": summary, "results": results}
@@ -1,13 +1,42 @@
-from typing import Tuple
+from __future__ import annotations
+
+from typing import Tuple, TYPE_CHECKING
 from flask import Request
-from supabase import Client
 from app.services.auth_service import AuthService
+from app.core import pin_sessions
+from app.core.account_cache import account_cache
+from app.core.account_index import account_index
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 class UpdateService:
     def __init__(self):
         self.auth = AuthService()
 
+    # ---------- Account snapshot ----------
+    def _current(self, db: Client, ac_no: str, column: str):
+        # the PIN check just cached the row at the version it read
+        snapshot = account_cache.get_fresh(ac_no, column)
+        if snapshot is not None:
+            return snapshot[column]
+
+        old = (
+            db.table("accounts")
+            .select(column)
+            .eq("account_no", ac_no)
+            .single()
+            .execute()
+        )
+        return old.data[column]
+
+    def _store(self, ac_no: str, rows):
+        if rows and "version" in rows[0]:
+            account_cache.put(rows[0])
+        else:
+            account_cache.invalidate(ac_no)
+
     # ---------- Update Mobile ----------
     def update_mobile(self, db: Client, ac_no: str, pin: str, old_mobile: str, new_mobile: str, request: Request) -> Tuple[bool, str]:
         if len(new_mobile) != 10 or not new_mobile.isdigit():
@@ -18,20 +47,16 @@ class UpdateService:
             return False, msg
 
         try:
-            old = (
-                db.table("accounts")
-                .select("mobileno")
-                .eq("account_no", ac_no)
-                .single()
-                .execute()
-            )
-            if old.data["mobileno"] != old_mobile:
+            current = self._current(db, ac_no, "mobileno")
+            if current != old_mobile:
                 return False, "Old mobile number does not match."
         except Exception as e:
             return False, f"Database error: {e}"
 
         try:
-            db.table("accounts").update({"mobileno": new_mobile}).eq("account_no", ac_no).execute()
+            res = db.table("accounts").update({"mobileno": new_mobile}).eq("account_no", ac_no).execute()
+            self._store(ac_no, res.data)
+            account_index.upsert({"account_no": ac_no, "mobileno": new_mobile})
             self.auth.log_event(db, ac_no, "update_mobile", f"New mobile: {new_mobile}", request)
             return True, "Mobile number updated successfully."
         except Exception as e:
@@ -47,20 +72,16 @@ class UpdateService:
             return False, msg
 
         try:
-            old = (
-                db.table("accounts")
-                .select("gmail")
-                .eq("account_no", ac_no)
-                .single()
-                .execute()
-            )
-            if old.data["gmail"] != old_email:
+            current = self._current(db, ac_no, "gmail")
+            if current != old_email:
                 return False, "Old email does not match."
         except Exception as e:
             return False, f"Database error: {e}"
 
         try:
-            db.table("accounts").update({"gmail": new_email}).eq("account_no", ac_no).execute()
+            res = db.table("accounts").update({"gmail": new_email}).eq("account_no", ac_no).execute()
+            self._store(ac_no, res.data)
+            account_index.upsert({"account_no": ac_no, "gmail": new_email})
             self.auth.log_event(db, ac_no, "update_email", f"New email: {new_email}", request)
             return True, "Email updated successfully."
         except Exception as e:
@@ -78,10 +99,13 @@ class UpdateService:
         hashed = self.auth.hash_pin(new_pin)
 
         try:
-            db.table("accounts").update({
+            # same write ends every open PIN session on the account
+            res = db.table("accounts").update({
                 "pin": hashed,
-                "failed_attempts": 0
+                "failed_attempts": 0,
+                **pin_sessions.revocation(),
             }).eq("account_no", ac_no).execute()
+            self._store(ac_no, res.data)
 
             self.auth.log_event(db, ac_no, "pin_change", "PIN updated successfully", request)
             return True, "PIN changed successfully."
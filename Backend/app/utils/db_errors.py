@@ -0,0 +1,16 @@
+from typing import Optional
+
+
+def error_code(e: Exception) -> Optional[str]:
+    """PostgREST / Postgres error code of a client exception, if it has one."""
+    return getattr(e, "code", None)
+
+
+def is_missing_function(e: Exception) -> bool:
+    """The RPC is not deployed (its migration has not been applied)."""
+    return error_code(e) == "PGRST202" or "could not find the function" in str(e).lower()
+
+
+def is_missing_column(e: Exception) -> bool:
+    """A selected or written column does not exist (migration not applied)."""
+    return error_code(e) in ("42703", "PGRST204")
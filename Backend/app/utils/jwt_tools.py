@@ -1,5 +1,5 @@
+import uuid
 from typing import Dict, Any
-import jwt
 from datetime import datetime, UTC, timedelta
 
 from flask import jsonify, abort
@@ -14,11 +14,19 @@ REFRESH_TTL = timedelta(days=30)
 REFRESH_GRACE_SECONDS = 10 * 60  # 10 minutes
 
 
+def new_session_id() -> str:
+    """Login session id ("sid"): set at login, carried through every refresh."""
+    return uuid.uuid4().hex
+
+
+# PyJWT pulls in `cryptography` (~0.1s): imported on first use, or by the warmup
 def encode_token(payload: Dict[str, Any]) -> str:
+    import jwt
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=ALGORITHM)
 
 
 def decode_token(token: str) -> Dict[str, Any]:
+    import jwt
     try:
         return jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
@@ -27,23 +35,25 @@ def decode_token(token: str) -> Dict[str, Any]:
         abort(401, description="Invalid token")
 
 
-def make_access(sub: str, app_role: str) -> str:
+def make_access(sub: str, app_role: str, sid: str) -> str:
     exp = int((datetime.now(UTC) + ACCESS_TTL).timestamp())
     return encode_token({
         "sub": str(sub),
         "role": "authenticated",
         "app_role": app_role,
         "type": "access",
+        "sid": sid,
         "exp": exp,
     })
 
 
-def make_refresh(sub: str, app_role: str) -> str:
+def make_refresh(sub: str, app_role: str, sid: str) -> str:
     exp = int((datetime.now(UTC) + REFRESH_TTL).timestamp())
     return encode_token({
         "sub": str(sub),
         "role": "authenticated",
         "app_role": app_role,
         "type": "refresh",
+        "sid": sid,
         "exp": exp,
     })
@@ -0,0 +1 @@
+"""Load benchmarks for the Flask API (see bench/run.py)."""
@@ -0,0 +1,68 @@
+"""
+JSON encode / decode+validate micro-benchmark.
+
+Times the two per-request codec costs on the hot routes, for each JSON
+provider:
+
+    history_page      jsonify() of a 100-row history page
+    transfer_request  raw body -> validated TransferRequest
+                      (stdlib: json.loads + Model(**dict), the old route code;
+                       fast: Model.model_validate_json, what validate_body does)
+"""
+
+import json
+import time
+from typing import Callable, Dict
+
+from flask import Flask
+
+HISTORY_ROWS = 100
+
+
+def _history_page() -> dict:
+    items = [
+        {
+            "id": 1_000_000 - i,
+            "account_no": "BENCH000001",
+            "action": ("deposit", "withdraw", "transfer_out", "transfer_in")[i % 4],
+            "amount": 100 + i,
+            "context": {"to": "BENCH000002"} if i % 4 == 2 else None,
+            "created_at": f"2026-01-{1 + i % 28:02d}T10:{i % 60:02d}:00+00:00",
+        }
+        for i in range(HISTORY_ROWS)
+    ]
+    return {"history": items, "next_cursor": "MjAyNi0wMS0wMXwxMjM0"}
+
+
+def _per_op_us(fn: Callable[[], object], iterations: int) -> float:
+    fn()  # warm up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run_codec_benchmark(iterations: int = 2000) -> Dict[str, dict]:
+    from app.core.json_provider import install_json_provider
+    from app.schemas.transaction_schemas import TransferRequest
+
+    page = _history_page()
+    body = json.dumps({"acc_no": "BENCH000001", "rec_acc_no": "BENCH000002", "pin": "1234", "amount": 250}).encode()
+
+    timings = {"history_page": {}, "transfer_request": {}}
+    for name in ("stdlib", "orjson"):
+        app = install_json_provider(Flask("codec-bench"), name)
+        with app.app_context():
+            timings["history_page"][name] = _per_op_us(lambda: app.json.response(page).get_data(), iterations)
+
+    timings["transfer_request"]["stdlib"] = _per_op_us(lambda: TransferRequest(**json.loads(body)), iterations)
+    timings["transfer_request"]["orjson"] = _per_op_us(lambda: TransferRequest.model_validate_json(body), iterations)
+
+    return {
+        case: {
+            "stdlib_us": round(t["stdlib"], 2),
+            "fast_us": round(t["orjson"], 2),
+            "speedup": round(t["stdlib"] / t["orjson"], 2) if t["orjson"] else 0.0,
+        }
+        for case, t in timings.items()
+    }
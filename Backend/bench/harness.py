@@ -0,0 +1,297 @@
+"""
+In-process load harness: drives create_app() through Flask test clients
+against the local SQLite backend, one client (and login) per worker thread.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional
+
+ADMIN = ("bench-admin", "bench-pass")
+PIN = "1234"
+MOBILE = "9000000000"
+
+DEFAULT_MIX = {
+    "login": 1,
+    "auth_check": 4,
+    "deposit": 4,
+    "withdraw": 4,
+    "transfer": 4,
+    "history": 3,
+    "update_mobile": 1,
+    "update_email": 1,
+}
+
+
+@dataclass
+class BenchConfig:
+    concurrency: int = 8
+    requests: int = 2000                 # total, across all workers
+    accounts: int = 200
+    hot_accounts: int = 5                # size of the hot set
+    hot_ratio: float = 0.0               # share of picks that hit the hot set
+    mix: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int = 42
+    latency_ms: float = 0.0              # simulated DB round-trip
+
+
+# ---------------- ACCOUNT DISTRIBUTION ----------------
+def account_no(i: int) -> str:
+    return f"BENCH{i:06d}"
+
+
+class AccountPicker:
+    """Uniform picks, with `hot_ratio` of them skewed onto the first `hot_accounts`."""
+
+    def __init__(self, cfg: BenchConfig, rng: random.Random):
+        self.n = cfg.accounts
+        self.hot = max(1, min(cfg.hot_accounts, cfg.accounts))
+        self.hot_ratio = cfg.hot_ratio
+        self.rng = rng
+
+    def pick(self) -> str:
+        if self.rng.random() < self.hot_ratio:
+            return account_no(self.rng.randrange(self.hot))
+        return account_no(self.rng.randrange(self.n))
+
+    def pair(self) -> tuple[str, str]:
+        sender = self.pick()
+        receiver = self.pick()
+        while receiver == sender:
+            receiver = account_no(self.rng.randrange(self.n))
+        return sender, receiver
+
+
+# ---------------- SCENARIOS ----------------
+def _login(client, picker):
+    return client.post("/auth/login", data={"username": ADMIN[0], "password": ADMIN[1]})
+
+
+def _auth_check(client, picker):
+    return client.get("/auth/check")
+
+
+def _deposit(client, picker):
+    return client.post("/transaction/deposit", json={"acc_no": picker.pick(), "pin": PIN, "amount": 100})
+
+
+def _withdraw(client, picker):
+    return client.post("/transaction/withdraw", json={"acc_no": picker.pick(), "pin": PIN, "amount": 50})
+
+
+def _transfer(client, picker):
+    sender, receiver = picker.pair()
+    return client.post(
+        "/transaction/transfer",
+        json={"acc_no": sender, "rec_acc_no": receiver, "pin": PIN, "amount": 25},
+    )
+
+
+def _history(client, picker):
+    return client.get(f"/history/{picker.pick()}", query_string={"pin": PIN, "limit": 20})
+
+
+def _update_mobile(client, picker):
+    # same old/new value keeps the account stable under concurrent updates
+    return client.put(
+        "/update/update-mobile",
+        json={"acc_no": picker.pick(), "pin": PIN, "omobile": MOBILE, "nmobile": MOBILE},
+    )
+
+
+def _update_email(client, picker):
+    ac_no = picker.pick()
+    email = f"{ac_no.lower()}@bench.example.com"
+    return client.put(
+        "/update/update-email",
+        json={"acc_no": ac_no, "pin": PIN, "oemail": email, "nemail": email},
+    )
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "login": _login,
+    "auth_check": _auth_check,
+    "deposit": _deposit,
+    "withdraw": _withdraw,
+    "transfer": _transfer,
+    "history": _history,
+    "update_mobile": _update_mobile,
+    "update_email": _update_email,
+}
+
+
+# ---------------- SETUP ----------------
+def seed(db, cfg: BenchConfig):
+    from app.core.hashing import hasher
+    from app.services.auth_service import AuthService
+
+    AuthService().create_employ(db, ADMIN[0], ADMIN[1], "admin")
+
+    pin_hash = hasher.hash(PIN)  # one hash shared by every account keeps seeding fast
+    rows = [
+        {
+            "account_no": account_no(i),
+            "holder_name": f"Bench {i}",
+            "pin_hash": pin_hash,
+            "mobileno": MOBILE,
+            "gmail": f"{account_no(i).lower()}@bench.example.com",
+        }
+        for i in range(cfg.accounts)
+    ]
+    db.rpc("bulk_create_accounts", {"p_rows": rows, "p_actor": "bench"}).execute()
+    db.table("accounts").update({"balance": 10**12}).like("account_no", "BENCH%").execute()
+
+
+# ---------------- STATS ----------------
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: List[tuple], elapsed: float) -> dict:
+    latencies = sorted(s[0] for s in samples)
+    errors = sum(1 for s in samples if not s[1])
+    calls = sum(s[2] for s in samples)
+    n = len(samples)
+    return {
+        "requests": n,
+        "errors": errors,
+        "throughput_rps": round(n / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "db_calls_per_request": round(calls / n, 3) if n else 0.0,
+    }
+
+
+# ---------------- RUN ----------------
+def run_benchmark(cfg: BenchConfig, app=None, db=None) -> dict:
+    """
+    Seeds a fresh local database, runs `cfg.requests` weighted scenario
+    requests across `cfg.concurrency` threads and returns the report.
+    """
+    from app import create_app
+    from app.core.sqlite_client import SQLiteClient, reset_sqlite_client
+    from app.core.account_cache import account_cache
+    from app.core.user_cache import role_cache
+
+    unknown = set(cfg.mix) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    db = db or SQLiteClient(":memory:", cfg.latency_ms)
+    previous = reset_sqlite_client(db)
+    role_cache.clear()  # user ids and account versions restart in the fresh database
+    account_cache.clear()
+    try:
+        app = app or create_app()
+        seed(db, cfg)
+        return _drive(app, db, cfg)
+    finally:
+        reset_sqlite_client(previous)
+        role_cache.clear()
+        account_cache.clear()
+
+
+def _drive(app, db, cfg: BenchConfig) -> dict:
+    names = [n for n, w in cfg.mix.items() if w > 0]
+    weights = [cfg.mix[n] for n in names]
+    per_worker = [cfg.requests // cfg.concurrency] * cfg.concurrency
+    for i in range(cfg.requests % cfg.concurrency):
+        per_worker[i] += 1
+
+    samples: Dict[str, List[tuple]] = {n: [] for n in names}
+    lock = threading.Lock()
+    failures: List[str] = []
+    ready = threading.Barrier(cfg.concurrency + 1)
+
+    def worker(idx: int, count: int):
+        rng = random.Random(cfg.seed + idx)
+        picker = AccountPicker(cfg, rng)
+        client = app.test_client()
+        res = client.post("/auth/login", data={"username": ADMIN[0], "password": ADMIN[1]})
+        if res.status_code != 200:
+            failures.append(f"worker {idx}: login failed ({res.status_code})")
+        local: Dict[str, List[tuple]] = {n: [] for n in names}
+        ready.wait()
+
+        for name in rng.choices(names, weights, k=count):
+            calls = db.thread_calls()
+            start = time.perf_counter()
+            res = SCENARIOS[name](client, picker)
+            ms = (time.perf_counter() - start) * 1000
+            local[name].append((ms, res.status_code < 400, db.thread_calls() - calls))
+
+        with lock:
+            for n, rows in local.items():
+                samples[n].extend(rows)
+
+    threads = [
+        threading.Thread(target=worker, args=(i, c), name=f"bench-{i}")
+        for i, c in enumerate(per_worker)
+    ]
+    for t in threads:
+        t.start()
+    ready.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    if failures:
+        raise RuntimeError("; ".join(failures))
+
+    from app.config import settings
+
+    return {
+        "config": asdict(cfg),
+        # read at import time, so set through the environment (see bench/run.py)
+        "settings": {
+            "TRANSACTION_MODE": settings.TRANSACTION_MODE,
+            "BCRYPT_ROUNDS": settings.BCRYPT_ROUNDS,
+            "AUDIT_ASYNC": settings.AUDIT_ASYNC,
+            "JSON_PROVIDER": settings.JSON_PROVIDER,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "total": summarize([s for rows in samples.values() for s in rows], elapsed),
+        "scenarios": {n: summarize(rows, elapsed) for n, rows in samples.items() if rows},
+    }
+
+
+# ---------------- REGRESSION CHECK ----------------
+def compare(result: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Regressions of `result` against `baseline`: p95 latency, DB calls per
+    request or codec time up by more than `threshold`, or throughput down
+    by more than it.
+    """
+    problems = []
+    for name, base in baseline.get("scenarios", {}).items():
+        cur: Optional[dict] = result["scenarios"].get(name)
+        if cur is None:
+            continue
+
+        if base["p95_ms"] and cur["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            problems.append(f"{name}: p95 {base['p95_ms']}ms -> {cur['p95_ms']}ms")
+        if base["throughput_rps"] and cur["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            problems.append(
+                f"{name}: throughput {base['throughput_rps']} -> {cur['throughput_rps']} req/s"
+            )
+        if cur["db_calls_per_request"] > base["db_calls_per_request"] * (1 + threshold):
+            problems.append(
+                f"{name}: db calls/request {base['db_calls_per_request']} -> {cur['db_calls_per_request']}"
+            )
+        if cur["errors"] > base["errors"]:
+            problems.append(f"{name}: errors {base['errors']} -> {cur['errors']}")
+
+    # codec timings (bench/codec.py), when both reports have them
+    for name, base in baseline.get("codec", {}).items():
+        cur = result.get("codec", {}).get(name)
+        if cur and base["fast_us"] and cur["fast_us"] > base["fast_us"] * (1 + threshold):
+            problems.append(f"codec {name}: {base['fast_us']}us -> {cur['fast_us']}us")
+    return problems
@@ -0,0 +1,114 @@
+"""
+Benchmark CLI.
+
+    cd Backend
+    python -m bench.run --concurrency 8 --requests 4000 --hot-ratio 0.8
+    python -m bench.run --save bench/baseline.json
+    python -m bench.run --baseline bench/baseline.json --threshold 0.2
+    python -m bench.run --codec --json-provider stdlib
+
+Exits 1 when any scenario regresses past --threshold against --baseline.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+
+def parse_mix(raw: str) -> dict:
+    """'deposit=3,transfer=1' -> {'deposit': 3, 'transfer': 1}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in raw.split(","))):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight) if weight else 1
+    return mix
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m bench.run", description="RupeeWave API benchmark")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--requests", type=int, default=2000, help="total requests across workers")
+    p.add_argument("--accounts", type=int, default=200)
+    p.add_argument("--hot-accounts", type=int, default=5)
+    p.add_argument("--hot-ratio", type=float, default=0.0, help="share of picks hitting the hot set")
+    p.add_argument("--mix", type=parse_mix, default=None, help="scenario weights, e.g. deposit=3,history=1")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--latency-ms", type=float, default=0.0, help="simulated DB round trip")
+    p.add_argument("--transaction-mode", choices=["legacy", "atomic"], default="legacy")
+    p.add_argument("--bcrypt-rounds", type=int, default=4)
+    p.add_argument("--audit-async", action="store_true")
+    p.add_argument("--json-provider", choices=["orjson", "stdlib"], default="orjson")
+    p.add_argument("--codec", action="store_true", help="also time JSON encode / decode+validate")
+    p.add_argument("--save", type=Path, help="write the report as JSON")
+    p.add_argument("--baseline", type=Path, help="compare against a saved report")
+    p.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # Settings are read at import time, so configure before importing the app
+    os.environ["DB_BACKEND"] = "sqlite"
+    os.environ.setdefault("SUPABASE_JWT_SECRET", "bench-secret-" + "x" * 32)
+    os.environ["TRANSACTION_MODE"] = args.transaction_mode
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ["AUDIT_ASYNC"] = "true" if args.audit_async else "false"
+    os.environ["JSON_PROVIDER"] = args.json_provider
+    os.environ["WARMUP_ON_BOOT"] = "false"  # the harness swaps in its own DB
+
+    from bench.codec import run_codec_benchmark
+    from bench.harness import BenchConfig, DEFAULT_MIX, compare, run_benchmark
+
+    cfg = BenchConfig(
+        concurrency=args.concurrency,
+        requests=args.requests,
+        accounts=args.accounts,
+        hot_accounts=args.hot_accounts,
+        hot_ratio=args.hot_ratio,
+        mix=args.mix or dict(DEFAULT_MIX),
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+    )
+    report = run_benchmark(cfg)
+    if args.codec:
+        report["codec"] = run_codec_benchmark()
+    print_report(report)
+
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nsaved {args.save}")
+
+    if args.baseline:
+        problems = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        if problems:
+            print(f"\nREGRESSIONS (threshold {args.threshold:.0%}):")
+            for line in problems:
+                print(f"  - {line}")
+            return 1
+        print(f"\nno regressions against {args.baseline}")
+
+    return 0
+
+
+def print_report(report: dict):
+    header = f"{'scenario':<15}{'reqs':>7}{'errs':>6}{'req/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'db/req':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["scenarios"].items()) + [("TOTAL", report["total"])]
+    for name, s in rows:
+        print(
+            f"{name:<15}{s['requests']:>7}{s['errors']:>6}{s['throughput_rps']:>10.1f}"
+            f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}{s['db_calls_per_request']:>8.2f}"
+        )
+
+    if "codec" in report:
+        print(f"\n{'codec':<20}{'stdlib us':>12}{'fast us':>12}{'speedup':>10}")
+        for name, c in report["codec"].items():
+            print(f"{name:<20}{c['stdlib_us']:>12.2f}{c['fast_us']:>12.2f}{c['speedup']:>9.2f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
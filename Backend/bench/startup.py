@@ -0,0 +1,111 @@
+"""
+Cold-start profile.
+
+    cd Backend
+    python -m bench.startup
+    python -m bench.startup --budget-ms 600 --top 20
+
+Boots the app in a fresh interpreter under `python -X importtime`, then
+reports the import time of `main`, the heaviest imports, the time to the
+first health check, and any deferred library that got imported at boot
+anyway. Exits 1 when over --budget-ms or when a deferred library leaked in.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# loaded on first use / by the warmup thread, never at import
+DEFERRED = ("supabase", "postgrest", "httpx", "jwt", "cryptography", "email_validator")
+
+_BOOT = """
+import json, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+res = main.app.test_client().get("/auth/health")
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_health_ms": (t2 - t1) * 1000,
+    "health_status": res.status_code,
+    "deferred_loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (DEFERRED,)
+
+
+def parse_importtime(stderr: str) -> list:
+    """`-X importtime` lines -> [(module, self_us, cumulative_us, depth)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def profile(env: dict | None = None) -> dict:
+    env = {**os.environ, **(env or {}), "WARMUP_ON_BOOT": "false"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _BOOT],
+        cwd=BACKEND, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        raise RuntimeError("app failed to boot:\n" + "\n".join(errors[-15:]))
+    boot = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in parse_importtime(proc.stderr):
+        by_package[name.split(".")[0]] += self_us
+
+    return {
+        "import_ms": round(boot["import_ms"], 1),
+        "first_health_ms": round(boot["first_health_ms"], 1),
+        "health_status": boot["health_status"],
+        "deferred_loaded": boot["deferred_loaded"],
+        "packages_ms": {
+            pkg: round(us / 1000, 1)
+            for pkg, us in sorted(by_package.items(), key=lambda kv: -kv[1])
+        },
+    }
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench.startup", description="RupeeWave cold-start profile")
+    p.add_argument("--budget-ms", type=float, default=0.0, help="fail when import + first health check exceeds this")
+    p.add_argument("--top", type=int, default=15, help="packages to list")
+    p.add_argument("--json", action="store_true", help="print the raw report")
+    args = p.parse_args(argv)
+
+    report = profile()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import main          {report['import_ms']:>8.1f} ms")
+        print(f"first /auth/health   {report['first_health_ms']:>8.1f} ms  (status {report['health_status']})")
+        print(f"\n{'package':<28}{'self ms':>10}")
+        for pkg, ms in list(report["packages_ms"].items())[:args.top]:
+            print(f"{pkg:<28}{ms:>10.1f}")
+
+    failed = False
+    if report["deferred_loaded"]:
+        print(f"\nDEFERRED LIBRARIES IMPORTED AT BOOT: {', '.join(report['deferred_loaded'])}")
+        failed = True
+    total = report["import_ms"] + report["first_health_ms"]
+    if args.budget_ms and total > args.budget_ms:
+        print(f"\nOVER BUDGET: {total:.1f} ms > {args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
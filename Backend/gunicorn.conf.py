@@ -0,0 +1,21 @@
+# gunicorn -c gunicorn.conf.py main:app
+import os
+import shutil
+import tempfile
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# Prometheus multiprocess mode: workers share samples through mmap files
+# in this directory. It must be set before prometheus_client is imported
+# and must start empty.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "rupeewave-metrics")
+)
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from app.core.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
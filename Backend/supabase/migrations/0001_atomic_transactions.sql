@@ -0,0 +1,226 @@
+-- =====================================================================
+-- Atomic single-round-trip transaction RPCs
+--
+-- Each function runs in ONE transaction:
+--   lock state check -> failed_attempts reset -> balance update
+--   -> history row(s) -> audit row(s) -> returns the new balance.
+--
+-- The bcrypt PIN verification stays in the backend (AuthService.check with
+-- defer_success=True); these functions re-check the lock state under a row
+-- lock so an account locked in between is never debited.
+--
+-- Used when Settings.TRANSACTION_MODE = "atomic".
+-- =====================================================================
+
+
+-- -------------------- DEPOSIT --------------------
+create or replace function public.atm_deposit(
+    p_ac_no text,
+    p_amount bigint,
+    p_ip text default 'unknown',
+    p_user_agent text default 'unknown'
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_locked boolean;
+    v_balance bigint;
+    v_history_id bigint;
+    v_audit_id bigint;
+begin
+    if p_amount is null or p_amount <= 0 then
+        raise exception 'Amount must be greater than zero';
+    end if;
+
+    select is_locked into v_locked
+    from accounts where account_no = p_ac_no
+    for update;
+
+    if not found then
+        raise exception 'Account not found';
+    end if;
+    if v_locked then
+        raise exception 'Account locked';
+    end if;
+
+    update accounts
+       set balance = balance + p_amount,
+           failed_attempts = 0
+     where account_no = p_ac_no
+    returning balance into v_balance;
+
+    insert into history (account_no, action, amount, context)
+    values (p_ac_no, 'deposit', p_amount, null)
+    returning id into v_history_id;
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_ac_no, 'pin_success', 'PIN verified', p_ip, p_user_agent);
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_ac_no, 'deposit_success', 'Deposited ' || p_amount, p_ip, p_user_agent)
+    returning id into v_audit_id;
+
+    return jsonb_build_object(
+        'balance', v_balance,
+        'history_id', v_history_id,
+        'audit_id', v_audit_id
+    );
+end;
+$$;
+
+
+-- -------------------- WITHDRAW --------------------
+create or replace function public.atm_withdraw(
+    p_ac_no text,
+    p_amount bigint,
+    p_ip text default 'unknown',
+    p_user_agent text default 'unknown'
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_locked boolean;
+    v_balance bigint;
+    v_history_id bigint;
+    v_audit_id bigint;
+begin
+    if p_amount is null or p_amount <= 0 then
+        raise exception 'Amount must be greater than zero';
+    end if;
+
+    select is_locked, balance into v_locked, v_balance
+    from accounts where account_no = p_ac_no
+    for update;
+
+    if not found then
+        raise exception 'Account not found';
+    end if;
+    if v_locked then
+        raise exception 'Account locked';
+    end if;
+    if v_balance < p_amount then
+        raise exception 'Insufficient balance';
+    end if;
+
+    update accounts
+       set balance = balance - p_amount,
+           failed_attempts = 0
+     where account_no = p_ac_no
+    returning balance into v_balance;
+
+    insert into history (account_no, action, amount, context)
+    values (p_ac_no, 'withdraw', p_amount, null)
+    returning id into v_history_id;
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_ac_no, 'pin_success', 'PIN verified', p_ip, p_user_agent);
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_ac_no, 'withdraw_success', 'Withdrew ' || p_amount, p_ip, p_user_agent)
+    returning id into v_audit_id;
+
+    return jsonb_build_object(
+        'balance', v_balance,
+        'history_id', v_history_id,
+        'audit_id', v_audit_id
+    );
+end;
+$$;
+
+
+-- -------------------- TRANSFER --------------------
+create or replace function public.atm_transfer(
+    p_from_ac text,
+    p_to_ac text,
+    p_amount bigint,
+    p_ip text default 'unknown',
+    p_user_agent text default 'unknown'
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_locked boolean;
+    v_balance bigint;
+    v_history_id bigint;
+    v_audit_id bigint;
+begin
+    if p_amount is null or p_amount <= 0 then
+        raise exception 'Amount must be greater than zero';
+    end if;
+    if p_from_ac = p_to_ac then
+        raise exception 'Sender and receiver must differ';
+    end if;
+
+    -- Lock both rows in a stable order so opposite transfers never deadlock
+    perform 1 from accounts
+     where account_no in (p_from_ac, p_to_ac)
+     order by account_no
+     for update;
+
+    select is_locked, balance into v_locked, v_balance
+    from accounts where account_no = p_from_ac;
+
+    if not found then
+        raise exception 'Sender account not found';
+    end if;
+    if v_locked then
+        raise exception 'Account locked';
+    end if;
+
+    perform 1 from accounts where account_no = p_to_ac;
+    if not found then
+        raise exception 'Receiver account not found';
+    end if;
+
+    if v_balance < p_amount then
+        raise exception 'Insufficient balance';
+    end if;
+
+    update accounts
+       set balance = balance - p_amount,
+           failed_attempts = 0
+     where account_no = p_from_ac
+    returning balance into v_balance;
+
+    update accounts
+       set balance = balance + p_amount
+     where account_no = p_to_ac;
+
+    insert into history (account_no, action, amount, context)
+    values (p_from_ac, 'transfer_out', p_amount, jsonb_build_object('to', p_to_ac))
+    returning id into v_history_id;
+
+    insert into history (account_no, action, amount, context)
+    values (p_to_ac, 'transfer_in', p_amount, jsonb_build_object('from', p_from_ac));
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_from_ac, 'pin_success', 'PIN verified', p_ip, p_user_agent);
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (
+        p_from_ac,
+        'transfer_success',
+        'Sent ' || p_amount || ' to ' || p_to_ac,
+        p_ip,
+        p_user_agent
+    )
+    returning id into v_audit_id;
+
+    return jsonb_build_object(
+        'balance', v_balance,
+        'history_id', v_history_id,
+        'audit_id', v_audit_id
+    );
+end;
+$$;
+
+
+revoke all on function public.atm_deposit(text, bigint, text, text) from public, anon;
+revoke all on function public.atm_withdraw(text, bigint, text, text) from public, anon;
+revoke all on function public.atm_transfer(text, text, bigint, text, text) from public, anon;
@@ -0,0 +1,11 @@
+-- =====================================================================
+-- Keyset pagination for /history/<ac_no>
+--
+-- HistoryService.get_page / iter_history read
+--   where account_no = $1 and (created_at, id) < ($2, $3)
+--   order by created_at desc, id desc limit $4
+-- which this index serves without a sort or a scan of older rows.
+-- =====================================================================
+
+create index if not exists history_account_created_id_idx
+    on public.history (account_no, created_at desc, id desc);
@@ -0,0 +1,81 @@
+-- =====================================================================
+-- PIN lockout state machine
+--
+-- register_pin_failure: one conditional UPDATE increments failed_attempts
+-- and locks at the threshold, so concurrent wrong-PIN attempts can no
+-- longer lose increments (the old code read the counter, then wrote +1).
+--
+-- locked_until / release_expired_pin_lock implement the optional cool-down
+-- (Settings.PIN_LOCK_COOLDOWN_MINUTES; 0 keeps the lock until the bank
+-- unlocks the account).
+-- =====================================================================
+
+alter table public.accounts
+    add column if not exists locked_until timestamptz;
+
+
+create or replace function public.register_pin_failure(
+    p_ac_no text,
+    p_max_attempts integer default 3,
+    p_cooldown_minutes integer default 0
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_attempts integer;
+    v_locked boolean;
+begin
+    update accounts
+       set failed_attempts = coalesce(failed_attempts, 0) + 1,
+           is_locked = coalesce(failed_attempts, 0) + 1 >= p_max_attempts,
+           locked_until = case
+               when coalesce(failed_attempts, 0) + 1 >= p_max_attempts
+                    and p_cooldown_minutes > 0
+               then now() + make_interval(mins => p_cooldown_minutes)
+               else null
+           end
+     where account_no = p_ac_no
+       and not is_locked
+    returning failed_attempts, is_locked into v_attempts, v_locked;
+
+    if not found then
+        -- already locked (possibly by a concurrent attempt) or missing
+        select failed_attempts, is_locked into v_attempts, v_locked
+        from accounts where account_no = p_ac_no;
+
+        if not found then
+            raise exception 'Account not found';
+        end if;
+    end if;
+
+    return jsonb_build_object('failed_attempts', v_attempts, 'is_locked', v_locked);
+end;
+$$;
+
+
+create or replace function public.release_expired_pin_lock(
+    p_ac_no text
+) returns boolean
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    update accounts
+       set is_locked = false,
+           failed_attempts = 0,
+           locked_until = null
+     where account_no = p_ac_no
+       and is_locked
+       and locked_until is not null
+       and locked_until <= now();
+
+    return found;
+end;
+$$;
+
+
+revoke all on function public.register_pin_failure(text, integer, integer) from public, anon;
+revoke all on function public.release_expired_pin_lock(text) from public, anon;
@@ -0,0 +1,27 @@
+-- =====================================================================
+-- Collision-free account numbers
+--
+-- Each backend worker reserves a block of numbers with one call and then
+-- allocates from it in memory (app/core/account_numbers.py). Block k owns
+-- [k * ACCOUNT_NO_BLOCK_SIZE, (k + 1) * ACCOUNT_NO_BLOCK_SIZE); the sequence guarantees no
+-- two workers ever receive the same block, even across restarts.
+--
+-- Keep ACCOUNT_NO_BLOCK_SIZE constant once numbers have been issued.
+-- =====================================================================
+
+create sequence if not exists public.account_no_block_seq
+    minvalue 0
+    start with 0;
+
+
+create or replace function public.reserve_account_block()
+returns bigint
+language sql
+security definer
+set search_path = public
+as $$
+    select nextval('account_no_block_seq');
+$$;
+
+
+revoke all on function public.reserve_account_block() from public, anon;
@@ -0,0 +1,65 @@
+-- =====================================================================
+-- Bulk account onboarding (POST /account/bulk)
+--
+-- Inserts one chunk of customers (users + accounts + audit rows) as
+-- multi-row inserts inside a single transaction: either the whole chunk
+-- is created or none of it is. PINs arrive already bcrypt-hashed and
+-- account numbers already allocated by the backend.
+--
+-- p_rows: [{"account_no", "holder_name", "pin_hash", "mobileno", "gmail"}]
+-- =====================================================================
+
+create or replace function public.bulk_create_accounts(
+    p_rows jsonb,
+    p_actor text default 'bulk',
+    p_ip text default 'unknown',
+    p_user_agent text default 'unknown'
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_created jsonb;
+begin
+    with src as (
+        select *
+        from jsonb_to_recordset(p_rows) as r(
+            account_no text,
+            holder_name text,
+            pin_hash text,
+            mobileno text,
+            gmail text
+        )
+    ),
+    new_users as (
+        insert into users (user_name, password, role)
+        select account_no, pin_hash, 'customer' from src
+        returning id, user_name
+    ),
+    new_accounts as (
+        insert into accounts (
+            account_no, name, pin, mobileno, gmail,
+            failed_attempts, is_locked, user_id
+        )
+        select s.account_no, s.holder_name, s.pin_hash, s.mobileno, s.gmail,
+               0, false, u.id
+        from src s
+        join new_users u on u.user_name = s.account_no
+        returning account_no
+    )
+    select coalesce(jsonb_agg(account_no), '[]'::jsonb)
+      into v_created
+      from new_accounts;
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    select value #>> '{}', 'create_account', 'created (bulk by ' || p_actor || ')',
+           p_ip, p_user_agent
+    from jsonb_array_elements(v_created);
+
+    return v_created;
+end;
+$$;
+
+
+revoke all on function public.bulk_create_accounts(jsonb, text, text, text) from public, anon;
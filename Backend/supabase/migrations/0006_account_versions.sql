@@ -0,0 +1,367 @@
+-- =====================================================================
+-- Account versions for the account snapshot cache
+--
+-- accounts.version goes up by one on EVERY update of the row, whoever
+-- makes it. The backend caches account snapshots per worker and only
+-- serves one when its version equals the version it just read (PIN
+-- check), so a write from another worker is never hidden by the cache.
+--
+-- The money RPCs now also return the new balance + version, letting the
+-- backend write the snapshot through instead of re-reading the balance.
+-- =====================================================================
+
+
+alter table public.accounts
+    add column if not exists version bigint not null default 0;
+
+create or replace function public.bump_account_version()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.version := old.version + 1;
+    return new;
+end;
+$$;
+
+drop trigger if exists accounts_bump_version on public.accounts;
+create trigger accounts_bump_version
+    before update on public.accounts
+    for each row execute function public.bump_account_version();
+
+
+-- -------------------- LEGACY MONEY RPCS --------------------
+-- Same checks as before; the return type changes (void -> jsonb).
+drop function if exists public.deposit_money(text, integer);
+drop function if exists public.deposit_money(text, bigint);
+drop function if exists public.withdraw_money(text, integer);
+drop function if exists public.withdraw_money(text, bigint);
+drop function if exists public.transfer_money(text, text, integer);
+drop function if exists public.transfer_money(text, text, bigint);
+
+create function public.deposit_money(ac_no text, amount bigint)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_balance bigint;
+    v_version bigint;
+begin
+    if amount is null or amount <= 0 then
+        raise exception 'Amount must be greater than zero';
+    end if;
+
+    update accounts a
+       set balance = a.balance + deposit_money.amount
+     where a.account_no = deposit_money.ac_no
+    returning a.balance, a.version into v_balance, v_version;
+
+    if not found then
+        raise exception 'Account not found';
+    end if;
+
+    return jsonb_build_object('balance', v_balance, 'version', v_version);
+end;
+$$;
+
+create function public.withdraw_money(ac_no text, amount bigint)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_balance bigint;
+    v_version bigint;
+begin
+    if amount is null or amount <= 0 then
+        raise exception 'Amount must be greater than zero';
+    end if;
+
+    select a.balance into v_balance
+    from accounts a where a.account_no = withdraw_money.ac_no
+    for update;
+
+    if not found then
+        raise exception 'Account not found';
+    end if;
+    if v_balance < amount then
+        raise exception 'Insufficient balance';
+    end if;
+
+    update accounts a
+       set balance = a.balance - withdraw_money.amount
+     where a.account_no = withdraw_money.ac_no
+    returning a.balance, a.version into v_balance, v_version;
+
+    return jsonb_build_object('balance', v_balance, 'version', v_version);
+end;
+$$;
+
+create function public.transfer_money(from_ac text, to_ac text, amount bigint)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_balance bigint;
+    v_version bigint;
+begin
+    if amount is null or amount <= 0 then
+        raise exception 'Amount must be greater than zero';
+    end if;
+
+    perform 1 from accounts
+     where account_no in (from_ac, to_ac)
+     order by account_no
+     for update;
+
+    select a.balance into v_balance
+    from accounts a where a.account_no = transfer_money.from_ac;
+    if not found then
+        raise exception 'Sender account not found';
+    end if;
+
+    perform 1 from accounts a where a.account_no = transfer_money.to_ac;
+    if not found then
+        raise exception 'Receiver account not found';
+    end if;
+
+    if v_balance < amount then
+        raise exception 'Insufficient balance';
+    end if;
+
+    update accounts a
+       set balance = a.balance - transfer_money.amount
+     where a.account_no = transfer_money.from_ac
+    returning a.balance, a.version into v_balance, v_version;
+
+    update accounts a
+       set balance = a.balance + transfer_money.amount
+     where a.account_no = transfer_money.to_ac;
+
+    return jsonb_build_object('balance', v_balance, 'version', v_version);
+end;
+$$;
+
+revoke all on function public.deposit_money(text, bigint) from public, anon;
+revoke all on function public.withdraw_money(text, bigint) from public, anon;
+revoke all on function public.transfer_money(text, text, bigint) from public, anon;
+
+
+-- -------------------- ATOMIC RPCS (0001) + version --------------------
+-- -------------------- DEPOSIT --------------------
+create or replace function public.atm_deposit(
+    p_ac_no text,
+    p_amount bigint,
+    p_ip text default 'unknown',
+    p_user_agent text default 'unknown'
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_locked boolean;
+    v_balance bigint;
+    v_version bigint;
+    v_history_id bigint;
+    v_audit_id bigint;
+begin
+    if p_amount is null or p_amount <= 0 then
+        raise exception 'Amount must be greater than zero';
+    end if;
+
+    select is_locked into v_locked
+    from accounts where account_no = p_ac_no
+    for update;
+
+    if not found then
+        raise exception 'Account not found';
+    end if;
+    if v_locked then
+        raise exception 'Account locked';
+    end if;
+
+    update accounts
+       set balance = balance + p_amount,
+           failed_attempts = 0
+     where account_no = p_ac_no
+    returning balance, version into v_balance, v_version;
+
+    insert into history (account_no, action, amount, context)
+    values (p_ac_no, 'deposit', p_amount, null)
+    returning id into v_history_id;
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_ac_no, 'pin_success', 'PIN verified', p_ip, p_user_agent);
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_ac_no, 'deposit_success', 'Deposited ' || p_amount, p_ip, p_user_agent)
+    returning id into v_audit_id;
+
+    return jsonb_build_object(
+        'balance', v_balance,
+        'version', v_version,
+        'history_id', v_history_id,
+        'audit_id', v_audit_id
+    );
+end;
+$$;
+
+
+-- -------------------- WITHDRAW --------------------
+create or replace function public.atm_withdraw(
+    p_ac_no text,
+    p_amount bigint,
+    p_ip text default 'unknown',
+    p_user_agent text default 'unknown'
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_locked boolean;
+    v_balance bigint;
+    v_version bigint;
+    v_history_id bigint;
+    v_audit_id bigint;
+begin
+    if p_amount is null or p_amount <= 0 then
+        raise exception 'Amount must be greater than zero';
+    end if;
+
+    select is_locked, balance into v_locked, v_balance
+    from accounts where account_no = p_ac_no
+    for update;
+
+    if not found then
+        raise exception 'Account not found';
+    end if;
+    if v_locked then
+        raise exception 'Account locked';
+    end if;
+    if v_balance < p_amount then
+        raise exception 'Insufficient balance';
+    end if;
+
+    update accounts
+       set balance = balance - p_amount,
+           failed_attempts = 0
+     where account_no = p_ac_no
+    returning balance, version into v_balance, v_version;
+
+    insert into history (account_no, action, amount, context)
+    values (p_ac_no, 'withdraw', p_amount, null)
+    returning id into v_history_id;
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_ac_no, 'pin_success', 'PIN verified', p_ip, p_user_agent);
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_ac_no, 'withdraw_success', 'Withdrew ' || p_amount, p_ip, p_user_agent)
+    returning id into v_audit_id;
+
+    return jsonb_build_object(
+        'balance', v_balance,
+        'version', v_version,
+        'history_id', v_history_id,
+        'audit_id', v_audit_id
+    );
+end;
+$$;
+
+
+-- -------------------- TRANSFER --------------------
+create or replace function public.atm_transfer(
+    p_from_ac text,
+    p_to_ac text,
+    p_amount bigint,
+    p_ip text default 'unknown',
+    p_user_agent text default 'unknown'
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_locked boolean;
+    v_balance bigint;
+    v_version bigint;
+    v_history_id bigint;
+    v_audit_id bigint;
+begin
+    if p_amount is null or p_amount <= 0 then
+        raise exception 'Amount must be greater than zero';
+    end if;
+    if p_from_ac = p_to_ac then
+        raise exception 'Sender and receiver must differ';
+    end if;
+
+    -- Lock both rows in a stable order so opposite transfers never deadlock
+    perform 1 from accounts
+     where account_no in (p_from_ac, p_to_ac)
+     order by account_no
+     for update;
+
+    select is_locked, balance into v_locked, v_balance
+    from accounts where account_no = p_from_ac;
+
+    if not found then
+        raise exception 'Sender account not found';
+    end if;
+    if v_locked then
+        raise exception 'Account locked';
+    end if;
+
+    perform 1 from accounts where account_no = p_to_ac;
+    if not found then
+        raise exception 'Receiver account not found';
+    end if;
+
+    if v_balance < p_amount then
+        raise exception 'Insufficient balance';
+    end if;
+
+    update accounts
+       set balance = balance - p_amount,
+           failed_attempts = 0
+     where account_no = p_from_ac
+    returning balance, version into v_balance, v_version;
+
+    update accounts
+       set balance = balance + p_amount
+     where account_no = p_to_ac;
+
+    insert into history (account_no, action, amount, context)
+    values (p_from_ac, 'transfer_out', p_amount, jsonb_build_object('to', p_to_ac))
+    returning id into v_history_id;
+
+    insert into history (account_no, action, amount, context)
+    values (p_to_ac, 'transfer_in', p_amount, jsonb_build_object('from', p_from_ac));
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (p_from_ac, 'pin_success', 'PIN verified', p_ip, p_user_agent);
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (
+        p_from_ac,
+        'transfer_success',
+        'Sent ' || p_amount || ' to ' || p_to_ac,
+        p_ip,
+        p_user_agent
+    )
+    returning id into v_audit_id;
+
+    return jsonb_build_object(
+        'balance', v_balance,
+        'version', v_version,
+        'history_id', v_history_id,
+        'audit_id', v_audit_id
+    );
+end;
+$$;
@@ -0,0 +1,142 @@
+-- =====================================================================
+-- Batch (payroll) transfers (POST /transaction/batch-transfer)
+--
+-- Moves money from one sender to many receivers in one transaction.
+-- Items are decided in order against a running balance; nothing is
+-- written until every item has been decided, then the sender is debited
+-- once, receivers are credited with one UPDATE and both history sides
+-- are inserted with one multi-row INSERT.
+--
+--   p_all_or_nothing = true   any failed item -> nothing is applied
+--   p_all_or_nothing = false  failed items are skipped, the rest applied
+--
+-- The backend sends large batches in chunks (one call per chunk) in
+-- best-effort mode; all-or-nothing batches are always one call.
+--
+-- p_items: [{"i": 0, "to": "AC...", "amount": 100, "ref": "salary-03"}]
+-- returns: {"balance", "version", "applied", "total",
+--           "failed": [{"i", "error"}]}
+--
+-- Requires 0006 (accounts.version).
+-- =====================================================================
+
+create or replace function public.batch_transfer(
+    p_from_ac text,
+    p_items jsonb,
+    p_all_or_nothing boolean default false,
+    p_batch_id text default null,
+    p_ip text default 'unknown',
+    p_user_agent text default 'unknown'
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_locked boolean;
+    v_balance bigint;
+    v_version bigint;
+    v_item record;
+    v_error text;
+    v_total bigint := 0;
+    v_ok int[] := '{}';
+    v_fail_i int[] := '{}';
+    v_fail_error text[] := '{}';
+begin
+    -- Lock the sender and every receiver in a stable order, so a batch
+    -- never deadlocks with single transfers or with another batch
+    perform 1 from accounts
+     where account_no = p_from_ac
+        or account_no in (select e->>'to' from jsonb_array_elements(p_items) e)
+     order by account_no
+     for update;
+
+    select is_locked, balance, version into v_locked, v_balance, v_version
+    from accounts where account_no = p_from_ac;
+
+    if not found then
+        raise exception 'Sender account not found';
+    end if;
+    if v_locked then
+        raise exception 'Account locked';
+    end if;
+
+    -- Decide every item (no writes yet)
+    for v_item in
+        select (e->>'i')::int as i,
+               e->>'to' as to_ac,
+               (e->>'amount')::bigint as amount,
+               exists (select 1 from accounts a where a.account_no = e->>'to') as receiver_found
+          from jsonb_array_elements(p_items) with ordinality as t(e, n)
+         order by n
+    loop
+        v_error := case
+            when v_item.amount is null or v_item.amount <= 0 then 'Amount must be greater than zero'
+            when v_item.to_ac = p_from_ac then 'Sender and receiver must differ'
+            when not v_item.receiver_found then 'Receiver account not found'
+            when v_total + v_item.amount > v_balance then 'Insufficient balance'
+        end;
+
+        if v_error is null then
+            v_total := v_total + v_item.amount;
+            v_ok := array_append(v_ok, v_item.i);
+        else
+            v_fail_i := array_append(v_fail_i, v_item.i);
+            v_fail_error := array_append(v_fail_error, v_error);
+        end if;
+    end loop;
+
+    if cardinality(v_ok) = 0 or (p_all_or_nothing and cardinality(v_fail_i) > 0) then
+        return jsonb_build_object(
+            'balance', v_balance, 'version', v_version, 'applied', 0, 'total', 0,
+            'failed', (select coalesce(jsonb_agg(jsonb_build_object('i', i, 'error', err) order by i), '[]'::jsonb)
+                         from unnest(v_fail_i, v_fail_error) as f(i, err))
+        );
+    end if;
+
+    -- Apply: one debit, one credit statement, one history insert
+    update accounts
+       set balance = balance - v_total
+     where account_no = p_from_ac
+    returning balance, version into v_balance, v_version;
+
+    with items as (
+        select (e->>'i')::int as i, e->>'to' as to_ac, (e->>'amount')::bigint as amount, e->>'ref' as ref
+          from jsonb_array_elements(p_items) e
+    ),
+    ok as (
+        select items.* from items join unnest(v_ok) as k(i) using (i)
+    ),
+    credited as (
+        update accounts a
+           set balance = a.balance + s.amount
+          from (select to_ac, sum(amount) as amount from ok group by to_ac) s
+         where a.account_no = s.to_ac
+        returning 1
+    )
+    insert into history (account_no, action, amount, context)
+    select p_from_ac, 'transfer_out', amount,
+           jsonb_strip_nulls(jsonb_build_object('to', to_ac, 'batch', p_batch_id, 'ref', ref))
+      from ok
+    union all
+    select to_ac, 'transfer_in', amount,
+           jsonb_strip_nulls(jsonb_build_object('from', p_from_ac, 'batch', p_batch_id, 'ref', ref))
+      from ok;
+
+    insert into app_audit_logs (actor, action, details, ip, user_agent)
+    values (
+        p_from_ac, 'batch_transfer_success',
+        format('Sent %s in %s transfers (batch %s)', v_total, cardinality(v_ok), coalesce(p_batch_id, '-')),
+        p_ip, p_user_agent
+    );
+
+    return jsonb_build_object(
+        'balance', v_balance, 'version', v_version, 'applied', cardinality(v_ok), 'total', v_total,
+        'failed', (select coalesce(jsonb_agg(jsonb_build_object('i', i, 'error', err) order by i), '[]'::jsonb)
+                     from unnest(v_fail_i, v_fail_error) as f(i, err))
+    );
+end;
+$$;
+
+
+revoke all on function public.batch_transfer(text, jsonb, boolean, text, text, text) from public, anon;
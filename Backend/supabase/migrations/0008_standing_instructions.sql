@@ -0,0 +1,169 @@
+-- =====================================================================
+-- Standing instructions (scheduled recurring transfers)
+--
+-- One row per instruction. next_run_at is the due time; the partial index
+-- on it (active rows only) is the scheduler's queue, so a tick reads just
+-- the due rows in due order and never scans the table.
+--
+-- run_standing_instructions() is called by every worker's scheduler. It
+-- claims up to p_limit due rows with FOR UPDATE SKIP LOCKED (workers never
+-- run the same instruction twice), moves the money, tags both history
+-- rows with the instruction id, then reschedules each row:
+--
+--   done      next occurrence (missed ones are skipped, never replayed)
+--   retry     insufficient funds / locked account: now + base * 2^retries
+--   missed    still failing after p_max_retries: on to the next occurrence
+--   failed    sender or receiver gone: instruction is stopped
+--
+-- Occurrences are start_at + n * step, so monthly runs keep their day of
+-- month (Jan 31 -> Feb 28 -> Mar 31).
+-- =====================================================================
+
+create table if not exists public.standing_instructions (
+    id           bigserial primary key,
+    from_ac      text not null,
+    to_ac        text not null,
+    amount       bigint not null check (amount > 0),
+    frequency    text not null check (frequency in ('daily', 'weekly', 'monthly')),
+    start_at     timestamptz not null,
+    occurrence   integer not null default 0,          -- occurrences done or given up
+    next_run_at  timestamptz not null,
+    retries      integer not null default 0,          -- for the current occurrence
+    status       text not null default 'active' check (status in ('active', 'cancelled', 'failed')),
+    ref          text,
+    last_run_at  timestamptz,
+    last_error   text,
+    created_by   text,
+    created_at   timestamptz not null default now()
+);
+
+create index if not exists standing_instructions_due_idx
+    on public.standing_instructions (next_run_at)
+    where status = 'active';
+
+create index if not exists standing_instructions_from_ac_idx
+    on public.standing_instructions (from_ac, id);
+
+alter table public.standing_instructions enable row level security;
+
+
+create or replace function public.si_occurrence_at(
+    p_start timestamptz,
+    p_frequency text,
+    p_occurrence integer
+) returns timestamptz
+language sql
+immutable
+as $$
+    select p_start + p_occurrence * case p_frequency
+        when 'daily' then interval '1 day'
+        when 'weekly' then interval '7 days'
+        else interval '1 month'
+    end
+$$;
+
+
+create or replace function public.run_standing_instructions(
+    p_limit integer default 200,
+    p_max_retries integer default 3,
+    p_retry_base_seconds integer default 900
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_now timestamptz := now();
+    v_si record;
+    v_locked boolean;
+    v_balance bigint;
+    v_error text;
+    v_outcome text;
+    v_next integer;
+    v_results jsonb[] := '{}';
+begin
+    for v_si in
+        select *
+          from standing_instructions
+         where status = 'active' and next_run_at <= v_now
+         order by next_run_at
+         limit p_limit
+           for update skip locked
+    loop
+        v_error := null;
+
+        perform 1 from accounts
+         where account_no in (v_si.from_ac, v_si.to_ac)
+         order by account_no
+         for update;
+
+        select is_locked, balance into v_locked, v_balance
+          from accounts where account_no = v_si.from_ac;
+
+        if not found then
+            v_error := 'Sender account not found';
+        elsif not exists (select 1 from accounts where account_no = v_si.to_ac) then
+            v_error := 'Receiver account not found';
+        elsif v_locked then
+            v_error := 'Account locked';
+        elsif v_balance < v_si.amount then
+            v_error := 'Insufficient balance';
+        end if;
+
+        if v_error is null then
+            update accounts set balance = balance - v_si.amount where account_no = v_si.from_ac;
+            update accounts set balance = balance + v_si.amount where account_no = v_si.to_ac;
+
+            insert into history (account_no, action, amount, context)
+            values
+                (v_si.from_ac, 'transfer_out', v_si.amount,
+                 jsonb_strip_nulls(jsonb_build_object('to', v_si.to_ac, 'instruction', v_si.id, 'ref', v_si.ref))),
+                (v_si.to_ac, 'transfer_in', v_si.amount,
+                 jsonb_strip_nulls(jsonb_build_object('from', v_si.from_ac, 'instruction', v_si.id, 'ref', v_si.ref)));
+
+            insert into app_audit_logs (actor, action, details, ip, user_agent)
+            values (v_si.from_ac, 'standing_instruction_success',
+                    format('Sent %s to %s (instruction %s)', v_si.amount, v_si.to_ac, v_si.id),
+                    'scheduler', 'scheduler');
+            v_outcome := 'done';
+        elsif v_error in ('Sender account not found', 'Receiver account not found') then
+            v_outcome := 'failed';
+        elsif v_si.retries < p_max_retries then
+            v_outcome := 'retry';
+        else
+            v_outcome := 'missed';
+        end if;
+
+        if v_outcome in ('done', 'missed') then
+            -- next occurrence still in the future (a long outage never replays a backlog)
+            v_next := v_si.occurrence + 1;
+            while si_occurrence_at(v_si.start_at, v_si.frequency, v_next) <= v_now loop
+                v_next := v_next + 1;
+            end loop;
+
+            update standing_instructions
+               set occurrence = v_next, retries = 0, last_run_at = v_now, last_error = v_error,
+                   next_run_at = si_occurrence_at(start_at, frequency, v_next)
+             where id = v_si.id;
+        elsif v_outcome = 'retry' then
+            update standing_instructions
+               set retries = retries + 1, last_run_at = v_now, last_error = v_error,
+                   next_run_at = v_now + make_interval(secs => p_retry_base_seconds * power(2, v_si.retries))
+             where id = v_si.id;
+        else
+            update standing_instructions
+               set status = 'failed', last_run_at = v_now, last_error = v_error
+             where id = v_si.id;
+        end if;
+
+        v_results := array_append(v_results, jsonb_strip_nulls(
+            jsonb_build_object('id', v_si.id, 'outcome', v_outcome, 'error', v_error)
+        ));
+    end loop;
+
+    return jsonb_build_object('processed', cardinality(v_results), 'results', to_jsonb(v_results));
+end;
+$$;
+
+
+revoke all on function public.run_standing_instructions(integer, integer, integer) from public, anon;
@@ -0,0 +1,122 @@
+-- =====================================================================
+-- Daily balance snapshots (GET /history/<ac_no>/statement, /balance-at)
+--
+-- balance_snapshots holds one row per account per day with activity: the
+-- balance at the end of that (UTC) day. A point-in-time balance is then
+-- the latest snapshot before that day plus the few history rows after it,
+-- however old the account is.
+--
+-- build_balance_snapshots() is incremental. It reads history rows past
+-- the watermark (by id) in one chunk, sums the signed amounts per account
+-- per day, adds them to each account's latest snapshot and moves the
+-- watermark. Only rows created before p_before are taken, and the chunk
+-- stops at the first row that is not, so the watermark never skips a row.
+-- The backend passes the start of the current UTC day (minus a settle
+-- delay), so only closed days are snapshotted and a snapshot is final.
+--
+-- Signed amounts: deposit, transfer_in +amount; withdraw, transfer_out
+-- -amount; every other action 0.
+-- =====================================================================
+
+create table if not exists public.balance_snapshots (
+    account_no  text not null,
+    day         date not null,
+    balance     bigint not null,
+    primary key (account_no, day)
+);
+
+create table if not exists public.job_watermarks (
+    name        text primary key,
+    last_id     bigint not null default 0,
+    updated_at  timestamptz not null default now()
+);
+
+insert into public.job_watermarks (name) values ('balance_snapshots')
+on conflict (name) do nothing;
+
+alter table public.balance_snapshots enable row level security;
+alter table public.job_watermarks enable row level security;
+
+
+create or replace function public.history_signed_amount(p_action text, p_amount bigint)
+returns bigint
+language sql
+immutable
+as $$
+    select case
+        when p_action in ('deposit', 'transfer_in') then p_amount
+        when p_action in ('withdraw', 'transfer_out') then -p_amount
+        else 0
+    end
+$$;
+
+
+create or replace function public.build_balance_snapshots(
+    p_before timestamptz,
+    p_limit integer default 50000
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_from bigint;
+    v_to bigint;
+    v_rows integer;
+    v_snapshots integer;
+begin
+    -- row lock: concurrent runs queue up instead of double-counting a chunk
+    select last_id into v_from
+      from job_watermarks where name = 'balance_snapshots'
+       for update;
+
+    with candidates as (
+        select id, account_no, action, amount, created_at
+          from history
+         where id > v_from
+         order by id
+         limit p_limit
+    ),
+    chunk as (
+        select * from candidates
+         where id < coalesce((select min(id) from candidates where created_at >= p_before), 9223372036854775807)
+    ),
+    daily as (
+        select account_no, (created_at at time zone 'UTC')::date as day,
+               sum(history_signed_amount(action, amount)) as delta
+          from chunk
+         group by 1, 2
+    ),
+    running as (
+        select d.account_no, d.day,
+               coalesce((select s.balance from balance_snapshots s
+                          where s.account_no = d.account_no
+                          order by s.day desc limit 1), 0)
+               + sum(d.delta) over (partition by d.account_no order by d.day) as balance
+          from daily d
+    ),
+    upserted as (
+        insert into balance_snapshots (account_no, day, balance)
+        select account_no, day, balance from running
+        on conflict (account_no, day) do update set balance = excluded.balance
+        returning 1
+    )
+    select (select max(id) from chunk), (select count(*) from chunk), (select count(*) from upserted)
+      into v_to, v_rows, v_snapshots;
+
+    update job_watermarks
+       set last_id = coalesce(v_to, v_from), updated_at = now()
+     where name = 'balance_snapshots';
+
+    return jsonb_build_object(
+        'processed', v_rows,
+        'snapshots', v_snapshots,
+        'watermark', coalesce(v_to, v_from),
+        -- a full chunk means more rows may be waiting
+        'more', v_rows = p_limit
+    );
+end;
+$$;
+
+
+revoke all on function public.build_balance_snapshots(timestamptz, integer) from public, anon;
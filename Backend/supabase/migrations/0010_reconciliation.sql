@@ -0,0 +1,77 @@
+-- =====================================================================
+-- Ledger reconciliation (python -m app.jobs.reconcile)
+--
+-- Checks accounts.balance against the signed sum of the account's history
+-- (history_signed_amount from 0009). The group-by runs here, next to the
+-- data, one keyset page of accounts at a time: each call reads p_limit
+-- accounts and their history through history_account_created_id_idx, so
+-- memory and transaction length are bounded however big the ledger is.
+--
+-- account_partitions() splits the account number space into p_parts
+-- ranges of roughly equal size; the job reconciles the ranges on parallel
+-- connections, so the work spreads over several database cores.
+--
+-- Both functions only read. Requires 0009.
+-- =====================================================================
+
+create or replace function public.account_partitions(p_parts integer)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    -- upper bound (inclusive) of each range, in order
+    select coalesce(jsonb_agg(upper_ac order by upper_ac), '[]'::jsonb)
+      from (
+          select max(account_no) as upper_ac
+            from (select account_no, ntile(greatest(p_parts, 1)) over (order by account_no) as part
+                    from accounts) t
+           group by part
+      ) bounds
+$$;
+
+
+create or replace function public.reconcile_balances(
+    p_after text default null,
+    p_until text default null,
+    p_limit integer default 2000
+) returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    with page as (
+        select account_no, balance
+          from accounts
+         where (p_after is null or account_no > p_after)
+           and (p_until is null or account_no <= p_until)
+         order by account_no
+         limit p_limit
+    ),
+    ledger as (
+        select p.account_no, p.balance,
+               coalesce(sum(history_signed_amount(h.action, h.amount)), 0) as ledger,
+               count(h.id) as entries
+          from page p
+          left join history h on h.account_no = p.account_no
+         group by p.account_no, p.balance
+    )
+    select jsonb_build_object(
+        'checked', count(*),
+        'entries', coalesce(sum(entries), 0),
+        'last', max(account_no),
+        'mismatches', coalesce(
+            jsonb_agg(jsonb_build_object(
+                'account_no', account_no, 'balance', balance, 'ledger', ledger, 'difference', balance - ledger
+            ) order by account_no) filter (where balance <> ledger),
+            '[]'::jsonb
+        )
+    )
+    from ledger
+$$;
+
+
+revoke all on function public.account_partitions(integer) from public, anon;
+revoke all on function public.reconcile_balances(text, text, integer) from public, anon;
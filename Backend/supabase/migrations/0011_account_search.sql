@@ -0,0 +1,96 @@
+-- =====================================================================
+-- Account search (GET /account/search)
+--
+-- Trigram GIN indexes on the three searchable columns serve both prefix
+-- (LIKE 'term%') and fuzzy (similarity, the % operator) lookups, so a
+-- search reads index entries for the term instead of scanning accounts.
+--
+-- search_accounts() ranks prefix matches 1.0 and fuzzy matches by their
+-- best trigram similarity (rounded to 4 places so it can round-trip in a
+-- cursor), ordered by (rank desc, account_no). Paging is keyset on that
+-- pair: pass the last row's rank and account_no as p_after_rank /
+-- p_after_ac. The query is built per call with only the requested fields,
+-- so the planner can combine exactly those indexes.
+--
+-- p_field: 'name' | 'mobileno' | 'gmail' | null (all three)
+-- =====================================================================
+
+create extension if not exists pg_trgm;
+
+create index if not exists accounts_name_trgm_idx
+    on public.accounts using gin (lower(name) gin_trgm_ops);
+
+create index if not exists accounts_mobileno_trgm_idx
+    on public.accounts using gin (mobileno gin_trgm_ops);
+
+create index if not exists accounts_gmail_trgm_idx
+    on public.accounts using gin (lower(gmail) gin_trgm_ops);
+
+
+create or replace function public.search_accounts(
+    p_query text,
+    p_field text default null,
+    p_fuzzy boolean default true,
+    p_limit integer default 20,
+    p_after_rank numeric default null,
+    p_after_ac text default null
+) returns table (
+    account_no text,
+    name text,
+    mobileno text,
+    gmail text,
+    rank numeric
+)
+language plpgsql
+stable
+security definer
+set search_path = public
+as $$
+declare
+    v_term text := lower(p_query);
+    v_prefix text := replace(replace(replace(lower(p_query), '\', '\\'), '%', '\%'), '_', '\_') || '%';
+    v_field text;
+    v_expr text;
+    v_prefix_match text[] := '{}';
+    v_match text[] := '{}';
+    v_similarity text[] := '{}';
+begin
+    foreach v_field in array coalesce(array[p_field], array['name', 'mobileno', 'gmail']) loop
+        v_expr := case v_field
+            when 'name' then 'lower(a.name)'
+            when 'mobileno' then 'a.mobileno'
+            when 'gmail' then 'lower(a.gmail)'
+        end;
+        if v_expr is null then
+            raise exception 'Unknown search field: %', v_field;
+        end if;
+
+        v_prefix_match := v_prefix_match || format('%s like $2', v_expr);
+        v_match := v_match || format('%s like $2', v_expr);
+        v_similarity := v_similarity || format('similarity(%s, $1)', v_expr);
+        if p_fuzzy then
+            v_match := v_match || format('%s %% $1', v_expr);
+        end if;
+    end loop;
+
+    return query execute format($q$
+        select * from (
+            select a.account_no::text, a.name::text, a.mobileno::text, a.gmail::text,
+                   case when %s then 1.0 else round(greatest(%s)::numeric, 4) end as rank
+              from accounts a
+             where %s
+        ) hits
+        where $4 is null or hits.rank < $3 or (hits.rank = $3 and hits.account_no > $4)
+        order by hits.rank desc, hits.account_no
+        limit $5
+    $q$,
+        array_to_string(v_prefix_match, ' or '),
+        array_to_string(v_similarity, ', '),
+        array_to_string(v_match, ' or ')
+    )
+    using v_term, v_prefix, p_after_rank, p_after_ac, p_limit;
+end;
+$$;
+
+
+revoke all on function public.search_accounts(text, text, boolean, integer, numeric, text) from public, anon;
@@ -0,0 +1,19 @@
+-- =====================================================================
+-- Audit log reads and retention (GET /audit/logs, python -m app.jobs.audit_retention)
+--
+-- Reads are keyset pages newest first on (created_at, id), optionally for
+-- one actor; these two indexes serve both shapes and are the only ones on
+-- the table, so inserts stay cheap.
+--
+-- Retention works in whole UTC days (the "partitions"): a day older than
+-- AUDIT_RETENTION_DAYS is written to a gzip JSONL file in the archive
+-- directory, then deleted here in id-bounded chunks. The table only ever
+-- holds the last N days; archived days stay readable through the same
+-- endpoint.
+-- =====================================================================
+
+create index if not exists app_audit_logs_created_id_idx
+    on public.app_audit_logs (created_at desc, id desc);
+
+create index if not exists app_audit_logs_actor_created_id_idx
+    on public.app_audit_logs (actor, created_at desc, id desc);
@@ -0,0 +1,110 @@
+-- =====================================================================
+-- Account search: prefix mode pages on account_no (follows 0011)
+--
+-- Prefix matches all rank 1.0, so computing similarity() for every hit
+-- and sorting on the rank bought nothing. Prefix mode now skips the rank
+-- expression and is plain keyset on account_no: the page is
+-- "account_no > p_after_ac order by account_no".
+--
+-- The btree text_pattern_ops indexes below turn "col like 'term%'" into
+-- an index range scan (the trigram GIN indexes cannot order or range
+-- scan); with account_no as the second key the keyset condition is
+-- checked inside the same index scan instead of on fetched rows.
+--
+-- Fuzzy mode is unchanged (the API now requires 3+ characters for it,
+-- one whole trigram, so short terms no longer match half the table).
+-- =====================================================================
+
+create index if not exists accounts_name_prefix_idx
+    on public.accounts (lower(name) text_pattern_ops, account_no);
+
+create index if not exists accounts_mobileno_prefix_idx
+    on public.accounts (mobileno text_pattern_ops, account_no);
+
+create index if not exists accounts_gmail_prefix_idx
+    on public.accounts (lower(gmail) text_pattern_ops, account_no);
+
+
+create or replace function public.search_accounts(
+    p_query text,
+    p_field text default null,
+    p_fuzzy boolean default true,
+    p_limit integer default 20,
+    p_after_rank numeric default null,
+    p_after_ac text default null
+) returns table (
+    account_no text,
+    name text,
+    mobileno text,
+    gmail text,
+    rank numeric
+)
+language plpgsql
+stable
+security definer
+set search_path = public
+as $$
+declare
+    v_term text := lower(p_query);
+    v_prefix text := replace(replace(replace(lower(p_query), '\', '\\'), '%', '\%'), '_', '\_') || '%';
+    v_field text;
+    v_expr text;
+    v_prefix_match text[] := '{}';
+    v_match text[] := '{}';
+    v_similarity text[] := '{}';
+begin
+    foreach v_field in array coalesce(array[p_field], array['name', 'mobileno', 'gmail']) loop
+        v_expr := case v_field
+            when 'name' then 'lower(a.name)'
+            when 'mobileno' then 'a.mobileno'
+            when 'gmail' then 'lower(a.gmail)'
+        end;
+        if v_expr is null then
+            raise exception 'Unknown search field: %', v_field;
+        end if;
+
+        v_prefix_match := v_prefix_match || format('%s like $2', v_expr);
+        v_match := v_match || format('%s like $2', v_expr);
+        v_similarity := v_similarity || format('similarity(%s, $1)', v_expr);
+        if p_fuzzy then
+            v_match := v_match || format('%s %% $1', v_expr);
+        end if;
+    end loop;
+
+    if not p_fuzzy then
+        -- every hit ranks 1.0: no rank to compute, keyset on account_no alone
+        return query execute format($q$
+            select a.account_no::text, a.name::text, a.mobileno::text, a.gmail::text, 1.0 as rank
+              from accounts a
+             where (%s)
+               and ($4 is null or a.account_no > $4)
+             order by a.account_no
+             limit $5
+        $q$,
+            array_to_string(v_prefix_match, ' or ')
+        )
+        using v_term, v_prefix, p_after_rank, p_after_ac, p_limit;
+        return;
+    end if;
+
+    return query execute format($q$
+        select * from (
+            select a.account_no::text, a.name::text, a.mobileno::text, a.gmail::text,
+                   case when %s then 1.0 else round(greatest(%s)::numeric, 4) end as rank
+              from accounts a
+             where %s
+        ) hits
+        where $4 is null or hits.rank < $3 or (hits.rank = $3 and hits.account_no > $4)
+        order by hits.rank desc, hits.account_no
+        limit $5
+    $q$,
+        array_to_string(v_prefix_match, ' or '),
+        array_to_string(v_similarity, ', '),
+        array_to_string(v_match, ' or ')
+    )
+    using v_term, v_prefix, p_after_rank, p_after_ac, p_limit;
+end;
+$$;
+
+
+revoke all on function public.search_accounts(text, text, boolean, integer, numeric, text) from public, anon;
@@ -0,0 +1,17 @@
+-- =====================================================================
+-- PIN session revocation, shared by every worker
+--
+-- PIN sessions (X-PIN-Session) are stateless tokens. Revoking them used
+-- to be a per-process cache, so other gunicorn workers kept accepting a
+-- session after it was ended. Revocation is now one column on the
+-- account: every session whose iat is at or before
+-- pin_sessions_revoked_at is dead. Each session use already re-reads the
+-- account row (lock state, PIN fingerprint), so checking it costs nothing.
+--
+-- Set on a PIN change (same update as the new hash), on lockout, and when
+-- a session is ended explicitly (DELETE /auth/pin-session), which ends
+-- every PIN session open on that account.
+-- =====================================================================
+
+alter table public.accounts
+    add column if not exists pin_sessions_revoked_at timestamptz;
@@ -0,0 +1,84 @@
+-- =====================================================================
+-- Idempotency keys shared by every worker (Idempotency-Key header)
+--
+-- One row per (user, path, key). claim_idempotency_key() inserts the row
+-- before the request runs; the primary key makes exactly one caller the
+-- owner, whichever worker each retry lands on. The owner stores the
+-- response on the row when it is final (a success or a business
+-- rejection), or deletes the row when a retry should run again.
+--
+-- A row without a response is in flight. If its worker dies, the row
+-- stays in flight until it expires: a retry gets 409 instead of risking
+-- a second money movement.
+--
+-- Expired rows are replaced on the next claim of the same key, and each
+-- claim also sweeps a few other expired rows.
+-- =====================================================================
+
+create table if not exists public.idempotency_keys (
+    user_id          text not null,
+    path             text not null,
+    key              text not null,
+    fingerprint      text not null,
+    response_status  integer,
+    response_body    text,
+    mimetype         text,
+    created_at       timestamptz not null default now(),
+    expires_at       timestamptz not null,
+    primary key (user_id, path, key)
+);
+
+create index if not exists idempotency_keys_expires_idx
+    on public.idempotency_keys (expires_at);
+
+
+-- Returns {claimed: true} for the new owner, otherwise the stored row:
+-- {claimed: false, fingerprint, response_status, response_body, mimetype}
+-- (response_status null = still in flight).
+create or replace function public.claim_idempotency_key(
+    p_user text,
+    p_path text,
+    p_key text,
+    p_fingerprint text,
+    p_ttl_seconds integer
+) returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_row idempotency_keys%rowtype;
+begin
+    delete from idempotency_keys
+     where (user_id, path, key) in (
+        select user_id, path, key from idempotency_keys
+         where expires_at <= now()
+         order by expires_at
+         limit 10
+           for update skip locked
+     )
+        or (user_id = p_user and path = p_path and key = p_key and expires_at <= now());
+
+    insert into idempotency_keys (user_id, path, key, fingerprint, expires_at)
+    values (p_user, p_path, p_key, p_fingerprint, now() + make_interval(secs => p_ttl_seconds))
+    on conflict do nothing;
+
+    if found then
+        return jsonb_build_object('claimed', true);
+    end if;
+
+    select * into v_row from idempotency_keys
+     where user_id = p_user and path = p_path and key = p_key;
+
+    return jsonb_build_object(
+        'claimed', false,
+        'fingerprint', v_row.fingerprint,
+        'response_status', v_row.response_status,
+        'response_body', v_row.response_body,
+        'mimetype', v_row.mimetype
+    );
+end;
+$$;
+
+
+revoke all on function public.claim_idempotency_key(text, text, text, text, integer) from public, anon;
@@ -0,0 +1,105 @@
+-- =====================================================================
+-- Audit log archive in the database (replaces 0012's archive directory)
+--
+-- Retention used to write gzip files to the local disk of whichever
+-- process ran it. On the deploy that disk is ephemeral and not shared:
+-- archived rows could vanish on restart and other instances never saw
+-- them. Archived rows now live here, in chunks.
+--
+-- A chunk is up to AUDIT_ARCHIVE_PAGE_SIZE rows of one UTC day, taken in
+-- (created_at, id) order, stored as base64 gzip JSONL newest row first.
+-- Chunks never overlap, so they are ordered by their (min_created_at,
+-- min_id) key alone. The actors/actions arrays and the created_at range let
+-- a filtered read skip chunks without decompressing them.
+--
+-- archive_audit_chunk() inserts a chunk and deletes exactly the rows it
+-- holds in one transaction: a row is never deleted before its archive
+-- copy is committed, and a failed run leaves nothing half done.
+-- =====================================================================
+
+create table if not exists public.app_audit_log_archive (
+    id              bigserial primary key,
+    day             date not null,
+    row_count       integer not null,
+    min_created_at  timestamptz not null,
+    min_id          bigint not null,
+    max_created_at  timestamptz not null,
+    max_id          bigint not null,
+    actors          text[] not null default '{}',
+    actions         text[] not null default '{}',
+    data            text not null,
+    archived_at     timestamptz not null default now()
+);
+
+create index if not exists app_audit_log_archive_min_key_idx
+    on public.app_audit_log_archive (min_created_at desc, min_id desc);
+
+
+create or replace function public.archive_audit_chunk(
+    p_day date,
+    p_row_count integer,
+    p_min_created_at timestamptz,
+    p_min_id bigint,
+    p_max_created_at timestamptz,
+    p_max_id bigint,
+    p_actors text[],
+    p_actions text[],
+    p_data text
+) returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_deleted integer;
+begin
+    insert into app_audit_log_archive (
+        day, row_count, min_created_at, min_id, max_created_at, max_id, actors, actions, data
+    ) values (
+        p_day, p_row_count, p_min_created_at, p_min_id, p_max_created_at, p_max_id, p_actors, p_actions, p_data
+    );
+
+    delete from app_audit_logs
+     where (created_at, id) >= (p_min_created_at, p_min_id)
+       and (created_at, id) <= (p_max_created_at, p_max_id);
+    get diagnostics v_deleted = row_count;
+
+    if v_deleted <> p_row_count then
+        raise exception 'Audit chunk changed while archiving: % rows to delete, % archived', v_deleted, p_row_count;
+    end if;
+
+    return v_deleted;
+end;
+$$;
+
+
+-- Chunks holding rows older than (p_before_at, p_before_id) that may match
+-- the filters, newest first.
+create or replace function public.read_audit_archive(
+    p_actor text default null,
+    p_actions text[] default null,
+    p_from timestamptz default null,
+    p_to timestamptz default null,
+    p_before_at timestamptz default null,
+    p_before_id bigint default null,
+    p_limit integer default 4
+) returns setof app_audit_log_archive
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select *
+      from app_audit_log_archive c
+     where (p_actor is null or c.actors @> array[p_actor])
+       and (p_actions is null or c.actions && p_actions)
+       and (p_from is null or c.max_created_at >= p_from)
+       and (p_to is null or c.min_created_at < p_to)
+       and (p_before_at is null or (c.min_created_at, c.min_id) < (p_before_at, p_before_id))
+     order by c.min_created_at desc, c.min_id desc
+     limit p_limit;
+$$;
+
+
+revoke all on function public.archive_audit_chunk(date, integer, timestamptz, bigint, timestamptz, bigint, text[], text[], text) from public, anon;
+revoke all on function public.read_audit_archive(text, text[], timestamptz, timestamptz, timestamptz, bigint, integer) from public, anon;
@@ -0,0 +1,32 @@
+-- =====================================================================
+-- Signed history sum over a time range (statements, balance-at)
+--
+-- The statement replay starts from the nearest balance snapshot and adds
+-- the history after it. With no snapshot yet (a new deployment, or
+-- snapshots not built) that is the account's whole history; summing it
+-- here reads it through history_account_created_id_idx without shipping
+-- a row to the backend. The backend only fetches the rows it returns as
+-- statement entries.
+--
+-- [p_from, p_to), either bound optional. Only reads. Requires 0009.
+-- =====================================================================
+
+create or replace function public.history_balance_delta(
+    p_ac_no text,
+    p_from timestamptz default null,
+    p_to timestamptz default null
+) returns bigint
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select coalesce(sum(history_signed_amount(action, amount)), 0)::bigint
+      from history
+     where account_no = p_ac_no
+       and (p_from is null or created_at >= p_from)
+       and (p_to is null or created_at < p_to)
+$$;
+
+
+revoke all on function public.history_balance_delta(text, timestamptz, timestamptz) from public, anon;
@@ -1,15 +1,33 @@
 # tests/conftest.py
 import os
 os.environ["TESTING"] = "1"   # << set BEFORE importing main/app
+os.environ.setdefault("DB_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", ":memory:")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test-secret-" + "x" * 32)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("AUDIT_ASYNC", "false")
+os.environ.setdefault("QUERY_BUDGET_ENFORCE", "true")
+os.environ.setdefault("WARMUP_ON_BOOT", "false")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
 
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 import pytest
-from fastapi.testclient import TestClient
-from Backend.main import app
+from main import app
+from app.core.supabase_client import get_service_client
+from app.services.auth_service import AuthService
+
+ADMIN = ("admin", "admin-pass")
+
 
 @pytest.fixture(scope="session")
 def client():
-    return TestClient(app)
+    db = get_service_client()
+    AuthService().create_employ(db, ADMIN[0], ADMIN[1], "admin")
+
+    client = app.test_client()
+    res = client.post("/auth/login", data={"username": ADMIN[0], "password": ADMIN[1]})
+    assert res.status_code == 200
+    return client
@@ -1,3 +1,7 @@
+from app.core.account_numbers import allocator, format_account_no
+from app.core.sqlite_rpc import RPCS, db_error
+
+
 def test_create_account_success(client):
     res = client.post("/account/create", json={
         "holder_name": "Test User",
@@ -29,3 +33,28 @@ def test_create_account_invalid_email(client):
         "mobileno": "9999999993"
     })
     assert res.status_code == 422
+
+
+def test_create_account_fails_without_a_reserved_block(client, monkeypatch):
+    def unavailable(conn):
+        raise db_error("could not obtain lock on sequence", "55P03")
+
+    monkeypatch.setattr(allocator, "_next", allocator._end)   # current block used up
+    monkeypatch.setattr("app.core.account_numbers.RESERVE_BACKOFF", 0)
+    monkeypatch.setitem(RPCS, "reserve_account_block", unavailable)
+    res = client.post("/account/create", json={
+        "holder_name": "Test User No Block",
+        "pin": "1234",
+        "vpin": "1234",
+        "gmail": "user4@mail.com",
+        "mobileno": "9999999990"
+    })
+    assert res.status_code == 400
+    assert "Server Error" in res.get_json()["detail"]
+
+
+def test_mistyped_account_number_is_rejected(client):
+    ac_no = format_account_no(7)
+    mistyped = ac_no[:-1] + str((int(ac_no[-1]) + 1) % 10)
+    res = client.post("/account/enquiry", json={"acc_no": mistyped, "pin": "1234"})
+    assert res.status_code == 422
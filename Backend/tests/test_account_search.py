@@ -0,0 +1,126 @@
+from app.config import settings
+from app.core.account_index import AccountPrefixIndex, account_index
+from tests.utils import create_account, get_account_no
+
+
+def _search(client, **params):
+    res = client.get("/account/search", query_string=params)
+    assert res.status_code == 200, res.get_json()
+    return res.get_json()
+
+
+def _setup(client):
+    if get_account_no("Searchable Priya") is None:
+        create_account(client, "Searchable Priya", "7400000001")
+        create_account(client, "Searchable Priyanka", "7400000002")
+        create_account(client, "Searchable Rahul", "7400000003")
+    return [get_account_no(n) for n in ("Searchable Priya", "Searchable Priyanka", "Searchable Rahul")]
+
+
+def test_prefix_and_fuzzy_search(client):
+    priya, priyanka, rahul = _setup(client)
+
+    body = _search(client, q="Searchable Pri", mode="prefix")
+    assert [r["account_no"] for r in body["results"]] == sorted([priya, priyanka])
+    assert {r["rank"] for r in body["results"]} == {1.0}
+
+    body = _search(client, q="740000000", field="mobileno")
+    assert {r["account_no"] for r in body["results"]} == {priya, priyanka, rahul}
+
+    # a typo still finds Rahul, ranked below exact prefix hits
+    body = _search(client, q="serchable rahul")
+    assert body["results"][0]["account_no"] == rahul
+    assert 0 < body["results"][0]["rank"] < 1
+
+    res = client.get("/account/search", query_string={"q": "x"})
+    assert res.status_code == 400
+
+    # two characters are enough for a prefix, not for a fuzzy match
+    assert client.get("/account/search", query_string={"q": "se"}).status_code == 400
+    assert client.get("/account/search", query_string={"q": "se", "mode": "prefix"}).status_code == 200
+
+
+def test_search_is_keyset_paginated(client):
+    _setup(client)
+
+    first = _search(client, q="searchable", field="name", limit=2)
+    assert len(first["results"]) == 2 and first["next_cursor"]
+    second = _search(client, q="searchable", field="name", limit=2, cursor=first["next_cursor"])
+
+    seen = [r["account_no"] for r in first["results"] + second["results"]]
+    assert len(seen) == len(set(seen)) == 3
+    assert second["next_cursor"] is None
+
+
+def test_prefix_search_pages_on_account_no(client):
+    priya, priyanka, rahul = _setup(client)
+
+    seen, cursor = [], None
+    while True:
+        body = _search(client, q="searchable", mode="prefix", limit=1, **({"cursor": cursor} if cursor else {}))
+        seen += [r["account_no"] for r in body["results"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert [ac for ac in seen if ac in (priya, priyanka, rahul)] == sorted([priya, priyanka, rahul])
+    assert seen == sorted(seen)
+
+
+def test_in_process_prefix_index(client, monkeypatch):
+    priya, priyanka, _ = _setup(client)
+    monkeypatch.setattr(settings, "SEARCH_INDEX_ENABLED", True)
+    account_index.build()
+    hits = account_index.stats()["hits"]
+
+    body = _search(client, q="searchable pri", mode="prefix")
+    assert [r["account_no"] for r in body["results"]] == sorted([priya, priyanka])
+    assert account_index.stats()["hits"] == hits + 1
+
+    # a new account is added to the index in place, no rebuild
+    builds = account_index.stats()["builds"]
+    newcomer = create_account(client, "Searchable Prithvi", "7400000004")
+    body = _search(client, q="searchable pri", mode="prefix")
+    assert newcomer in [r["account_no"] for r in body["results"]]
+    assert account_index.stats()["hits"] == hits + 2
+
+    # a changed mobile number moves to its new key
+    res = client.put("/update/update-mobile", json={
+        "acc_no": newcomer, "pin": "1234", "omobile": "7400000004", "nmobile": "7411111114"
+    })
+    assert res.status_code == 200
+    assert [r["account_no"] for r in _search(client, q="741111", field="mobileno", mode="prefix")["results"]] == [newcomer]
+    assert newcomer not in [r["account_no"] for r in _search(client, q="7400000004", field="mobileno", mode="prefix")["results"]]
+    assert account_index.stats()["builds"] == builds
+    assert account_index.stats()["hits"] == hits + 4
+
+
+def test_index_lookup_keeps_the_smallest_account_numbers_per_field(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_INDEX_ENABLED", True)
+    monkeypatch.setattr(settings, "SEARCH_INDEX_TTL", 300.0)
+    rows = [
+        {"account_no": f"{n:04d}", "name": f"ab{name}", "mobileno": f"9{n:09d}", "gmail": f"{name}@x.com"}
+        for n, name in [(5, "a"), (1, "z"), (3, "m"), (2, "y"), (4, "b")]
+    ]
+
+    class Page:
+        data = rows
+
+    class Query:
+        def __getattr__(self, _):
+            return lambda *a, **k: self
+
+        def execute(self):
+            return Page()
+
+    class DB:
+        def table(self, _):
+            return Query()
+
+    index = AccountPrefixIndex(client_factory=DB, page_size=1000)
+    index.build()
+
+    assert [r["account_no"] for r in index.lookup("ab", "name", 2)] == ["0001", "0002"]
+    assert [r["account_no"] for r in index.lookup("ab", None, 2, after_ac="0002")] == ["0003", "0004"]
+    index.upsert({"account_no": "0005", "name": "zz"})
+    assert [r["account_no"] for r in index.lookup("ab", "name", 10)] == ["0001", "0002", "0003", "0004"]
+    assert [r["account_no"] for r in index.lookup("zz", "name", 10)] == ["0005"]
@@ -0,0 +1,125 @@
+from datetime import datetime, time, timedelta, UTC
+
+import pytest
+
+from app.config import settings
+from app.core import audit_archive
+from app.core.sqlite_rpc import RPCS, db_error
+from app.core.supabase_client import get_service_client
+from app.services.audit_log_service import AuditLogService
+
+TODAY = datetime.combine(datetime.now(UTC).date(), time(), UTC)
+
+
+def _log(actor, action, at):
+    return get_service_client().table("app_audit_logs").insert({
+        "actor": actor, "action": action, "details": "test", "ip": "127.0.0.1", "user_agent": "pytest",
+        "created_at": at.isoformat(timespec="microseconds"),
+    }).execute().data[0]["id"]
+
+
+def _all_pages(client, **params):
+    rows, cursor = [], None
+    while True:
+        res = client.get("/audit/logs", query_string={**params, **({"cursor": cursor} if cursor else {})})
+        assert res.status_code == 200, res.get_json()
+        body = res.get_json()
+        rows += body["logs"]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return rows
+
+
+def test_retention_archives_old_days_and_keeps_them_queryable(client):
+    actor = "AUDIT-RETENTION"
+    ids = [
+        _log(actor, "pin_success", TODAY - timedelta(days=100, hours=-9)),
+        _log(actor, "pin_failed", TODAY - timedelta(days=100, hours=-10)),
+        _log(actor, "pin_success", TODAY - timedelta(days=99, hours=-9)),
+        _log(actor, "pin_success", TODAY - timedelta(days=99, hours=-11)),
+        _log(actor, "pin_success", datetime.now(UTC)),
+    ]
+    before = _all_pages(client, actor=actor, limit=2)
+    assert [r["id"] for r in before] == [ids[4], ids[3], ids[2], ids[1], ids[0]]
+
+    report = AuditLogService().apply_retention(get_service_client(), days=90)
+    by_day = {d["day"]: d for d in report["days"]}
+    assert by_day[(TODAY - timedelta(days=100)).date().isoformat()]["archived"] >= 2
+
+    hot = get_service_client().table("app_audit_logs").select("id").eq("actor", actor).execute().data
+    assert [r["id"] for r in hot] == [ids[4]]
+
+    # same endpoint, same order: the cursor runs from the table into the archive
+    after = _all_pages(client, actor=actor, limit=2)
+    assert [r["id"] for r in after] == [r["id"] for r in before]
+    assert [r["archived"] for r in after] == [False, True, True, True, True]
+
+    failed = _all_pages(client, actor=actor, action="pin_failed")
+    assert [r["id"] for r in failed] == [ids[1]]
+
+    ranged = _all_pages(
+        client, actor=actor,
+        from_date=(TODAY - timedelta(days=99)).isoformat(), to_date=(TODAY - timedelta(days=98)).isoformat(),
+    )
+    assert [r["id"] for r in ranged] == [ids[3], ids[2]]
+
+    assert AuditLogService().apply_retention(get_service_client(), days=90)["days"] == []
+
+
+def test_retention_deletes_rows_only_with_their_archive_chunk(client, monkeypatch):
+    actor = "AUDIT-INTERRUPTED"
+    day = TODAY - timedelta(days=120)
+    ids = [_log(actor, "login", day + timedelta(hours=1)), _log(actor, "login", day + timedelta(hours=2))]
+
+    def unavailable(conn, **params):
+        raise db_error("canceling statement due to statement timeout", "57014")
+
+    monkeypatch.setitem(RPCS, "archive_audit_chunk", unavailable)
+    with pytest.raises(Exception):
+        AuditLogService().apply_retention(get_service_client(), days=90)
+    monkeypatch.undo()
+
+    hot = get_service_client().table("app_audit_logs").select("id").eq("actor", actor).execute().data
+    assert sorted(r["id"] for r in hot) == ids
+
+    # a chunk whose rows changed underneath it is rolled back whole
+    rows = get_service_client().table("app_audit_logs").select("*").eq("actor", actor).order("id").execute().data
+    with pytest.raises(Exception):
+        get_service_client().rpc("archive_audit_chunk", {
+            **audit_archive.encode_chunk(day.date(), rows), "p_row_count": 3,
+        }).execute()
+    assert len(get_service_client().table("app_audit_logs").select("id").eq("actor", actor).execute().data) == 2
+
+    report = AuditLogService().apply_retention(get_service_client(), days=90)
+    assert {"day": day.date().isoformat(), "archived": 2, "chunks": 1} in report["days"]
+    archived = get_service_client().table("app_audit_log_archive").select("*").eq("day", day.date().isoformat()).execute().data
+    assert [r["id"] for r in audit_archive.iter_chunk(archived[0]["data"])] == ids[::-1]
+
+
+def test_audit_logs_reject_bad_ranges(client):
+    res = client.get("/audit/logs", query_string={"from_date": "2026-02-01T00:00:00", "to_date": "2026-01-01T00:00:00"})
+    assert res.status_code == 400
+
+
+def test_archive_reads_are_bounded(client, monkeypatch):
+    actor = "AUDIT-BOUNDED"
+    ids = [
+        _log(actor, "login", TODAY - timedelta(days=130, hours=-3)),
+        _log("AUDIT-OTHER", "login", TODAY - timedelta(days=131, hours=-3)),
+        _log(actor, "login", TODAY - timedelta(days=132, hours=-4)),
+        _log(actor, "login", TODAY - timedelta(days=132, hours=-3)),
+    ]
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_PAGE_SIZE", 1)
+    AuditLogService().apply_retention(get_service_client(), days=90)
+
+    decoded = []
+    iter_chunk = audit_archive.iter_chunk
+    monkeypatch.setattr(audit_archive, "iter_chunk", lambda data: decoded.append(data) or iter_chunk(data))
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_SCAN_CHUNKS", 1)
+
+    # one archive chunk per page: short pages, each with a cursor to the next chunk
+    rows = _all_pages(client, actor=actor, limit=5)
+    assert [r["id"] for r in rows] == [ids[0], ids[2], ids[3]]
+
+    # the other actor's chunk is ruled out in the database, never decoded
+    assert len(decoded) == 3
@@ -0,0 +1,60 @@
+import fcntl
+import json
+
+from app.config import settings
+from app.core.audit_writer import AuditWriter
+
+
+class _Table:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def insert(self, rows):
+        self.sink.extend(rows)
+        return self
+
+    def execute(self):
+        return self
+
+
+class _Client:
+    def __init__(self):
+        self.rows = []
+
+    def table(self, name):
+        return _Table(self.rows)
+
+
+def _write(path, rows):
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+
+def test_replay_picks_up_files_left_by_a_dead_worker(tmp_path, monkeypatch):
+    spool = tmp_path / "audit_spool.jsonl"
+    monkeypatch.setattr(settings, "AUDIT_SPOOL_PATH", str(spool))
+    _write(spool, [{"action": "live"}])
+    # claimed by a worker that died mid-replay
+    orphan = tmp_path / "audit_spool.jsonl.4242.replay"
+    _write(orphan, [{"action": "orphan-1"}, {"action": "orphan-2"}])
+
+    client = _Client()
+    writer = AuditWriter(client_factory=lambda: client)
+    writer._replay_spool()
+
+    assert sorted(r["action"] for r in client.rows) == ["live", "orphan-1", "orphan-2"]
+    assert writer.stats()["replayed"] == 3
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_replay_skips_files_another_worker_is_replaying(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_SPOOL_PATH", str(tmp_path / "audit_spool.jsonl"))
+    busy = tmp_path / "audit_spool.jsonl.4243.replay"
+    _write(busy, [{"action": "busy"}])
+
+    client = _Client()
+    with open(busy) as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        AuditWriter(client_factory=lambda: client)._replay_spool()
+
+    assert client.rows == []
+    assert busy.exists()
@@ -1,4 +1,9 @@
-from tests.utils import get_account_no
+from main import app
+from app.core import pin_sessions
+from app.core.sqlite_rpc import RPCS, db_error
+from app.core.supabase_client import get_service_client
+from tests.conftest import ADMIN
+from tests.utils import create_account, get_account_no
 
 def test_pin_success(client):
     client.post("/account/create", json={
@@ -12,7 +17,7 @@ def test_pin_success(client):
     acc_no = get_account_no("Auth User")
     assert acc_no is not None
 
-    res = client.post("/auth/check", json={"acc_no": acc_no, "pin": "1234"})
+    res = client.post("/auth/pin-session", json={"acc_no": acc_no, "pin": "1234"})
     assert res.status_code == 200
 
 
@@ -29,7 +34,96 @@ def test_pin_lockout(client):
     assert acc_no is not None
 
     for _ in range(3):
-        client.post("/auth/check", json={"acc_no": acc_no, "pin": "9999"})
+        client.post("/auth/pin-session", json={"acc_no": acc_no, "pin": "9999"})
 
-    res = client.post("/auth/check", json={"acc_no": acc_no, "pin": "9999"})
+    res = client.post("/auth/pin-session", json={"acc_no": acc_no, "pin": "9999"})
     assert res.status_code == 400
+
+
+def _failed_attempts(acc_no):
+    return get_service_client().table("accounts").select("failed_attempts").eq("account_no", acc_no).single().execute().data["failed_attempts"]
+
+
+def test_lockout_falls_back_only_when_the_rpc_is_missing(client, monkeypatch):
+    client.post("/account/create", json={
+        "holder_name": "Lockout Rpc User",
+        "pin": "2222",
+        "vpin": "2222",
+        "gmail": "lockoutrpc@mail.com",
+        "mobileno": "9999999993"
+    })
+    acc_no = get_account_no("Lockout Rpc User")
+
+    def timeout(conn, **kwargs):
+        raise db_error("canceling statement due to statement timeout", "57014")
+
+    # a transient failure must not drop back to the racy read-then-update
+    monkeypatch.setitem(RPCS, "register_pin_failure", timeout)
+    res = client.post("/auth/pin-session", json={"acc_no": acc_no, "pin": "9999"})
+    assert res.status_code == 400
+    assert res.get_json()["detail"] == "Server error. Try again."
+    assert _failed_attempts(acc_no) == 0
+
+    # not deployed: the legacy path still counts the attempt
+    monkeypatch.delitem(RPCS, "register_pin_failure")
+    res = client.post("/auth/pin-session", json={"acc_no": acc_no, "pin": "9999"})
+    assert res.get_json()["detail"] == "Wrong PIN. 2 tries left."
+    assert _failed_attempts(acc_no) == 1
+
+
+def _pin_session(client, acc_no):
+    res = client.post("/auth/pin-session", json={"acc_no": acc_no, "pin": "1234"})
+    assert res.status_code == 200
+    return {pin_sessions.PIN_SESSION_HEADER: res.get_json()["pin_session"]}
+
+
+def _enquiry(client, acc_no, headers):
+    return client.post("/account/enquiry", json={"acc_no": acc_no}, headers=headers).status_code
+
+
+def test_pin_session_revocation_is_shared_through_the_db(client):
+    acc_no = create_account(client, "Revoke User", "9999999992")
+    headers = _pin_session(client, acc_no)
+    assert _enquiry(client, acc_no, headers) == 200
+
+    # as another worker would: only the DB row changes
+    pin_sessions.revoke_account(get_service_client(), acc_no)
+    assert _enquiry(client, acc_no, headers) == 400
+
+    headers = _pin_session(client, acc_no)
+    assert client.delete("/auth/pin-session", headers=headers).status_code == 200
+    assert _enquiry(client, acc_no, headers) == 400
+
+
+def test_pin_session_is_bound_to_the_login_session(client):
+    acc_no = create_account(client, "Sid User", "9999999989")
+    headers = _pin_session(client, acc_no)
+
+    # same user, separate login
+    other = app.test_client()
+    assert other.post("/auth/login", data={"username": ADMIN[0], "password": ADMIN[1]}).status_code == 200
+    assert _enquiry(other, acc_no, headers) == 400
+    assert _enquiry(client, acc_no, headers) == 200
+
+
+def test_pin_session_sees_the_same_lock_state_as_the_pin(client, monkeypatch):
+    from datetime import datetime, timedelta, UTC
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "PIN_LOCK_COOLDOWN_MINUTES", 5)
+    acc_no = create_account(client, "Cooldown User", "9999999987")
+    headers = _pin_session(client, acc_no)
+
+    db = get_service_client()
+    until = (datetime.now(UTC) + timedelta(minutes=5)).isoformat()
+    db.table("accounts").update({"is_locked": True, "failed_attempts": 3, "locked_until": until}).eq("account_no", acc_no).execute()
+
+    res = client.post("/account/enquiry", json={"acc_no": acc_no}, headers=headers)
+    assert res.get_json()["detail"] == "Account locked. Try again later."
+    res = client.post("/account/enquiry", json={"acc_no": acc_no, "pin": "1234"})
+    assert res.get_json()["detail"] == "Account locked. Try again later."
+
+    # once the cooldown has run out the lock is released on the next check
+    past = (datetime.now(UTC) - timedelta(minutes=1)).isoformat()
+    db.table("accounts").update({"locked_until": past}).eq("account_no", acc_no).execute()
+    assert _enquiry(client, acc_no, _pin_session(client, acc_no)) == 200
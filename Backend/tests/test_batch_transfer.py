@@ -0,0 +1,112 @@
+from app.config import settings
+from app.core.supabase_client import get_service_client
+from tests.utils import create_account, get_balance
+
+
+def _setup(client, tag):
+    payer = create_account(client, f"Payroll {tag}", "7000000001")
+    staff = [create_account(client, f"Staff {tag} {n}", f"700000001{i}") for i, n in enumerate("ABC")]
+    client.post("/transaction/deposit", json={"acc_no": payer, "pin": "1234", "amount": 1000})
+    return payer, staff
+
+
+def test_best_effort_applies_what_it_can(client):
+    payer, staff = _setup(client, "Alpha")
+    res = client.post("/transaction/batch-transfer", json={
+        "acc_no": payer, "pin": "1234",
+        "items": [
+            {"rec_acc_no": staff[0], "amount": 300, "ref": "jan-1"},
+            {"rec_acc_no": "NOSUCHACCOUNT", "amount": 100},
+            {"rec_acc_no": staff[1], "amount": 900},   # more than what is left
+            {"rec_acc_no": staff[2], "amount": 200},
+        ],
+    })
+    assert res.status_code == 200
+    body = res.get_json()
+
+    assert [r["ok"] for r in body["results"]] == [True, False, False, True]
+    assert body["results"][1]["error"] == "Receiver account not found."
+    assert body["results"][2]["error"] == "Insufficient balance."
+    assert body["summary"] | {"batch_id": None} == {
+        "batch_id": None, "mode": "best_effort", "items": 4, "applied": 2, "failed": 2,
+        "total_amount": 500, "balance": 500,
+    }
+    assert (get_balance(payer), get_balance(staff[0]), get_balance(staff[1]), get_balance(staff[2])) == (500, 300, 0, 200)
+
+    history = (
+        get_service_client().table("history").select("account_no, action, context")
+        .eq("account_no", staff[0]).execute()
+    ).data
+    assert history[-1]["action"] == "transfer_in"
+    assert history[-1]["context"] == {"from": payer, "batch": body["summary"]["batch_id"], "ref": "jan-1"}
+
+
+def test_all_or_nothing_rolls_back_every_item(client):
+    payer, staff = _setup(client, "Beta")
+    res = client.post("/transaction/batch-transfer", json={
+        "acc_no": payer, "pin": "1234", "mode": "all_or_nothing",
+        "items": [
+            {"rec_acc_no": staff[0], "amount": 300},
+            {"rec_acc_no": payer, "amount": 100},
+        ],
+    })
+    body = res.get_json()
+
+    assert res.status_code == 400
+    assert body["success"] is False
+    assert body["detail"] == "No transfers were applied."
+    assert body["results"][0]["error"] == "Not applied: batch rolled back."
+    assert body["summary"]["applied"] == 0
+    assert (get_balance(payer), get_balance(staff[0])) == (1000, 0)
+
+
+def test_self_transfer_item_is_reported_as_such(client):
+    payer, staff = _setup(client, "Epsilon")
+    res = client.post("/transaction/batch-transfer", json={
+        "acc_no": payer, "pin": "1234",
+        "items": [
+            {"rec_acc_no": payer, "amount": 100},
+            {"rec_acc_no": staff[0], "amount": 100},
+        ],
+    })
+    body = res.get_json()
+
+    assert [r["ok"] for r in body["results"]] == [False, True]
+    assert body["results"][0]["error"] == "Sender and receiver must differ."
+    assert get_balance(payer) == 900
+
+
+def test_large_batches_are_chunked(client, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_CHUNK_SIZE", 2)
+    payer, staff = _setup(client, "Gamma")
+    items = [{"rec_acc_no": staff[n % 3], "amount": 10} for n in range(7)]
+
+    res = client.post("/transaction/batch-transfer", json={"acc_no": payer, "pin": "1234", "items": items})
+    body = res.get_json()
+
+    assert [r["i"] for r in body["results"]] == list(range(7))
+    assert body["summary"]["applied"] == 7
+    assert get_balance(payer) == 930
+    # PIN check + audit row + one RPC per chunk of 2
+    assert 'desc="6 calls"' in res.headers["Server-Timing"]
+
+    # the declared budget follows the chunk size in effect, not the one at import
+    from main import app
+    from app.core.query_tracking import route_budget
+    budget = route_budget(app, "transaction.batch_transfer")
+    monkeypatch.setattr(settings, "BATCH_CHUNK_SIZE", 1)
+    assert route_budget(app, "transaction.batch_transfer") > budget
+
+
+def test_wrong_pin_and_oversized_batches_are_rejected(client, monkeypatch):
+    payer, staff = _setup(client, "Delta")
+    item = {"rec_acc_no": staff[0], "amount": 1}
+
+    res = client.post("/transaction/batch-transfer", json={"acc_no": payer, "pin": "9999", "items": [item]})
+    assert res.status_code == 400
+
+    res = client.post("/transaction/batch-transfer", json={
+        "acc_no": payer, "pin": "1234", "items": [item] * (settings.BATCH_MAX_ITEMS + 1),
+    })
+    assert res.status_code == 422
+    assert get_balance(staff[0]) == 0
@@ -0,0 +1,24 @@
+from bench.harness import BenchConfig, compare, run_benchmark
+
+
+def test_benchmark_smoke_run_is_clean():
+    cfg = BenchConfig(concurrency=2, requests=40, accounts=10, hot_accounts=2, hot_ratio=0.5)
+    report = run_benchmark(cfg)
+
+    assert report["total"]["requests"] == 40
+    assert report["total"]["errors"] == 0
+    assert report["scenarios"]["deposit"]["db_calls_per_request"] > 0
+    assert compare(report, report, threshold=0.0) == []
+
+
+def test_compare_flags_regressions():
+    base = {"scenarios": {"deposit": {
+        "p95_ms": 10.0, "throughput_rps": 100.0, "db_calls_per_request": 4.0, "errors": 0,
+    }}}
+    cur = {"scenarios": {"deposit": {
+        "p95_ms": 13.0, "throughput_rps": 70.0, "db_calls_per_request": 6.0, "errors": 1,
+    }}}
+
+    problems = compare(cur, base, threshold=0.2)
+    assert len(problems) == 4
+    assert compare(cur, base, threshold=1.0) == ["deposit: errors 0 -> 1"]
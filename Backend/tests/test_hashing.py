@@ -0,0 +1,47 @@
+import threading
+import time
+
+import pytest
+
+from app.core import hashing
+from app.core.hashing import HashExecutor, HashQueueFull
+
+
+def test_bulk_hashing_leaves_workers_free(monkeypatch):
+    monkeypatch.setattr(hashing.settings, "HASH_WORKERS", 4)
+    pool = HashExecutor()
+    lock = threading.Lock()
+    running = peak = 0
+
+    def slow_hash(secret, salt):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return b"h:" + secret
+
+    monkeypatch.setattr(hashing, "hashpw", slow_hash)
+    assert pool.hash_many([str(n) for n in range(10)]) == [f"h:{n}" for n in range(10)]
+    assert peak == 2
+
+
+def test_bulk_hashing_drains_on_failure(monkeypatch):
+    monkeypatch.setattr(hashing.settings, "HASH_WORKERS", 4)
+    pool = HashExecutor()
+    submitted = []
+    real_submit = pool._submit
+
+    def submit(op, fn):
+        if len(submitted) == 3:
+            raise HashQueueFull("Hashing pool is saturated")
+        future = real_submit(op, fn)
+        submitted.append(future)
+        return future
+
+    monkeypatch.setattr(pool, "_submit", submit)
+    with pytest.raises(HashQueueFull):
+        pool.hash_many(["1111", "2222", "3333", "4444"])
+    assert all(f.done() for f in submitted)
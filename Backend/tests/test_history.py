@@ -12,5 +12,12 @@ def test_history(client):
     acc_no = get_account_no("His User")
     assert acc_no is not None
 
-    res = client.get(f"/history/{acc_no}", params={"pin": "1234"})
+    res = client.get(f"/history/{acc_no}", query_string={"pin": "1234"})
     assert res.status_code in [200, 404]  # no history yet is possible
+
+
+def test_history_rejects_a_malformed_cursor(client):
+    acc_no = get_account_no("His User")
+
+    res = client.get(f"/history/{acc_no}", query_string={"pin": "1234", "cursor": "not-a-cursor"})
+    assert res.status_code == 400
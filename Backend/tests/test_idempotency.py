@@ -0,0 +1,142 @@
+import threading
+import time
+
+from flask import jsonify
+
+from main import app
+from app.core import idempotency
+from app.core.account_cache import account_cache
+from app.core.supabase_client import get_service_client
+from app.services.auth_service import AuthService
+from tests.utils import create_account, get_balance
+
+
+def test_retry_replays_without_moving_money_twice(client):
+    acc_no = create_account(client, "Idem User", "8888888851")
+    body = {"acc_no": acc_no, "pin": "1234", "amount": 100}
+    headers = {"Idempotency-Key": "dep-1"}
+
+    first = client.post("/transaction/deposit", json=body, headers=headers)
+    assert first.status_code == 200
+    balance = get_balance(acc_no)
+
+    retry = client.post("/transaction/deposit", json=body, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_json() == first.get_json()
+    # only the claim, which found the stored response
+    assert 'desc="1 calls"' in retry.headers["Server-Timing"]
+    assert get_balance(acc_no) == balance
+
+    reused = client.post("/transaction/deposit", json={**body, "amount": 5}, headers=headers)
+    assert reused.status_code == 422
+
+
+def test_key_is_shared_by_every_worker(client):
+    acc_no = create_account(client, "Idem Worker", "8888888852")
+    body = {"acc_no": acc_no, "pin": "1234", "amount": 100}
+    headers = {"Idempotency-Key": "dep-workers"}
+
+    assert client.post("/transaction/deposit", json=body, headers=headers).status_code == 200
+    balance = get_balance(acc_no)
+
+    # a fresh store holds nothing in memory, like the other gunicorn worker
+    other = idempotency.IdempotencyStore(ttl=60)
+    original = idempotency.store
+    try:
+        idempotency.store = other
+        retry = client.post("/transaction/deposit", json=body, headers=headers)
+    finally:
+        idempotency.store = original
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert get_balance(acc_no) == balance
+
+
+def test_transient_failures_are_not_replayed(client, monkeypatch):
+    acc_no = create_account(client, "Idem Busy", "8888888853")
+    body = {"acc_no": acc_no, "pin": "1234", "amount": 100}
+    headers = {"Idempotency-Key": "dep-busy"}
+
+    # the PIN check's bcrypt pool is full
+    monkeypatch.setattr(AuthService, "check", lambda self, *a, **kw: (False, "Server busy. Try again."))
+    busy = client.post("/transaction/deposit", json=body, headers=headers)
+    assert busy.status_code == 400
+    monkeypatch.undo()
+
+    retry = client.post("/transaction/deposit", json=body, headers=headers)
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+    assert get_balance(acc_no) == 100
+
+
+def test_failure_after_the_money_write_keeps_the_key(client, monkeypatch):
+    acc_no = create_account(client, "Idem Unknown", "8888888854")
+    body = {"acc_no": acc_no, "pin": "1234", "amount": 100}
+    headers = {"Idempotency-Key": "dep-unknown"}
+
+    # the RPC commits, then reading the new balance blows up
+    def broken(*args, **kwargs):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(account_cache, "apply", broken)
+    failed = client.post("/transaction/deposit", json=body, headers=headers)
+    assert failed.status_code == 500
+    monkeypatch.undo()
+    assert get_balance(acc_no) == 100
+
+    retry = client.post("/transaction/deposit", json=body, headers=headers)
+    assert retry.status_code == 409
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_json()["detail"] == idempotency.UNKNOWN_OUTCOME
+    assert get_balance(acc_no) == 100
+
+
+def test_released_key_churn_backs_off_until_the_deadline(monkeypatch):
+    store = idempotency.IdempotencyStore(ttl=60)
+    claims = []
+
+    def released(db, scope, fingerprint):
+        claims.append(time.monotonic())
+        return {"claimed": False, "fingerprint": None}
+
+    monkeypatch.setattr(store, "_claim", released)
+    assert store.begin(None, ("tester", "/churn", "k"), "fp", wait=0.2) == ("busy", None)
+    assert len(claims) <= 4
+
+
+def test_in_flight_duplicate_waits_for_original():
+    db = get_service_client()
+    scope = ("tester", "/wait", "k")
+    store = idempotency.IdempotencyStore(ttl=60)
+    assert store.begin(db, scope, "fp", wait=1) == ("run", None)
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(store.begin(db, scope, "fp", wait=5)))
+    waiter.start()
+    time.sleep(0.1)
+    assert results == []  # still waiting on the original
+
+    store.finish(db, scope, idempotency._Stored("fp", 200, b"{}", "application/json"))
+    waiter.join(2)
+
+    outcome, stored = results[0]
+    assert (outcome, stored.status, stored.body) == ("replay", 200, b"{}")
+    assert store.stats()["waits"] == 1
+    assert store.begin(db, scope, "other", wait=1) == ("mismatch", None)
+
+
+def test_in_flight_duplicate_times_out_as_busy():
+    db = get_service_client()
+    scope = ("tester", "/busy", "k")
+    store = idempotency.IdempotencyStore(ttl=60)
+    store.begin(db, scope, "fp", wait=1)
+    assert store.begin(db, scope, "fp", wait=0.01) == ("busy", None)
+
+
+def test_only_final_responses_are_kept():
+    with app.test_request_context():
+        assert idempotency._is_final(jsonify({"success": True}))
+        assert idempotency._is_final(app.make_response((jsonify({"detail": "Insufficient balance."}), 400)))
+        assert not idempotency._is_final(app.make_response((jsonify({"detail": "Server error. Try again."}), 400)))
+        assert not idempotency._is_final(app.make_response((jsonify({"detail": "x"}), 409)))
+        assert not idempotency._is_final(app.make_response((jsonify({"detail": "x"}), 500)))
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from tests.utils import get_account_no
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def test_metrics_exposes_request_bcrypt_db_and_queue_series(client):
+    client.post("/account/create", json={
+        "holder_name": "Metrics User",
+        "pin": "1234",
+        "vpin": "1234",
+        "gmail": "metrics@mail.com",
+        "mobileno": "8888888871"
+    })
+    acc_no = get_account_no("Metrics User")
+    res = client.post("/transaction/deposit", json={"acc_no": acc_no, "pin": "1234", "amount": 10})
+    assert res.status_code == 200
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.content_type.startswith("text/plain")
+
+    body = res.get_data(as_text=True)
+    assert 'rupeewave_http_request_duration_seconds_count{blueprint="transaction",method="POST",route="/transaction/deposit",status="200"}' in body
+    assert 'rupeewave_bcrypt_duration_seconds_count{op="verify"}' in body
+    assert 'rupeewave_db_call_duration_seconds_count{kind="table",ok="true",target="accounts"}' in body
+    assert "rupeewave_http_requests_in_flight" in body
+    assert "rupeewave_audit_queue_depth" in body
+    assert 'rupeewave_cache_hit_ratio{cache="user_role"}' in body
+
+
+WORKER = """
+from app.core.metrics import observe_bcrypt, IN_FLIGHT
+observe_bcrypt("verify", 0.01)
+IN_FLIGHT.inc()
+"""
+
+SCRAPE = """
+from app.core.metrics import render
+print(render()[0].decode())
+"""
+
+
+def test_metrics_aggregate_across_worker_processes(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", WORKER], cwd=BACKEND, env=env, check=True)
+
+    out = subprocess.run(
+        [sys.executable, "-c", SCRAPE], cwd=BACKEND, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    assert 'rupeewave_bcrypt_duration_seconds_count{op="verify"} 2.0' in out
+
+
+def test_metrics_needs_admin_or_scrape_token(monkeypatch):
+    from app.config import settings
+    from main import app
+
+    anon = app.test_client()
+    assert anon.get("/metrics").status_code == 401
+
+    monkeypatch.setattr(settings, "METRICS_SCRAPE_TOKEN", "scrape-secret")
+    assert anon.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    res = anon.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert res.status_code == 200
+    assert "rupeewave_http_requests_in_flight" in res.get_data(as_text=True)
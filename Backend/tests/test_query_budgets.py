@@ -0,0 +1,52 @@
+import pytest
+from flask import Flask, g
+
+from main import app
+from app.core.middleware import attach_supabase_middleware
+from app.core.query_tracking import QueryBudgetExceeded, attach_query_tracking, query_budget, route_budget
+
+BUDGETED = [
+    "auth.login", "auth.auth_check", "auth.open_pin_session",
+    "account.create_account", "account.enquiry", "account.search_accounts",
+    "transaction.deposit", "transaction.withdraw", "transaction.transfer", "transaction.batch_transfer",
+    "history.get_history", "history.get_balance_at", "audit.get_audit_logs",
+    "update.change_pin", "update.update_mobile", "update.update_email",
+    "instructions.create_instruction", "instructions.list_instructions", "instructions.cancel_instruction",
+]
+
+
+def test_hot_routes_declare_budgets():
+    missing = [e for e in BUDGETED if route_budget(app, e) is None]
+    assert missing == []
+
+
+def test_server_timing_header(client):
+    res = client.get("/auth/check")
+    assert res.status_code == 200
+    assert 'db;dur=' in res.headers["Server-Timing"]
+    assert 'desc="0 calls"' in res.headers["Server-Timing"]
+
+
+def _probe_app():
+    probe = Flask("probe")
+    attach_supabase_middleware(probe)
+    attach_query_tracking(probe)
+
+    @probe.route("/two-calls")
+    @query_budget(1)
+    def two_calls():
+        g.service.table("users").select("id").limit(1).execute()
+        g.service.rpc("debug_claims").execute()
+        return "ok"
+
+    return probe
+
+
+def test_budget_overrun_fails_loudly():
+    probe = _probe_app()
+    probe.testing = True
+
+    with pytest.raises(QueryBudgetExceeded) as exc:
+        probe.test_client().get("/two-calls")
+    assert "2 DB calls (budget 1)" in str(exc.value)
+    assert "table:users" in str(exc.value) and "rpc:debug_claims" in str(exc.value)
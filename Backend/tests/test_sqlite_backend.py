@@ -0,0 +1,59 @@
+import pytest
+from postgrest.exceptions import APIError
+
+from app.core.sqlite_client import SQLiteClient
+
+
+@pytest.fixture()
+def db():
+    return SQLiteClient(":memory:")
+
+
+def _account(db, ac_no, balance=0):
+    user = db.table("users").insert({"user_name": ac_no, "password": "x"}).execute().data[0]
+    db.table("accounts").insert({
+        "account_no": ac_no, "name": "Test", "pin": "x", "balance": balance, "user_id": user["id"],
+    }).execute()
+    return user
+
+
+def test_insert_sets_uid_and_duplicate_errors(db):
+    user = _account(db, "AC1")
+    assert user["uid"] == str(user["id"])
+
+    with pytest.raises(APIError) as exc:
+        db.table("users").insert({"user_name": "AC1", "password": "x"}).execute()
+    assert "duplicate" in str(exc.value).lower()
+
+
+def test_single_requires_exactly_one_row(db):
+    with pytest.raises(APIError):
+        db.table("accounts").select("balance").eq("account_no", "missing").single().execute()
+
+
+def test_keyset_or_filter(db):
+    for i in range(5):
+        db.table("history").insert({
+            "account_no": "AC1", "action": "deposit", "amount": i, "created_at": "2024-01-01T00:00:00+00:00",
+        }).execute()
+
+    rows = (
+        db.table("history").select("id")
+        .or_('created_at.lt."2024-01-01T00:00:00+00:00",and(created_at.eq."2024-01-01T00:00:00+00:00",id.lt."3")')
+        .order("id", desc=True)
+        .execute()
+    ).data
+    assert [r["id"] for r in rows] == [2, 1]
+
+
+def test_transfer_rpc_is_atomic(db):
+    _account(db, "AC1", balance=100)
+    _account(db, "AC2")
+
+    with pytest.raises(APIError) as exc:
+        db.rpc("atm_transfer", {"p_from_ac": "AC1", "p_to_ac": "AC2", "p_amount": 500}).execute()
+    assert "insufficient" in str(exc.value).lower()
+
+    res = db.rpc("atm_transfer", {"p_from_ac": "AC1", "p_to_ac": "AC2", "p_amount": 40}).execute()
+    assert res.data["balance"] == 60
+    assert len(db.table("history").select("id").execute().data) == 2
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, UTC
+
+from app.config import settings
+from app.core.scheduler import InstructionScheduler
+from app.core.sqlite_rpc import si_occurrence_at
+from app.core.supabase_client import get_service_client
+from tests.utils import create_account, get_balance
+
+
+def _instruction(instruction_id):
+    return (
+        get_service_client().table("standing_instructions")
+        .select("*").eq("id", instruction_id).single().execute()
+    ).data
+
+
+def _create(client, payer, payee, amount, start_at, frequency="monthly"):
+    res = client.post("/instructions/create", json={
+        "acc_no": payer, "pin": "1234", "rec_acc_no": payee, "amount": amount,
+        "frequency": frequency, "start_at": start_at.isoformat(), "ref": "rent",
+    })
+    assert res.status_code == 200, res.get_json()
+    return res.get_json()["instruction"]
+
+
+def test_due_instruction_runs_and_is_rescheduled(client):
+    payer = create_account(client, "Standing Payer", "7100000001")
+    payee = create_account(client, "Standing Landlord", "7100000002")
+    client.post("/transaction/deposit", json={"acc_no": payer, "pin": "1234", "amount": 1000})
+
+    started = datetime.now(UTC) - timedelta(minutes=1)
+    si = _create(client, payer, payee, 400, started)
+
+    res = client.post("/instructions/run")
+    assert res.get_json()["done"] >= 1
+    assert (get_balance(payer), get_balance(payee)) == (600, 400)
+
+    row = _instruction(si["id"])
+    assert row["occurrence"] == 1
+    assert row["next_run_at"] == si_occurrence_at(si["start_at"], "monthly", 1)
+
+    history = (
+        get_service_client().table("history").select("action, context")
+        .eq("account_no", payee).execute()
+    ).data
+    assert history[-1] == {"action": "transfer_in", "context": {"from": payer, "instruction": si["id"], "ref": "rent"}}
+
+    # not due again until next month
+    client.post("/instructions/run")
+    assert get_balance(payer) == 600
+
+
+def test_insufficient_funds_backs_off_then_skips(client, monkeypatch):
+    monkeypatch.setattr(settings, "SI_MAX_RETRIES", 1)
+    monkeypatch.setattr(settings, "SI_RETRY_BASE_SECONDS", 0)
+
+    payer = create_account(client, "Standing Broke", "7100000003")
+    payee = create_account(client, "Standing Lender", "7100000004")
+    si = _create(client, payer, payee, 500, datetime.now(UTC) - timedelta(minutes=1), frequency="weekly")
+
+    client.post("/instructions/run")
+    row = _instruction(si["id"])
+    assert (row["retries"], row["occurrence"], row["last_error"]) == (1, 0, "Insufficient balance")
+
+    # retries used up: this occurrence is missed, the instruction stays active
+    client.post("/instructions/run")
+    row = _instruction(si["id"])
+    assert (row["retries"], row["occurrence"], row["status"]) == (0, 1, "active")
+    assert get_balance(payee) == 0
+
+
+def test_cancel_and_list(client):
+    payer = create_account(client, "Standing Saver", "7100000005")
+    payee = create_account(client, "Standing Fund", "7100000006")
+    si = _create(client, payer, payee, 100, datetime.now(UTC) + timedelta(days=1), frequency="daily")
+
+    listed = client.get(f"/instructions/{payer}?pin=1234").get_json()["instructions"]
+    assert [i["id"] for i in listed] == [si["id"]]
+
+    res = client.put(f"/instructions/{si['id']}/cancel", json={"acc_no": payer, "pin": "1234"})
+    assert res.status_code == 200
+    assert _instruction(si["id"])["status"] == "cancelled"
+
+    res = client.put(f"/instructions/{si['id']}/cancel", json={"acc_no": payer, "pin": "1234"})
+    assert res.status_code == 400
+
+
+def test_monthly_occurrences_keep_day_of_month():
+    start = "2027-01-31T09:00:00.000000+00:00"
+    assert si_occurrence_at(start, "monthly", 1).startswith("2027-02-28T09:00")
+    assert si_occurrence_at(start, "monthly", 2).startswith("2027-03-31T09:00")
+    assert si_occurrence_at(start, "monthly", 13).startswith("2028-02-29T09:00")
+
+
+def test_tick_is_capped_per_tick(client, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "SCHEDULER_MAX_PER_TICK", 2)
+
+    payer = create_account(client, "Standing Bulk", "7100000007")
+    payee = create_account(client, "Standing Sink", "7100000008")
+    client.post("/transaction/deposit", json={"acc_no": payer, "pin": "1234", "amount": 1000})
+    for _ in range(3):
+        _create(client, payer, payee, 10, datetime.now(UTC) - timedelta(minutes=1))
+
+    scheduler = InstructionScheduler()
+    assert scheduler.tick(get_service_client())["processed"] == 2
+    assert scheduler.tick(get_service_client())["processed"] == 1
+    assert scheduler.stats()["queued"] >= 3
+    assert get_balance(payee) == 30
@@ -0,0 +1,33 @@
+from app.core.warmup import Warmup
+from bench.startup import parse_importtime, profile
+
+
+def test_boot_defers_heavy_libraries():
+    report = profile({"DB_BACKEND": "sqlite"})
+
+    assert report["health_status"] == 200
+    assert report["deferred_loaded"] == []
+    assert "app" in report["packages_ms"]
+
+
+def test_warmup_runs_every_step():
+    warm = Warmup()
+    warm.start()
+    assert warm.wait(timeout=30)
+
+    stats = warm.stats()
+    assert stats["state"] == "done"
+    assert {"imports", "db_clients", "hash_pool"} <= set(stats["steps"])
+    assert all(step["ok"] for step in stats["steps"].values()), stats
+
+    warm.start()  # once per worker process
+    assert warm.stats()["steps"] == stats["steps"]
+
+
+def test_parse_importtime():
+    rows = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   jwt.algorithms\n"
+        "import time:        30 |        150 | jwt\n"
+    )
+    assert rows == [("jwt.algorithms", 120, 120, 1), ("jwt", 30, 150, 0)]
@@ -0,0 +1,108 @@
+from datetime import datetime, time, timedelta, UTC
+
+from app.core.supabase_client import get_service_client
+from app.services.history_service import HistoryService
+from app.services.statement_service import StatementService
+from tests.utils import create_account
+
+TODAY = datetime.combine(datetime.now(UTC).date(), time(), UTC)
+
+
+def _history(ac_no, action, amount, at):
+    get_service_client().table("history").insert({
+        "account_no": ac_no, "action": action, "amount": amount,
+        "context": None, "created_at": at.isoformat(timespec="microseconds"),
+    }).execute()
+
+
+def _build():
+    # "now" two days ahead: every row written so far is in a closed day
+    return StatementService().build_snapshots(get_service_client(), now=TODAY + timedelta(days=2))
+
+
+def _snapshots(ac_no):
+    rows = (
+        get_service_client().table("balance_snapshots").select("day, balance")
+        .eq("account_no", ac_no).order("day").execute()
+    ).data
+    return [(str(r["day"])[:10], r["balance"]) for r in rows]
+
+
+def _day(n):
+    return (TODAY + timedelta(days=n)).date().isoformat()
+
+
+def test_snapshots_are_incremental(client):
+    acc = create_account(client, "Snapshot Saver", "7200000001")
+    _history(acc, "deposit", 1000, TODAY - timedelta(days=3, hours=-10))
+    _history(acc, "withdraw", 300, TODAY - timedelta(days=2, hours=-10))
+    _history(acc, "transfer_in", 500, TODAY - timedelta(days=1, hours=-10))
+
+    assert _build()["processed"] >= 3
+    assert _snapshots(acc) == [(_day(-3), 1000), (_day(-2), 700), (_day(-1), 1200)]
+
+    # a second run reads only what was written since
+    _history(acc, "transfer_out", 100, TODAY - timedelta(hours=2))
+    summary = _build()
+    assert summary["processed"] == 1
+    assert _snapshots(acc)[-1] == (_day(-1), 1100)
+    assert _build()["processed"] == 0
+
+
+def test_statement_starts_from_nearest_snapshot(client):
+    acc = create_account(client, "Snapshot Statement", "7200000002")
+    _history(acc, "deposit", 1000, TODAY - timedelta(days=5, hours=-9))
+    _history(acc, "withdraw", 200, TODAY - timedelta(days=4, hours=-9))
+    _history(acc, "deposit", 50, TODAY - timedelta(days=2, hours=-9))
+    _build()
+    _history(acc, "withdraw", 25, TODAY + timedelta(hours=1))      # not snapshotted yet
+
+    res = client.get(f"/history/{acc}/statement", query_string={
+        "pin": "1234", "from_date": (TODAY - timedelta(days=3)).isoformat(), "to_date": (TODAY + timedelta(days=1)).isoformat(),
+    })
+    assert res.status_code == 200
+    statement = res.get_json()["statement"]
+
+    assert statement["snapshot_day"].startswith(_day(-4))
+    assert (statement["opening_balance"], statement["closing_balance"]) == (800, 825)
+    assert (statement["credits"], statement["debits"]) == (50, 25)
+    assert [(e["action"], e["balance"]) for e in statement["entries"]] == [("deposit", 850), ("withdraw", 825)]
+
+    res = client.get(f"/history/{acc}/balance-at", query_string={"pin": "1234", "at": (TODAY - timedelta(days=3)).isoformat()})
+    assert res.get_json()["balance"] == 800
+
+
+def test_statement_without_a_snapshot_sums_history_in_the_db(client, monkeypatch):
+    acc = create_account(client, "Snapshot Missing", "7200000004")
+    _history(acc, "deposit", 1000, TODAY - timedelta(days=5, hours=-9))
+    _history(acc, "withdraw", 200, TODAY - timedelta(days=4, hours=-9))
+    _history(acc, "deposit", 50, TODAY - timedelta(hours=3))
+
+    fetched = []
+    original = HistoryService.iter_history
+
+    def spy(self, db, ac_no, filters=None, chunk_size=500):
+        fetched.append(filters)
+        return original(self, db, ac_no, filters, chunk_size)
+
+    monkeypatch.setattr(HistoryService, "iter_history", spy)
+
+    res = client.get(f"/history/{acc}/statement", query_string={
+        "pin": "1234", "from_date": (TODAY - timedelta(days=1)).isoformat(), "to_date": (TODAY + timedelta(days=1)).isoformat(),
+    })
+    statement = res.get_json()["statement"]
+    assert statement["snapshot_day"] is None
+    assert (statement["opening_balance"], statement["closing_balance"]) == (800, 850)
+    assert [(e["action"], e["balance"]) for e in statement["entries"]] == [("deposit", 850)]
+    # only the statement period is read row by row
+    assert [f["from_date"] for f in fetched] == [TODAY - timedelta(days=1)]
+
+    res = client.get(f"/history/{acc}/balance-at", query_string={"pin": "1234", "at": TODAY.isoformat()})
+    assert res.get_json()["balance"] == 850
+    assert len(fetched) == 1
+
+
+def test_statement_period_is_bounded(client):
+    acc = create_account(client, "Snapshot Bounded", "7200000003")
+    res = client.get(f"/history/{acc}/statement?pin=1234&from_date=2020-01-01T00:00:00&to_date=2024-01-01T00:00:00")
+    assert res.status_code == 400
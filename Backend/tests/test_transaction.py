@@ -79,3 +79,11 @@ def test_transfer_success(client):
         "amount": 100
     })
     assert res.status_code == 200
+
+
+def test_self_transfer_error_is_not_reported_as_missing_sender():
+    from app.services.transaction_service import rpc_error_message
+
+    # raised by atm_transfer (0001/0006) and per item by batch_transfer (0007)
+    assert rpc_error_message("Transfer", "Sender and receiver must differ") == "Sender and receiver must differ."
+    assert rpc_error_message("Transfer", "Sender account not found") == "Sender account not found."
@@ -10,7 +10,7 @@ def test_update_mobile(client):
     })
 
     acc_no = get_account_no("Mobile User")
-    res = client.put("/account/update-mobile", json={
+    res = client.put("/update/update-mobile", json={
         "acc_no": acc_no,
         "pin": "1234",
         "omobile": "8888888888",
@@ -29,7 +29,7 @@ def test_update_email(client):
     })
 
     acc_no = get_account_no("Email User")
-    res = client.put("/account/update-email", json={
+    res = client.put("/update/update-email", json={
         "acc_no": acc_no,
         "pin": "1234",
         "oemail": "old@mail.com",
@@ -48,7 +48,7 @@ def test_change_pin(client):
     })
 
     acc_no = get_account_no("Pin User")
-    res = client.put("/account/change-pin", json={
+    res = client.put("/update/change-pin", json={
         "acc_no": acc_no,
         "pin": "1234",
         "newpin": "4321",
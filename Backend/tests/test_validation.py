@@ -0,0 +1,58 @@
+import datetime
+import decimal
+
+from flask import Flask
+
+from app.core.json_provider import install_json_provider
+from bench.codec import run_codec_benchmark
+from bench.harness import compare
+
+
+def test_schema_errors_are_structured_422(client):
+    res = client.post("/transaction/transfer", json={"acc_no": "A", "pin": "12", "amount": -5})
+    assert res.status_code == 422
+
+    body = res.get_json()
+    assert body["detail"] == "Invalid payload"
+    locs = sorted(tuple(e["loc"]) for e in body["errors"])
+    assert locs == [("acc_no",), ("amount",), ("pin",), ("rec_acc_no",)]
+    assert "12" not in res.get_data(as_text=True)  # submitted values never echoed
+
+
+def test_missing_and_malformed_json_are_400(client):
+    res = client.post("/transaction/deposit", data="", content_type="application/json")
+    assert res.status_code == 400
+    assert res.get_json()["detail"] == "Missing JSON"
+
+    res = client.post("/transaction/deposit", data="{not json", content_type="application/json")
+    assert res.status_code == 400
+    assert res.get_json()["detail"] == "Malformed JSON"
+
+    res = client.put("/update/update-mobile", data="acc_no=1", content_type="text/plain")
+    assert res.status_code == 415
+
+
+def test_orjson_provider_matches_flask_output():
+    payload = {
+        "b": 1, "a": [None, True, 1.5], "when": datetime.datetime(2026, 1, 2, 3, 4, 5),
+        "day": datetime.date(2026, 1, 2), "amount": decimal.Decimal("10.50"), "name": "RupeeWave",
+    }
+
+    outputs = {}
+    for name in ("stdlib", "orjson"):
+        app = install_json_provider(Flask(name), name)
+        with app.app_context():
+            outputs[name] = app.json.response(payload).get_data()
+            assert app.json.loads(outputs[name])["name"] == "RupeeWave"
+
+    assert outputs["orjson"] == outputs["stdlib"]
+
+
+def test_codec_benchmark_is_part_of_the_report():
+    codec = run_codec_benchmark(iterations=20)
+    assert set(codec) == {"history_page", "transfer_request"}
+    assert all(c["fast_us"] > 0 for c in codec.values())
+
+    slower = {"codec": {n: {**c, "fast_us": c["fast_us"] * 3} for n, c in codec.items()}}
+    base = {"scenarios": {}, "codec": codec}
+    assert len(compare({"scenarios": {}, **slower}, base, threshold=0.2)) == 2
@@ -1,8 +1,8 @@
-from Backend.app.core.supabase_client import supabase
+from app.core.supabase_client import get_service_client
 
 def get_account_no(holder_name: str):
     res = (
-        supabase.table("accounts")
+        get_service_client().table("accounts")
         .select("account_no")
         .eq("name", holder_name)
         .execute()
@@ -13,3 +13,21 @@ def get_account_no(holder_name: str):
     
     # Return the most recently created account
     return res.data[-1]["account_no"]
+
+
+def create_account(client, holder_name: str, mobileno: str, pin: str = "1234"):
+    client.post("/account/create", json={
+        "holder_name": holder_name,
+        "pin": pin,
+        "vpin": pin,
+        "gmail": f"{holder_name.replace(' ', '').lower()}@mail.com",
+        "mobileno": mobileno,
+    })
+    return get_account_no(holder_name)
+
+
+def get_balance(acc_no: str):
+    return (
+        get_service_client().table("accounts")
+        .select("balance").eq("account_no", acc_no).single().execute()
+    ).data["balance"]
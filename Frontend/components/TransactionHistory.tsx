@@ -10,7 +10,7 @@ import { History as HistoryIcon, Loader2, AlertCircle, ArrowUpCircle, ArrowDownC
 import { atmApi } from '@/lib/api';
 
 export type HistoryEntryTuple = [number, string, string, number, string];
-export type HistorySuccess = { history: HistoryEntryTuple[] };
+export type HistorySuccess = { history: HistoryEntryTuple[]; next_cursor?: string | null };
 export type HistoryError = { message?: string; detail?: string };
 export type HistoryResponse = HistorySuccess | HistoryError;
 
@@ -34,18 +34,21 @@ export function TransactionHistory() {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState('');
   const [transactions, setTransactions] = useState<HistoryEntryTuple[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-  const fetchHistory = async () => {
+  // Without a cursor this loads the newest page; with one it appends the next page.
+  const fetchHistory = async (cursor?: string) => {
     setIsLoading(true);
     setError('');
 
     try {
-      const payload = { acc_no: formData.acc_no.trim(), pin: formData.pin.trim() };
+      const payload = { acc_no: formData.acc_no.trim(), pin: formData.pin.trim(), cursor };
       const result: unknown = await atmApi.history(payload);
 
       if (isHistorySuccess(result)) {
-        setTransactions(result.history);
-        if (result.history.length === 0) {
+        setTransactions(prev => (cursor ? [...prev, ...result.history] : result.history));
+        setNextCursor(result.next_cursor ?? null);
+        if (!cursor && result.history.length === 0) {
           setError('No transaction history found for this account.');
         }
       } else {
@@ -62,9 +65,14 @@ export function TransactionHistory() {
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     setTransactions([]);
+    setNextCursor(null);
     await fetchHistory();
   };
 
+  const handleLoadMore = async () => {
+    if (nextCursor) await fetchHistory(nextCursor);
+  };
+
   const handleRefresh = async () => {
     await fetchHistory();
   };
@@ -204,6 +212,12 @@ export function TransactionHistory() {
             })}
           </div>
         )}
+
+        {nextCursor && (
+          <Button variant="outline" onClick={handleLoadMore} disabled={isLoading} className="w-full mt-4">
+            {isLoading ? <><Loader2 className="mr-2 h-4 w-4 animate-spin" />Loading...</> : <>Load more</>}
+          </Button>
+        )}
       </CardContent>
     </Card>
   );
@@ -3,11 +3,11 @@ import { API_BASE_URL } from './config';
 export class ATMApiClient {
 
   // No token storage needed anymore
-private async makeAuthRequestPost<T>(endpoint: string, data: any,method: string): Promise<T> {
+private async makeAuthRequestPost<T>(endpoint: string, data: any,method: string, headers: Record<string, string> = {}): Promise<T> {
   const res = await fetch(`${API_BASE_URL}${endpoint}`, {
     method: method,
     credentials: "include",
-    headers: { "Content-Type": "application/json" },
+    headers: { "Content-Type": "application/json", ...headers },
     body: JSON.stringify(data),
   });
 
@@ -80,24 +80,39 @@ async makeAuthRequestGet<T>(endpoint: string, params: Record<string, string | nu
     return this.makeAuthRequestPost("/account/create", data,'POST');
   }
 
+// Money calls carry an Idempotency-Key so a retry after a network blip
+// replays the first result instead of moving money twice.
+private async makeMoneyRequest<T>(endpoint: string, data: any): Promise<T> {
+  const headers = { "Idempotency-Key": crypto.randomUUID() };
+  try {
+    return await this.makeAuthRequestPost<T>(endpoint, data, 'POST', headers);
+  } catch (err) {
+    if (!(err instanceof TypeError)) throw err; // fetch only throws TypeError on network failure
+    return this.makeAuthRequestPost<T>(endpoint, data, 'POST', headers);
+  }
+}
+
   async deposit(data: { acc_no: string; amount: number; pin: string }) {
-    return this.makeAuthRequestPost("/transaction/deposit", data,'POST');
+    return this.makeMoneyRequest("/transaction/deposit", data);
   }
 
   async withdraw(data: { acc_no: string; amount: number; pin: string }) {
-    return this.makeAuthRequestPost("/transaction/withdraw", data,'POST');
+    return this.makeMoneyRequest("/transaction/withdraw", data);
   }
 
   async transfer(data: { acc_no: string; pin: string; rec_acc_no: string; amount: number; }) {
-    return this.makeAuthRequestPost("/transaction/transfer", data,'POST');
+    return this.makeMoneyRequest("/transaction/transfer", data);
   }
 
   async enquiry(data: { acc_no: string; pin: string }) {
     return this.makeAuthRequestPost("/account/enquiry", data,'POST');
   }
 
-  async history(data: { acc_no: string; pin: string }) {
-    return this.makeAuthRequestGet(`/history/${data.acc_no}`, { pin: data.pin });
+  // One keyset page; pass the previous page's next_cursor for the next one.
+  async history(data: { acc_no: string; pin: string; cursor?: string }) {
+    const params: Record<string, string> = { pin: data.pin };
+    if (data.cursor) params.cursor = data.cursor;
+    return this.makeAuthRequestGet(`/history/${data.acc_no}`, params);
   }
 
   async changePin(data: { acc_no: string; pin: string; newpin: string; vnewpin: string }) {